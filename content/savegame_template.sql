@@ -478,7 +478,8 @@ CREATE TABLE "ai_village_builder_plan" (
 
 CREATE TABLE "building_collector" (
 	"home_building" INT,
-	"creation_tick" INT NOT NULL
+	"creation_tick" INT NOT NULL,
+	"waiting_since" INT DEFAULT NULL
 );
 
 CREATE TABLE "building_collector_job_history" (
@@ -45,6 +45,7 @@ from basicbuilder import BasicBuilder
 from specialdomestictrademanager import SpecialDomesticTradeManager
 from internationaltrademanager import InternationalTradeManager
 from settlementfounder import SettlementFounder
+from tickexecutor import TickExecutor
 from horizons.ai.aiplayer.combat.unitmanager import UnitManager
 
 # all subclasses of AbstractBuilding have to be imported here to register the available buildings
@@ -93,6 +94,7 @@ class AIPlayer(GenericAI):
 	log = logging.getLogger("ai.aiplayer")
 	tick_interval = 32
 	tick_long_interval = 128
+	tick_budget = 8 # maximum number of steps of a tick that are executed per game tick, see TickExecutor
 
 	def __init__(self, session, id, name, color, clientid, difficulty_level, **kwargs):
 		super(AIPlayer, self).__init__(session, id, name, color, clientid, difficulty_level, **kwargs)
@@ -153,6 +155,7 @@ class AIPlayer(GenericAI):
 		self.goals = [DoNothingGoal(self)]
 		self.special_domestic_trade_manager = SpecialDomesticTradeManager(self)
 		self.international_trade_manager = InternationalTradeManager(self)
+		self.tick_executor = TickExecutor(self, self.tick_budget)
 		SettlementRangeChanged.subscribe(self._on_settlement_range_changed)
 		NewDisaster.subscribe(self.notify_new_disaster)
 		MineEmpty.subscribe(self.notify_mine_empty)
@@ -194,6 +197,7 @@ class AIPlayer(GenericAI):
 
 	def save(self, db):
 		super(AIPlayer, self).save(db)
+		assert not self.tick_executor.busy, "finish_tick has to be called before saving"
 
 		# save the player
 		db("UPDATE player SET client_id = 'AIPlayer' WHERE rowid = ?", self.worldid)
@@ -313,13 +317,26 @@ class AIPlayer(GenericAI):
 
 	def tick(self):
 		Scheduler().add_new_object(Callback(self.tick), self, run_in=self.tick_interval)
-		self.settlement_founder.tick()
-		self.handle_enemy_expansions()
-		self.handle_settlements()
-		self.special_domestic_trade_manager.tick()
-		self.international_trade_manager.tick()
-		self.unit_manager.tick()
-		self.combat_manager.tick()
+		self.tick_executor.start(self._tick_steps())
+
+	def _tick_steps(self):
+		"""Generator that does the work of a tick, yielding after every step.
+		The steps are spread over several game ticks by the TickExecutor."""
+		for step in (self.settlement_founder.tick, self.handle_enemy_expansions):
+			step()
+			yield
+			if not self._enabled:
+				return
+		for _ in self._handle_settlements_steps():
+			yield
+			if not self._enabled:
+				return
+		for step in (self.special_domestic_trade_manager.tick, self.international_trade_manager.tick,
+		             self.unit_manager.tick, self.combat_manager.tick):
+			step()
+			yield
+			if not self._enabled:
+				return
 
 	def tick_long(self):
 		"""
@@ -328,22 +345,56 @@ class AIPlayer(GenericAI):
 		Scheduler().add_new_object(Callback(self.tick_long), self, run_in=self.tick_long_interval)
 		self.strategy_manager.tick()
 
+	def _has_settlement_manager(self, settlement_manager):
+		"""Return whether the settlement manager still belongs to this player."""
+		return self._enabled and \
+		       self._settlement_manager_by_settlement_id.get(settlement_manager.settlement.worldid) is settlement_manager
+
+	def finish_tick(self):
+		"""Complete the work of the current tick immediately. It can't be saved, so this has
+		to be called before anything is saved (see TickExecutor)."""
+		self.tick_executor.finish()
+
 	def handle_settlements(self):
+		for _ in self._handle_settlements_steps():
+			pass
+
+	def _handle_settlements_steps(self):
+		"""Generator version of handle_settlements that yields after every goal update,
+		settlement manager tick, evaluator cache update step and goal execution.
+
+		Settlements and goals can change in the game ticks between the steps, so the lists
+		are copied and every item is checked again before it is used."""
 		goals = []
-		for goal in self.goals:
+		for goal in list(self.goals):
 			if goal.can_be_activated:
 				goal.update()
 				goals.append(goal)
-		for settlement_manager in self.settlement_managers:
+				yield
+		for settlement_manager in list(self.settlement_managers):
+			if not self._has_settlement_manager(settlement_manager):
+				continue
 			settlement_manager.tick(goals)
+			yield
+		# calculate the values of the building locations in advance, executing a goal would do it all at once
+		for settlement_manager in list(self.settlement_managers):
+			if not self._has_settlement_manager(settlement_manager):
+				continue
+			for _ in settlement_manager.iter_update_evaluator_cache():
+				yield
+				if not self._has_settlement_manager(settlement_manager):
+					break
 		goals.sort(reverse=True)
 
 		settlements_blocked = set()  # set([settlement_manager_id, ...])
 		for goal in goals:
 			if not goal.active:
 				continue
-			if isinstance(goal, SettlementGoal) and goal.settlement_manager.worldid in settlements_blocked:
-				continue  # can't build anything in this settlement
+			if isinstance(goal, SettlementGoal):
+				if not self._has_settlement_manager(goal.settlement_manager):
+					continue
+				if goal.settlement_manager.worldid in settlements_blocked:
+					continue  # can't build anything in this settlement
 			result = goal.execute()
 			if result == GOAL_RESULT.SKIP:
 				self.log.info('%s, skipped goal %s', self, goal)
@@ -354,6 +405,7 @@ class AIPlayer(GenericAI):
 			else:
 				self.log.info('%s all further goals during this tick blocked by goal %s', self, goal)
 				break  # built something; stop because otherwise the AI could look too fast
+			yield
 
 		self.log.info('%s had %d active goals', self, sum(goal.active for goal in goals))
 		for goal in goals:
@@ -420,7 +472,9 @@ class AIPlayer(GenericAI):
 				self.settlement_expansions.append((coords, settlement))
 
 		if our_new_coords_list and settlement.worldid in self._settlement_manager_by_settlement_id:
-			self._settlement_manager_by_settlement_id[settlement.worldid].production_builder.road_connectivity_cache.modify_area(our_new_coords_list)
+			settlement_manager = self._settlement_manager_by_settlement_id[settlement.worldid]
+			settlement_manager.production_builder.road_connectivity_cache.modify_area(our_new_coords_list)
+			settlement_manager.evaluator_cache.invalidate(our_new_coords_list)
 
 	def handle_enemy_expansions(self):
 		if not self.settlement_expansions:
@@ -484,6 +538,7 @@ class AIPlayer(GenericAI):
 		"""Called to speed up session destruction."""
 		assert self._enabled
 		self._enabled = False
+		self.tick_executor.cancel()
 		SettlementRangeChanged.unsubscribe(self._on_settlement_range_changed)
 		NewDisaster.unsubscribe(self.notify_new_disaster)
 		MineEmpty.unsubscribe(self.notify_mine_empty)
@@ -506,6 +561,7 @@ class AIPlayer(GenericAI):
 		self.goals = None
 		self.special_domestic_trade_manager = None
 		self.international_trade_manager = None
+		self.tick_executor = None
 		self.strategy_manager.end()
 		self.strategy_manager = None
 		super(AIPlayer, self).end()
@@ -280,6 +280,7 @@ class AreaBuilder(WorldObject):
 
 	def register_change(self, x, y, purpose, data):
 		"""Register the (potential) change of the purpose of land at the given coordinates."""
+		self.settlement_manager.evaluator_cache.invalidate([(x, y)])
 		if (x, y) in self.plan:
 			self.plan[(x, y)] = (purpose, data)
 			if purpose == BUILDING_PURPOSE.ROAD:
@@ -24,6 +24,8 @@ import logging
 import operator
 
 from horizons.ai.aiplayer.constants import BUILD_RESULT
+from horizons.ai.aiplayer.evaluatorcache import EvaluatorCache
+from horizons.ai.aiplayer.evaluatorpool import EvaluatorPool, PlanSnapshot
 from horizons.entities import Entities
 from horizons.constants import GAME_SPEED, RES
 from horizons.util.python import decorators
@@ -92,6 +94,8 @@ class AbstractBuilding(object):
 		settler_level = cls._load_settler_level(building_id)
 		return cls(building_id, name, settler_level)
 
+	evaluation_chunk_size = 100 # number of locations evaluated per step of iter_update_evaluator_cache
+
 	monthly_gold_cost = 50
 	resource_cost = {RES.GOLD: 1, RES.BOARDS: 20, RES.BRICKS: 45, RES.TOOLS: 50}
 
@@ -169,13 +173,74 @@ class AbstractBuilding(object):
 
 	def get_evaluators(self, settlement_manager, resource_id):
 		"""Return a list of every BuildingEvaluator for this building type in the given settlement."""
+		evaluator_class = self.evaluator_class
+		production_builder = settlement_manager.production_builder
+		if evaluator_class.snapshot_personalities is not None:
+			settlement_manager.evaluator_cache.add_building(self)
+			locations = list(self.iter_potential_locations(settlement_manager))
+			return self._get_cached_evaluators(settlement_manager.evaluator_cache, production_builder, evaluator_class, locations)
+
 		options = [] # [BuildingEvaluator, ...]
 		for x, y, orientation in self.iter_potential_locations(settlement_manager):
-			evaluator = self.evaluator_class.create(settlement_manager.production_builder, x, y, orientation)
+			evaluator = evaluator_class.create(production_builder, x, y, orientation)
 			if evaluator is not None:
 				options.append(evaluator)
 		return options
 
+	@classmethod
+	def _get_cached_evaluators(cls, evaluator_cache, production_builder, evaluator_class, locations):
+		"""
+		Same as the serial part of get_evaluators for evaluator classes that implement score_location.
+
+		The values of the locations are taken from the EvaluatorCache if nothing changed around them,
+		the others are calculated (by the EvaluatorPool if it is enabled).
+		"""
+		values = [evaluator_cache.get(evaluator_class, x, y, orientation) for (x, y, orientation) in locations]
+		missing_indices = [i for (i, value) in enumerate(values) if value is EvaluatorCache.MISSING]
+		evaluators = {} # {index: BuildingEvaluator}, the ones that were created to calculate the value
+		if missing_indices:
+			if EvaluatorPool().enabled:
+				snapshot = PlanSnapshot(production_builder, evaluator_class.snapshot_personalities)
+				missing_values = EvaluatorPool().score(evaluator_class, snapshot, [locations[i] for i in missing_indices])
+			else:
+				missing_values = []
+				for i in missing_indices:
+					x, y, orientation = locations[i]
+					evaluator = evaluator_class.create(production_builder, x, y, orientation)
+					if evaluator is not None:
+						evaluators[i] = evaluator
+					missing_values.append(evaluator.value if evaluator is not None else None)
+
+			for i, value in zip(missing_indices, missing_values):
+				values[i] = value
+				evaluator_cache.set(evaluator_class, locations[i][0], locations[i][1], locations[i][2], value)
+
+		options = [] # [BuildingEvaluator, ...]
+		for i, ((x, y, orientation), value) in enumerate(zip(locations, values)):
+			if i in evaluators:
+				options.append(evaluators[i])
+			elif value is not None:
+				options.append(evaluator_class.create_from_value(production_builder, x, y, orientation, value))
+		return options
+
+	def iter_update_evaluator_cache(self, settlement_manager):
+		"""
+		Generator that calculates the missing values of the EvaluatorCache for this building type.
+
+		It yields after every evaluation_chunk_size locations, so the AI can spread the work over
+		several game ticks. get_evaluators then only has to calculate the values of the locations
+		that changed in between.
+		"""
+		evaluator_class = self.evaluator_class
+		evaluator_cache = settlement_manager.evaluator_cache
+		locations = list(self.iter_potential_locations(settlement_manager))
+		missing_locations = evaluator_cache.get_missing_locations(evaluator_class, locations)
+		chunk_size = self.evaluation_chunk_size
+		for i in xrange(0, len(missing_locations), chunk_size):
+			self._get_cached_evaluators(evaluator_cache, settlement_manager.production_builder,
+			                            evaluator_class, missing_locations[i : i + chunk_size])
+			yield
+
 	def build(self, settlement_manager, resource_id):
 		"""Try to build the best possible instance of this building in the given settlement. Returns (BUILD_RESULT constant, building instance)."""
 		if not self.have_resources(settlement_manager):
@@ -40,6 +40,7 @@ class AbstractLumberjack(AbstractBuilding):
 class LumberjackEvaluator(BuildingEvaluator):
 	__template_outline = None
 	__radius_offsets = None
+	snapshot_personalities = ('LumberjackEvaluator', )
 
 	@classmethod
 	def __init_outline(cls):
@@ -91,6 +92,42 @@ class LumberjackEvaluator(BuildingEvaluator):
 		builder = BasicBuilder.create(BUILDINGS.LUMBERJACK, (x, y), orientation)
 		return LumberjackEvaluator(area_builder, builder, value)
 
+	@classmethod
+	def score_location(cls, snapshot, x, y, orientation):
+		if cls.__radius_offsets is None:
+			cls.__init_outline()
+
+		area_value = 0
+		coastline = snapshot.coastline
+		plan = snapshot.plan
+		personality = snapshot.get_personality('LumberjackEvaluator')
+		for dx, dy in cls.__radius_offsets:
+			coords = (x + dx, y + dy)
+			if coords in plan and coords not in coastline:
+				purpose = plan[coords]
+				if purpose == BUILDING_PURPOSE.NONE:
+					area_value += personality.new_tree
+				elif purpose == BUILDING_PURPOSE.TREE:
+					area_value += personality.shared_tree
+		area_value = min(area_value, personality.max_forest_value)
+		if area_value < personality.min_forest_value:
+			return None
+
+		alignment = snapshot.get_alignment_from_outline(cls._get_outline(x, y))
+		return area_value + alignment * personality.alignment_importance
+
+	@classmethod
+	def get_score_area(cls, x, y, orientation):
+		# the trees in range and the outline around them
+		margin = Entities.buildings[BUILDINGS.LUMBERJACK].radius + 1
+		width, height = Entities.buildings[BUILDINGS.LUMBERJACK].size
+		return Rect.init_from_topleft_and_size(x - margin, y - margin, width + 2 * margin, height + 2 * margin)
+
+	@classmethod
+	def create_from_value(cls, area_builder, x, y, orientation, value):
+		builder = BasicBuilder.create(BUILDINGS.LUMBERJACK, (x, y), orientation)
+		return LumberjackEvaluator(area_builder, builder, value)
+
 	@property
 	def purpose(self):
 		return BUILDING_PURPOSE.LUMBERJACK
@@ -31,6 +31,7 @@ class BuildingEvaluator(object):
 	log = logging.getLogger("ai.aiplayer.buildingevaluator")
 	need_collector_connection = True
 	record_plan_change = True
+	snapshot_personalities = None # names of the personality classes used by score_location, None if it isn't implemented
 
 	__slots__ = ('area_builder', 'builder', 'value')
 
@@ -140,6 +141,27 @@ class BuildingEvaluator(object):
 		"""Return an alignment value based on the outline of the given coordinates list."""
 		return cls._get_alignment_from_outline(area_builder, cls._get_outline_coords_list(coords_list))
 
+	@classmethod
+	def score_location(cls, snapshot, x, y, orientation):
+		"""
+		Return the value that create would give the evaluator at the location or None if it wouldn't create one.
+
+		Unlike create, this only uses the data in the PlanSnapshot, so it can be run in a worker process.
+		Subclasses that implement it have to set snapshot_personalities and implement create_from_value
+		and get_score_area.
+		"""
+		raise NotImplementedError('This function has to be overridden.')
+
+	@classmethod
+	def get_score_area(cls, x, y, orientation):
+		"""Return a Rect that contains all coordinates score_location looks at (used by the EvaluatorCache)."""
+		raise NotImplementedError('This function has to be overridden.')
+
+	@classmethod
+	def create_from_value(cls, area_builder, x, y, orientation, value):
+		"""Return the evaluator for a location that has been scored by score_location."""
+		raise NotImplementedError('This function has to be overridden.')
+
 	def __cmp__(self, other):
 		"""Objects of this class should never be compared to ensure deterministic ordering and good performance."""
 		raise NotImplementedError()
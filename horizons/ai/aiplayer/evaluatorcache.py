@@ -0,0 +1,105 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.util.python import decorators
+
+
+class EvaluatorCache(object):
+	"""
+	Remembers the values of evaluators at the locations they have been scored at.
+
+	A value stays valid until something changes in the area the evaluator looks at (see
+	BuildingEvaluator.get_score_area). Changes are registered with invalidate, which
+	marks the cells of CELL_SIZE x CELL_SIZE tiles that contain the changed coordinates.
+	This way only the values near a change have to be calculated again.
+
+	The cache isn't saved; after loading, the values are calculated again when they are needed.
+	The AI calculates missing values in advance, in small steps spread over several game ticks
+	(see AbstractBuilding.iter_update_evaluator_cache), for the buildings in the buildings list.
+	"""
+
+	CELL_SIZE = 4
+	MISSING = object() # returned by get if there is no valid value
+
+	def __init__(self):
+		super(EvaluatorCache, self).__init__()
+		self._generation = 0
+		self._cell_generations = {} # {(cell x, cell y): generation of the last change}
+		self._values = {} # {(evaluator class, x, y, orientation): (generation, value)}
+		self.buildings = [] # [AbstractBuilding, ...] whose evaluator values are cached, in the order of their first use
+		self.hits = 0
+		self.misses = 0
+
+	def invalidate(self, coords_list):
+		"""Register a change of the given coordinates."""
+		self._generation += 1
+		generation = self._generation
+		cell_size = self.CELL_SIZE
+		cell_generations = self._cell_generations
+		for x, y in coords_list:
+			cell_generations[(x // cell_size, y // cell_size)] = generation
+
+	def _get_area_generation(self, rect):
+		"""Return the generation of the last change in the cells that intersect the rect."""
+		cell_size = self.CELL_SIZE
+		cell_generations = self._cell_generations
+		result = 0
+		for cell_x in xrange(rect.left // cell_size, rect.right // cell_size + 1):
+			for cell_y in xrange(rect.top // cell_size, rect.bottom // cell_size + 1):
+				generation = cell_generations.get((cell_x, cell_y), 0)
+				if generation > result:
+					result = generation
+		return result
+
+	def _get_valid_entry(self, evaluator_class, x, y, orientation):
+		entry = self._values.get((evaluator_class, x, y, orientation))
+		if entry is not None and entry[0] >= self._get_area_generation(evaluator_class.get_score_area(x, y, orientation)):
+			return entry
+		return None
+
+	def get(self, evaluator_class, x, y, orientation):
+		"""Return the cached value (None if the location can't be used) or MISSING."""
+		entry = self._get_valid_entry(evaluator_class, x, y, orientation)
+		if entry is not None:
+			self.hits += 1
+			return entry[1]
+		self.misses += 1
+		return self.MISSING
+
+	def get_missing_locations(self, evaluator_class, locations):
+		"""Return the locations of the list of (x, y, orientation) that have no valid value."""
+		return [location for location in locations if self._get_valid_entry(evaluator_class, *location) is None]
+
+	def add_building(self, building):
+		"""Add the AbstractBuilding to the buildings list if it isn't in there yet."""
+		if building not in self.buildings:
+			self.buildings.append(building)
+
+	def set(self, evaluator_class, x, y, orientation, value):
+		self._values[(evaluator_class, x, y, orientation)] = (self._generation, value)
+
+	def __len__(self):
+		return len(self._values)
+
+	def __str__(self):
+		return "EvaluatorCache(%d values, %d hits, %d misses)" % (len(self), self.hits, self.misses)
+
+decorators.bind_all(EvaluatorCache)
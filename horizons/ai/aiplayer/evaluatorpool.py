@@ -0,0 +1,151 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import multiprocessing
+
+from horizons.ai.aiplayer.constants import BUILDING_PURPOSE
+from horizons.util.python import decorators
+from horizons.util.python.singleton import Singleton
+
+
+class PersonalityValues(object):
+	"""Picklable copy of the constants of a personality class."""
+
+	def __init__(self, personality):
+		for key, value in vars(personality).iteritems():
+			if not key.startswith('_'):
+				setattr(self, key, value)
+
+
+class PlanSnapshot(object):
+	"""
+	Compact, picklable copy of the data of a ProductionBuilder that the evaluators need to
+	score locations, see BuildingEvaluator.score_location.
+
+	The snapshot is independent of the game objects, so it can be sent to worker processes.
+	"""
+
+	def __init__(self, production_builder, personality_names):
+		"""
+		@param production_builder: ProductionBuilder instance
+		@param personality_names: names of the personality classes the evaluator uses
+		"""
+		settlement = production_builder.settlement
+		self.plan = dict((coords, purpose) for (coords, (purpose, _)) in production_builder.plan.iteritems())
+		self.roads = frozenset(production_builder.land_manager.roads)
+		self.coastline = frozenset(production_builder.land_manager.coastline)
+		self.settlement_coords = frozenset(settlement.ground_map)
+		self.obstacles = frozenset(coords for (coords, tile) in settlement.ground_map.iteritems()
+		                           if tile.object is not None and not tile.object.buildable_upon)
+
+		personality_manager = production_builder.owner.personality_manager
+		self.personalities = {}
+		for name in ('BuildingEvaluator', ) + tuple(personality_names):
+			self.personalities[name] = PersonalityValues(personality_manager.get(name))
+
+	def get_personality(self, name):
+		return self.personalities[name]
+
+	def get_alignment_from_outline(self, outline_coords_list):
+		"""Same as BuildingEvaluator._get_alignment_from_outline."""
+		personality = self.personalities['BuildingEvaluator']
+		alignment = 0
+		for coords in outline_coords_list:
+			if coords in self.roads:
+				alignment += personality.alignment_road
+			elif coords in self.plan:
+				if self.plan[coords] != BUILDING_PURPOSE.NONE:
+					alignment += personality.alignment_production_building
+			elif coords in self.settlement_coords:
+				if coords in self.obstacles:
+					alignment += personality.alignment_other_building
+			else:
+				alignment += personality.alignment_edge
+		return alignment
+
+
+def _score_locations(args):
+	"""Score a part of the locations in a worker process."""
+	evaluator_class, snapshot, locations = args
+	return [evaluator_class.score_location(snapshot, x, y, orientation) for (x, y, orientation) in locations]
+
+
+class EvaluatorPool(object):
+	"""
+	Scores the potential locations of a building in worker processes.
+
+	The locations are split into contiguous chunks, one per worker, and the results are put
+	together in the original order. The values are the same as the ones of
+	BuildingEvaluator.create, so the AI makes the same decisions with and without workers.
+
+	Sending the snapshot to the workers is not free: small location lists are scored in the
+	main process.
+	"""
+
+	__metaclass__ = Singleton
+
+	log = logging.getLogger("ai.aiplayer.evaluatorpool")
+
+	workers = 0 # number of worker processes, 0 disables the pool (set by --ai-workers)
+	min_locations = 400 # smaller location lists are scored in the main process
+
+	def __init__(self):
+		super(EvaluatorPool, self).__init__()
+		self._pool = None
+
+	@property
+	def enabled(self):
+		return self.workers > 0
+
+	def _get_pool(self):
+		if self._pool is None:
+			self.log.info('starting %d evaluator worker processes', self.workers)
+			self._pool = multiprocessing.Pool(self.workers)
+		return self._pool
+
+	def score(self, evaluator_class, snapshot, locations):
+		"""
+		Return the values of the locations, None for locations that can't be used.
+
+		@param evaluator_class: BuildingEvaluator subclass that implements score_location
+		@param snapshot: PlanSnapshot instance
+		@param locations: list of (x, y, orientation)
+		"""
+		if not self.enabled or len(locations) < self.min_locations:
+			return _score_locations((evaluator_class, snapshot, locations))
+
+		chunk_size = (len(locations) + self.workers - 1) // self.workers
+		tasks = [(evaluator_class, snapshot, locations[i : i + chunk_size]) for i in xrange(0, len(locations), chunk_size)]
+		values = []
+		for chunk_values in self._get_pool().map(_score_locations, tasks):
+			values.extend(chunk_values)
+		return values
+
+	def end(self):
+		if self._pool is not None:
+			self._pool.terminate()
+			self._pool.join()
+			self._pool = None
+
+decorators.bind_all(PersonalityValues)
+decorators.bind_all(PlanSnapshot)
+decorators.bind_all(EvaluatorPool)
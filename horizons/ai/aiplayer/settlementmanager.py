@@ -22,6 +22,7 @@
 import logging
 
 from horizons.ai.aiplayer.goal.combatship import CombatShipGoal
+from horizons.ai.aiplayer.evaluatorcache import EvaluatorCache
 from horizons.ai.aiplayer.villagebuilder import VillageBuilder
 from horizons.ai.aiplayer.productionbuilder import ProductionBuilder
 from horizons.ai.aiplayer.productionchain import ProductionChain
@@ -113,6 +114,7 @@ class SettlementManager(WorldObject):
 
 		# initialize caches
 		self.__resident_resource_usage_cache = {}
+		self.evaluator_cache = EvaluatorCache()
 
 	def __init_goals(self):
 		"""Initialize the list of all the goals the settlement can use."""
@@ -408,8 +410,16 @@ class SettlementManager(WorldObject):
 			self._add_goals(goals)
 			self._end_general_tick()
 
+	def iter_update_evaluator_cache(self):
+		"""Generator that calculates the missing evaluator values of the buildings in the
+		evaluator cache in steps, see AbstractBuilding.iter_update_evaluator_cache."""
+		for building in list(self.evaluator_cache.buildings):
+			for _ in building.iter_update_evaluator_cache(self):
+				yield
+
 	def add_building(self, building):
 		"""Called when a new building is added to the settlement (the building already exists during the call)."""
+		self.evaluator_cache.invalidate(building.position.tuple_iter())
 		coords = building.position.origin.to_tuple()
 		if coords in self.village_builder.plan:
 			self.village_builder.add_building(building)
@@ -418,6 +428,7 @@ class SettlementManager(WorldObject):
 
 	def remove_building(self, building):
 		"""Called when a building is removed from the settlement (the building still exists during the call)."""
+		self.evaluator_cache.invalidate(building.position.tuple_iter())
 		coords = building.position.origin.to_tuple()
 		if coords in self.village_builder.plan:
 			self.village_builder.remove_building(building)
@@ -437,6 +448,7 @@ class SettlementManager(WorldObject):
 		* TODO: if the village area takes too much of the total area then remove / reduce the remaining sections
 		"""
 
+		self.evaluator_cache.invalidate(coords_list)
 		self.land_manager.handle_lost_area(coords_list)
 		self.village_builder.handle_lost_area(coords_list)
 		self.production_builder.handle_lost_area(coords_list)
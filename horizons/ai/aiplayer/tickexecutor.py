@@ -0,0 +1,92 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.scheduler import Scheduler
+from horizons.util.python import decorators
+from horizons.util.python.callback import Callback
+
+
+class TickExecutor(object):
+	"""
+	Runs the work of an AI tick cooperatively, spread over several game ticks.
+
+	The work is a generator that yields after every step (e.g. the update of one goal).
+	At most `budget` steps are executed per game tick, the rest is continued in the
+	following game ticks. The budget counts steps instead of measuring time, so the
+	AI behaves the same on every machine and the game stays deterministic.
+
+	If new work is started while the old one isn't finished yet, the old work is
+	completed first, so the work can't pile up.
+
+	Work in progress can't be saved (generators can't be pickled), so it has to be
+	finished before saving. After loading, the AI continues with its next tick.
+	Autosaves wait until no work is in progress, so they don't change the game.
+	"""
+
+	def __init__(self, owner, budget):
+		"""
+		@param owner: the object that schedules the continuations, usually the AIPlayer
+		@param budget: maximum number of steps per game tick
+		"""
+		super(TickExecutor, self).__init__()
+		self.owner = owner
+		self.budget = budget
+		self._work = None # the generator that is being executed
+		self._continue_callback = Callback(self._continue)
+
+	@property
+	def busy(self):
+		"""Return True if some work hasn't been completed yet."""
+		return self._work is not None
+
+	def start(self, work):
+		"""Execute the first steps of the generator work and schedule the rest."""
+		self.finish()
+		self._work = work
+		self._run(self.budget)
+
+	def finish(self):
+		"""Complete the current work immediately."""
+		if self._work is not None:
+			Scheduler().rem_call(self.owner, self._continue_callback)
+			self._run(None)
+
+	def cancel(self):
+		"""Drop the current work without completing it."""
+		if self._work is not None:
+			Scheduler().rem_call(self.owner, self._continue_callback)
+			self._work = None
+
+	def _continue(self):
+		self._run(self.budget)
+
+	def _run(self, budget):
+		"""Execute at most budget steps (all of them if budget is None)."""
+		steps = 0
+		work = self._work
+		for _ in work:
+			steps += 1
+			if budget is not None and steps >= budget:
+				Scheduler().add_new_object(self._continue_callback, self.owner, run_in=1)
+				return
+		self._work = None
+
+decorators.bind_all(TickExecutor)
@@ -20,7 +20,7 @@
 # ###################################################
 
 from horizons.component import Component
-from horizons.messaging import InstanceInventoryUpdated
+from horizons.messaging import InstanceInventoryUpdated, ResourceAvailable
 from horizons.scheduler import Scheduler
 from horizons.world.storage import (
 	PositiveSizedSlotStorage, PositiveStorage, PositiveSizedSpecializedStorage,
@@ -84,8 +84,12 @@ class StorageComponent(Component):
 
 		Masks the message sender to be `self.instance` rather than self because
 		that is what we are interested in, usually.
+		Additionally sends a ResourceAvailable message if some amounts have increased.
 		"""
 		InstanceInventoryUpdated.broadcast(self.instance, self.inventory._storage)
+		increased = self.inventory.get_increased_resources()
+		if increased:
+			ResourceAvailable.broadcast(self.instance, increased)
 
 	@classmethod
 	def get_instance(cls, arguments):
@@ -72,7 +72,7 @@ class VERSION:
 	REQUIRED_FIFE_VERSION = (REQUIRED_FIFE_MAJOR_VERSION, REQUIRED_FIFE_MINOR_VERSION, REQUIRED_FIFE_PATCH_VERSION)
 
 	## +=1 this if you changed the savegame "api"
-	SAVEGAMEREVISION = 74
+	SAVEGAMEREVISION = 75
 
 	@staticmethod
 	def string():
@@ -402,6 +402,7 @@ class GAME:
 
 	WORLD_WORLDID = 0 # worldid of World object
 	MAX_TICKS = None # exit after on tick MAX_TICKS (disabled by setting to None)
+	PROFILE_TICKS = None # number of ticks the tick profiler keeps (disabled by setting to None)
 
 # Map related constants
 class MAP:
@@ -467,6 +468,7 @@ class WILD_ANIMAL:
 class COLLECTORS:
 	DEFAULT_WORK_DURATION = 16 # how many ticks collectors pretend to work at target
 	DEFAULT_WAIT_TICKS = 32 # how long collectors wait before again looking for a job
+	NO_JOB_WAIT_TICKS = 256 # how long collectors wait if nothing changes that could give them a job
 	DEFAULT_STORAGE_SIZE = 8
 	STATISTICAL_WINDOW = 1000 # How many latest ticks are relevant for calculating how busy a collector is
 
@@ -529,6 +531,9 @@ class PATHS:
 	DEFAULT_WINDOW_ICON_PATH = os.path.join("content", "gui", "images", "logos", "uh_32.png")
 	MAC_WINDOW_ICON_PATH = os.path.join("content", "gui", "icons", "Icon.icns")
 	ATLAS_METADATA_PATH = os.path.join(USER_DIR, "atlas-metadata.cache")
+	PREVIEW_CACHE_PATH = os.path.join(USER_DIR, "previews.sqlite")
+	SAVEGAME_CATALOG_PATH = os.path.join(USER_DIR, "savegames.sqlite")
+	GAME_DB_SNAPSHOT_PATH = os.path.join(USER_DIR, "gamedata.sqlite")
 
 	# paths relative to uh dir
 	ACTION_SETS_DIRECTORY = os.path.join("content", "gfx")
@@ -73,6 +73,7 @@ from horizons.constants import PATHS
 from horizons.util.dbreader import DbReader
 from horizons.util.loaders.actionsetloader import ActionSetLoader
 from horizons.util.loaders.tilesetloader import TileSetLoader
+from horizons.util.maxrects import MaxRectsBin
 
 
 class AtlasEntry(object):
@@ -94,29 +95,20 @@ class AtlasBook(object):
 
 	def _clear(self):
 		self.location = {}
-		self.cur_x = 0
-		self.cur_y = 0
-		self.cur_h = 0
+		self.packer = MaxRectsBin(self.max_size, self.max_size)
 
 	def add(self, w, h, path):
 		"""Return true if and only if the image was added."""
-		if self.cur_x + w <= self.max_size and self.cur_y + h <= self.max_size:
-			# add to the end of the current row
-			self.location[path] = AtlasEntry(self.cur_x, self.cur_y, w, h, os.path.getmtime(path))
-			self.cur_x += w
-			self.cur_h = max(self.cur_h, h)
-			return True
-
-		if w <= self.max_size and self.cur_y + self.cur_h + h <= self.max_size:
-			# add to the beginning of the next row
-			self.cur_x = w
-			self.cur_y += self.cur_h
-			self.cur_h = h
-			self.location[path] = AtlasEntry(0, self.cur_y, w, h, os.path.getmtime(path))
-			return True
-
-		# unable to fit in the given space with the current algorithm
-		return False
+		position = self.packer.insert(w, h)
+		if position is None:
+			return False
+		self.location[path] = AtlasEntry(position[0], position[1], w, h, os.path.getmtime(path))
+		return True
+
+	def remove(self, path):
+		"""Remove an image, its space can be used by other images afterwards."""
+		entry = self.location.pop(path)
+		self.packer.remove(entry.x, entry.y, entry.width, entry.height)
 
 	def save(self):
 		"""Write the entire image to a file with the given path."""
@@ -140,6 +132,20 @@ class AtlasBook(object):
 def save_atlas_book(book):
 	book.save()
 
+def get_image_dimensions(path):
+	with open(path, 'rb') as png_file:
+		return Image.open(png_file).size
+
+def _map_in_pool(function, items):
+	"""Return map(function, items), computed by a pool of processes."""
+	processes = max(1, min(len(items), multiprocessing.cpu_count() - 1))
+	pool = multiprocessing.Pool(processes=processes)
+	try:
+		return pool.map(function, items)
+	finally:
+		pool.close()
+		pool.join()
+
 
 class ImageSetManager(object):
 	def __init__(self, initial_data, path):
@@ -187,7 +193,7 @@ class ImageSetManager(object):
 class AtlasGenerator(object):
 	log = logging.getLogger("generate_atlases")
 	# increment this when the structure of the atlases changes
-	current_version = 1
+	current_version = 2
 
 	def __init__(self, max_size):
 		self.version = self.current_version
@@ -207,19 +213,16 @@ class AtlasGenerator(object):
 
 	@classmethod
 	def _save_books(cls, books):
-		processes = max(1, min(len(books), multiprocessing.cpu_count() - 1))
-		pool = multiprocessing.Pool(processes=processes)
-		for book in books:
-			pool.apply_async(save_atlas_book, [book])
-		pool.close()
-		pool.join()
+		_map_in_pool(save_atlas_book, list(books))
 
-	def save(self):
+	def _save_atlas_db(self):
 		with open(PATHS.ATLAS_DB_PATH, 'wb') as atlas_db_file:
 			atlas_db_file.write("CREATE TABLE atlas('atlas_id' INTEGER NOT NULL PRIMARY KEY, 'atlas_path' TEXT NOT NULL);\n")
 			for book in self.books:
 				atlas_db_file.write("INSERT INTO atlas VALUES(%d, '%s');\n" % (book.id, book.path))
 
+	def save(self):
+		self._save_atlas_db()
 		self._save_sets()
 		self._save_books(self.books)
 		self._save_metadata()
@@ -227,7 +230,12 @@ class AtlasGenerator(object):
 	def _add_atlas_book(self):
 		self.books.append(AtlasBook(len(self.books), self.max_size))
 
+	def _check_size(self, w, h, path):
+		assert w <= self.max_size and h <= self.max_size, 'Image too large: %s %s' % (path, (w, h))
+
 	def _add_image(self, w, h, path):
+		"""Add an image to the last book or a new one, which keeps images of a set together."""
+		self._check_size(w, h, path)
 		if not self.books:
 			self._add_atlas_book()
 
@@ -237,10 +245,23 @@ class AtlasGenerator(object):
 
 		self.atlas_book_lookup[path] = self.books[-1]
 
+	def _insert_image(self, w, h, path):
+		"""Add an image to the first book with enough free space or a new one.
+		@return: the book"""
+		self._check_size(w, h, path)
+		for book in self.books:
+			if book.add(w, h, path):
+				break
+		else:
+			self._add_atlas_book()
+			book = self.books[-1]
+			assert book.add(w, h, path)
+		self.atlas_book_lookup[path] = book
+		return book
+
 	@classmethod
 	def _get_dimensions(cls, path):
-		with open(path, 'rb') as png_file:
-			return Image.open(png_file).size
+		return get_image_dimensions(path)
 
 	def _get_paths(self):
 		paths = []
@@ -254,16 +275,11 @@ class AtlasGenerator(object):
 
 		self._init_sets()
 		paths = self._get_paths()
-		data = []
-		for path in paths:
-			w, h = self._get_dimensions(path)
-			data.append((w * h, h, w, path))
-
-		assert data, 'No files found.'
-		assert (data[0][1] <= self.max_size and data[0][2] <= self.max_size), 'Image too large: ' + str(data[0][1:])
+		assert paths, 'No files found.'
 
-		for _, h, w, path in data:
-			self._add_image(w, h, path)
+		for path, (w, h) in zip(paths, _map_in_pool(get_image_dimensions, paths)):
+			if path not in self.atlas_book_lookup:
+				self._add_image(w, h, path)
 		self.save()
 
 	def _update_selected_books(self, update_books):
@@ -276,57 +292,71 @@ class AtlasGenerator(object):
 		self._save_books(update_books)
 
 	def update(self):
+		"""Update the atlases for added, removed and modified images.
+		Only the books that contain new or modified images are saved again, new images
+		are put into the free space of the existing books if possible."""
 		self._init_sets()
 		paths = self._get_paths()
+		path_set = set(paths)
+		num_books = len(self.books)
+
+		# the space of removed images becomes free, the books don't have to be redrawn for that
+		removed_paths = set(self.atlas_book_lookup) - path_set
+		for path in removed_paths:
+			self.log.info('An image has been removed: %s', path)
+			self.atlas_book_lookup.pop(path).remove(path)
 
-		# if the sizes don't match then something has been deleted or added
-		recreate_all = False
-		if len(set(paths)) != len(self.atlas_book_lookup):
-			recreate_all = True
-			self.log.info("The old number of images (%d) doesn't match the new (%d)",
-			              len(self.atlas_book_lookup), len(set(paths)))
-
-		recreate_books = set()
-		if not recreate_all:
-			for path in paths:
-				if path not in self.atlas_book_lookup:
+		update_books = set()
+		new_paths = []
+		for path in paths:
+			if path not in self.atlas_book_lookup:
+				if path not in new_paths:
 					self.log.info('A new image has been added: %s', path)
-					recreate_all = True
-					break
-
-				last_modified = os.path.getmtime(path)
-				book = self.atlas_book_lookup[path]
-				entry = book.location[path]
-				if last_modified == entry.last_modified:
-					continue
-
-				self.log.info('An image has been modified: %s', path)
-				w, h = self._get_dimensions(path)
-				if w > entry.width or h > entry.height:
-					self.log.info('An image is larger than before: %s', path)
-					recreate_all = True
-					break
-
-				if book not in recreate_books:
-					self.log.info('Need to recreate %s', book.path)
-					recreate_books.add(book)
+					new_paths.append(path)
+				continue
 
-				# update the entry
-				entry.width = w
-				entry.height = h
-				entry.last_modified = last_modified
+			last_modified = os.path.getmtime(path)
+			book = self.atlas_book_lookup[path]
+			entry = book.location[path]
+			if last_modified == entry.last_modified:
+				continue
 
-		if recreate_all:
-			self.log.info('Forced to recreate the entire atlas.')
-			return False
+			self.log.info('An image has been modified: %s', path)
+			w, h = self._get_dimensions(path)
+			if w > entry.width or h > entry.height:
+				self.log.info('An image is larger than before: %s', path)
+				book.remove(path)
+				del self.atlas_book_lookup[path]
+				new_paths.append(path)
+				continue
+
+			if book not in update_books:
+				self.log.info('Need to recreate %s', book.path)
+				update_books.add(book)
+
+			# update the entry
+			entry.width = w
+			entry.height = h
+			entry.last_modified = last_modified
+
+		if new_paths:
+			for path, (w, h) in zip(new_paths, _map_in_pool(get_image_dimensions, new_paths)):
+				book = self._insert_image(w, h, path)
+				if book not in update_books:
+					self.log.info('Need to recreate %s', book.path)
+					update_books.add(book)
+
+		if len(self.books) != num_books:
+			self._save_atlas_db()
 
-		if recreate_books:
+		if update_books:
 			self.log.info('Updated selected books')
-			self._update_selected_books(recreate_books)
-			self._save_metadata()
+			self._update_selected_books(update_books)
 		else:
 			# the sets have to always be saved because the tm_N files are not otherwise taken into account
 			self._save_sets()
+		if update_books or removed_paths:
+			self._save_metadata()
 		return True
 
 	def __getstate__(self):
@@ -37,6 +37,7 @@ from horizons.gui.modules.editorstartmenu import EditorStartMenu
 from horizons.gui.modules import (HelpDialog, SingleplayerMenu, MultiplayerMenu,
                                   SelectSavegameDialog, LoadingScreen, SettingsDialog)
 from horizons.gui.widgets.fpsdisplay import FPSDisplay
+from horizons.gui.widgets.tickprofilerdisplay import TickProfilerDisplay
 from horizons.gui.windows import WindowManager, Window
 
 
@@ -116,6 +117,7 @@ class Gui(object):
 		self.settings_dialog = SettingsDialog(self.windows)
 		self.mainmenu = MainMenu(self, self.windows)
 		self.fps_display = FPSDisplay()
+		self.tick_profiler_display = TickProfilerDisplay()
 
 	def show_main(self):
 		"""Shows the main menu """
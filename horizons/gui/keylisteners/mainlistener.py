@@ -64,6 +64,8 @@ class MainListener(fife.IKeyListener, fife.ICommandListener, LivingObject):
 			self.gui.on_return()
 		elif action == _Actions.CONSOLE:
 			self.gui.fps_display.toggle()
+			if self.gui.tick_profiler_display.is_available():
+				self.gui.tick_profiler_display.toggle()
 		elif action == _Actions.HELP:
 			self.gui.on_help()
 		elif action == _Actions.SCREENSHOT:
@@ -28,6 +28,7 @@ import horizons.main
 from horizons.component.ambientsoundcomponent import AmbientSoundComponent
 from horizons.constants import MULTIPLAYER
 from horizons.gui.modules import PlayerDataSelection
+from horizons.gui.modules.singleplayermenu import get_map_preview_data
 from horizons.gui.util import load_uh_widget
 from horizons.gui.widgets.icongroup import hr as HRule
 from horizons.gui.widgets.imagebutton import OkButton, CancelButton
@@ -37,8 +38,8 @@ from horizons.network import enet
 from horizons.network.networkinterface import NetworkInterface
 from horizons.savegamemanager import SavegameManager
 from horizons.util.color import Color
+from horizons.util.previewcache import PreviewCache
 from horizons.util.python.callback import Callback
-from horizons.world import load_raw_world
 from horizons.extscheduler import ExtScheduler
 
 
@@ -312,6 +313,10 @@ class CreateGame(Window):
 			'playerlimit': range(2, MULTIPLAYER.MAX_PLAYER_COUNT)
 		})
 
+		# render the previews of the other maps in the background
+		minimap_icon = self._gui.findChild(name='map_preview_minimap')
+		PreviewCache.start_worker((minimap_icon.width, minimap_icon.height))
+
 		if self._maps_display: # select first entry
 			self._gui.distributeData({
 				'maplist': 0,
@@ -363,12 +368,13 @@ class CreateGame(Window):
 		if self._map_preview:
 			self._map_preview.end()
 
-		world = load_raw_world(map_file)
+		minimap_icon = self._gui.findChild(name='map_preview_minimap')
+		data = get_map_preview_data(map_file, (minimap_icon.width, minimap_icon.height))
 		self._map_preview = Minimap(
-			self._gui.findChild(name='map_preview_minimap'),
+			minimap_icon,
 			session=None,
 			view=None,
-			world=world,
+			world=None,
 			targetrenderer=horizons.globals.fife.targetrenderer,
 			imagemanager=horizons.globals.fife.imagemanager,
 			cam_border=False,
@@ -377,7 +383,7 @@ class CreateGame(Window):
 			on_click=None,
 			preview=True)
 
-		self._map_preview.draw()
+		self._map_preview.draw_data(data)
 
 
 class GameLobby(Window):
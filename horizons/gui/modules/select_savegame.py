@@ -31,6 +31,7 @@ from horizons.gui.util import load_uh_widget
 from horizons.gui.widgets.imagebutton import OkButton, CancelButton, DeleteButton
 from horizons.gui.windows import Dialog
 from horizons.savegamemanager import SavegameManager
+from horizons.util.previewcache import PreviewCache
 from horizons.util.python.callback import Callback
 from horizons.util.savegameupgrader import SavegameUpgrader
 
@@ -86,6 +87,8 @@ class SelectSavegameDialog(Dialog):
 			if not self._map_files:
 				self._windows.open_popup(_("No saved games"), _("There are no saved games to load."))
 				return False
+			# extract the screenshots of all savegames in the background
+			PreviewCache.start_worker(None)
 		elif self._mode == 'save':
 			self._map_files, self._map_file_display = SavegameManager.get_regular_saves()
 		elif self._mode == 'editor-save':
@@ -200,7 +203,11 @@ class SelectSavegameDialog(Dialog):
 				# this was a click in the savegame list, but not on an element
 				# it happens when the savegame list is empty
 				return
-			savegame_info = SavegameManager.get_metadata(map_file)
+			# the screenshot is usually in the preview cache already
+			screenshot = PreviewCache.get(map_file, PreviewCache.SCREENSHOT)
+			savegame_info = SavegameManager.get_metadata(map_file, include_screenshot=screenshot is None)
+			if screenshot is not None:
+				savegame_info['screenshot'] = screenshot
 
 			if savegame_info.get('screenshot'):
 				# try to find a writable location, that is accessible via relative paths
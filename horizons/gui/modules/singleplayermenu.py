@@ -40,6 +40,7 @@ from horizons.gui.widgets.minimap import Minimap
 from horizons.gui.windows import Window
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler, InvalidScenarioFileFormat
+from horizons.util.previewcache import PreviewCache
 from horizons.util.python.callback import Callback
 from horizons.util.random_map import generate_random_map, generate_random_seed
 from horizons.util.shapes import Rect
@@ -394,6 +395,10 @@ class FreeMapsWidget(object):
 		self._gui.mapEvents({
 			'maplist/action': self._update_map_infos,
 		})
+		# render the previews of the other maps in the background
+		minimap_icon = self._gui.findChild(name='map_preview_minimap')
+		PreviewCache.start_worker((minimap_icon.width, minimap_icon.height))
+
 		if maps_display: # select first entry
 			self._gui.distributeData({'maplist': 0})
 			self._update_map_infos()
@@ -421,12 +426,13 @@ class FreeMapsWidget(object):
 		if self._map_preview:
 			self._map_preview.end()
 
-		world = load_raw_world(map_file)
+		minimap_icon = self._gui.findChild(name='map_preview_minimap')
+		data = get_map_preview_data(map_file, (minimap_icon.width, minimap_icon.height))
 		self._map_preview = Minimap(
-			self._gui.findChild(name='map_preview_minimap'),
+			minimap_icon,
 			session=None,
 			view=None,
-			world=world,
+			world=None,
 			targetrenderer=horizons.globals.fife.targetrenderer,
 			imagemanager=horizons.globals.fife.imagemanager,
 			cam_border=False,
@@ -435,7 +441,7 @@ class FreeMapsWidget(object):
 			on_click=None,
 			preview=True)
 
-		self._map_preview.draw()
+		self._map_preview.draw_data(data)
 
 
 class ScenarioMapWidget(object):
@@ -597,11 +603,9 @@ class ScenarioMapWidget(object):
 		return scenario[language_index][1]
 
 
-def generate_random_minimap(size, parameters):
-	"""Called as subprocess, calculates minimap data and passes it via string via stdout"""
-	# called as standalone basically, so init everything we need
+def _init_minimap_generation():
+	"""Sets up what a standalone process needs to load maps and calculate minimaps."""
 	from horizons.entities import Entities
-	from horizons.ext.dummy import Dummy
 	from horizons.main import _create_main_db
 
 	if not VERSION.IS_DEV_VERSION:
@@ -620,7 +624,11 @@ def generate_random_minimap(size, parameters):
 	horizons.globals.fife.init_animation_loader(not VERSION.IS_DEV_VERSION)
 	Entities.load_grounds(db, load_now=False) # create all references
 
-	map_file = generate_random_map(*parameters)
+
+def _calculate_minimap_data(map_file, size):
+	"""Returns the minimap data (see Minimap.dump_data) of a map file."""
+	from horizons.ext.dummy import Dummy
+
 	world = load_raw_world(map_file)
 	location = Rect.init_from_topleft_and_size_tuples((0, 0), size)
 	minimap = Minimap(
@@ -633,6 +641,52 @@ def generate_random_minimap(size, parameters):
 		cam_border=False,
 		use_rotation=False,
 		preview=True)
+	return minimap.dump_data()
+
+
+def get_map_preview_data(map_file, size):
+	"""Returns the minimap data of a map file, from the PreviewCache if it has been
+	calculated before."""
+	data = PreviewCache.get(map_file, PreviewCache.MINIMAP, size)
+	if data is None:
+		data = _calculate_minimap_data(map_file, size)
+		PreviewCache.set(map_file, PreviewCache.MINIMAP, data, size)
+	return data
+
+
+def generate_random_minimap(size, parameters):
+	"""Called as subprocess, calculates minimap data and passes it via string via stdout"""
+	# called as standalone basically, so init everything we need
+	_init_minimap_generation()
+
+	map_file = generate_random_map(*parameters)
 
 	# communicate via stdout
-	print minimap.dump_data()
+	print _calculate_minimap_data(map_file, size)
+
+
+def generate_previews(minimap_size):
+	"""Called as subprocess, fills the PreviewCache with the minimaps of all maps
+	and the screenshots of all savegames.
+	@param minimap_size: (width, height) of the minimaps or None to skip them"""
+	log = logging.getLogger("gui.singleplayermenu")
+
+	if minimap_size is not None:
+		_init_minimap_generation()
+		minimap_size = tuple(minimap_size)
+		for map_file in SavegameManager.get_maps(include_displaynames=False)[0]:
+			if PreviewCache.get(map_file, PreviewCache.MINIMAP, minimap_size) is not None:
+				continue
+			try:
+				data = _calculate_minimap_data(map_file, minimap_size)
+			except Exception:
+				log.exception("Failed to generate the preview of %s", map_file)
+				continue
+			PreviewCache.set(map_file, PreviewCache.MINIMAP, data, minimap_size)
+
+	for savegame in SavegameManager.get_saves(include_displaynames=False)[0]:
+		if PreviewCache.get(savegame, PreviewCache.SCREENSHOT) is None:
+			screenshot = SavegameManager.get_metadata(savegame)['screenshot']
+			PreviewCache.set(savegame, PreviewCache.SCREENSHOT, screenshot or '')
+
+	PreviewCache.prune()
@@ -32,7 +32,7 @@ from horizons.util.python import decorators
 from horizons.util.shapes import Circle, Point, Rect
 from horizons.command.unit import Act
 from horizons.component.namedcomponent import NamedComponent
-from horizons.messaging import SettingChanged
+from horizons.messaging import SettingChanged, SettlementRangeChanged
 
 
 class Minimap(object):
@@ -57,6 +57,10 @@ class Minimap(object):
 		"highlight": (255,   0,   0),  # for events
 	}
 
+	# palette indices of the raster, player colors are appended when they are needed
+	WATER_INDEX = 0
+	ISLAND_INDEX = 1
+
 	WAREHOUSE_IMAGE = "content/gui/icons/minimap/warehouse.png"
 	SHIP_NEUTRAL = "content/gui/icons/minimap/ship_neutral.png"
 	SHIP_PIRATE = "content/gui/icons/minimap/pirate.png"
@@ -124,6 +128,15 @@ class Minimap(object):
 
 		self._image_size_cache = {} # internal detail
 
+		# the computed minimap as palette indices, see _recalculate
+		self._raster = None # bytearray, pixel (x, y) is at y * width + x
+		self._pixel_world_xs = None # [real world x of minimap column x, ...]
+		self._pixel_world_ys = None
+		self._palette = [self.COLORS["water"], self.COLORS["island"]]
+		self._palette_indices = {} # {color: index in self._palette}
+		self._dirty_areas = set() # {(left, top, right, bottom), ...} in minimap coords
+		self._last_ship_state = None
+
 		self.imagemanager = imagemanager
 
 		self.minimap_image = _MinimapImage(self, targetrenderer)
@@ -145,6 +158,8 @@ class Minimap(object):
 		but you can disable it with this and enable again with draw().
 		Stops all updates."""
 		ExtScheduler().rem_all_classinst_calls(self)
+		self._dirty_areas.clear()
+		SettlementRangeChanged.discard(self._on_settlement_range_changed)
 		if self.view is not None:
 			self.view.discard_change_listener(self.update_cam)
 
@@ -180,6 +195,11 @@ class Minimap(object):
 			self.minimap_image.reset()
 			self.icon.image = fife.GuiImage(self.minimap_image.image)
 
+		# ownership changes are drawn as soon as the settlement broadcasts them
+		if self.session is not None:
+			SettlementRangeChanged.discard(self._on_settlement_range_changed)
+			SettlementRangeChanged.subscribe(self._on_settlement_range_changed)
+
 		self.update_cam()
 		self._recalculate()
 		if not self.preview:
@@ -207,9 +227,11 @@ class Minimap(object):
 		# XXX There have been reports about `data` containing Fife debug
 		# output (e.g. #2193). As temporary workaround, we try to only
 		# parse what looks like valid json in there and ignore the rest.
-		found_json = re.findall(r'\[\[.*\]\]', data)[0]
+		# A map without islands results in an empty list.
+		found_json = re.findall(r'\[\[.*\]\]', data)
+		points = json.loads(found_json[0]) if found_json else []
 
-		for x, y, r, g, b in json.loads(found_json):
+		for x, y, r, g, b in points:
 			point.set(x, y)
 			draw_point(render_name, point, r, g, b)
 
@@ -262,17 +284,40 @@ class Minimap(object):
 		@param tup: (x, y)"""
 		if self.world is None or not self.world.inited:
 			return # don't draw while loading
-		minimap_point = self._world_to_minimap(tup, self._get_rotation_setting())
-		world_to_minimap = self._world_to_minimap_ratio
-		# TODO: remove this remnant of the old implementation, perhaps by refactoring recalculate()
-		minimap_point = (
-		  minimap_point[0] + self.location.left,
-		  minimap_point[1] + self.location.top,
-		)
-		rect = Rect.init_from_topleft_and_size(minimap_point[0], minimap_point[1],
-								                           int(round(1/world_to_minimap[0])) + 1,
-								                           int(round(1/world_to_minimap[1])) + 1)
-		self._recalculate(rect)
+		if self._raster is None:
+			return # the next draw() computes everything
+		x, y = self._world_coords_to_minimap_coords(tup)
+		x -= self.location.left
+		y -= self.location.top
+		# a tile may cover several pixels, the pixel showing it may also be left of / above the rounded position
+		width = int(round(1 / self._world_to_minimap_ratio[0])) + 1
+		height = int(round(1 / self._world_to_minimap_ratio[1])) + 1
+		area = (max(0, x - 1), max(0, y - 1), min(self.location.width, x + width), min(self.location.height, y + height))
+		if area[0] >= area[2] or area[1] >= area[3]:
+			return
+
+		if not self._dirty_areas:
+			# many tiles change at once (e.g. when a settlement grows), redraw them together
+			ExtScheduler().add_new_object(self._redraw_dirty_areas, self, run_in=0)
+		self._dirty_areas.add(area)
+
+	def _on_settlement_range_changed(self, message):
+		for tile in message.changed_tiles:
+			self._update((tile.x, tile.y))
+
+	def _redraw_dirty_areas(self):
+		"""Recalculate the areas marked by _update and draw the pixels that have changed."""
+		dirty_areas = sorted(self._dirty_areas)
+		self._dirty_areas.clear()
+		if self._raster is None or self.world is None:
+			return
+
+		changed_pixels = []
+		for area in dirty_areas:
+			changed_pixels.extend(self._calculate_area(*area))
+		if changed_pixels:
+			self.minimap_image.set_drawing_enabled()
+			self._draw_pixels(changed_pixels)
 
 	def use_overlay_icon(self, icon):
 		"""Configures icon so that clicks get mapped here.
@@ -363,7 +408,9 @@ class Minimap(object):
 				self.icon.hide_tooltip()
 				return
 
-			tile = self.world.get_tile(Point(*coords))
+			# settlements are only on islands, world.get_tile would create the tiles of the sea
+			island = self.world.get_island_tuple(coords)
+			tile = island.ground_map[coords] if island is not None else None
 			if tile is not None and tile.settlement is not None:
 				new_helptext = tile.settlement.get_component(NamedComponent).name
 				if self.icon.helptext != new_helptext:
@@ -469,109 +516,161 @@ class Minimap(object):
 
 		return True
 
-	def _recalculate(self, where=None, dump_data=False):
-		"""Calculate which pixel of the minimap should display what and draw it
-		@param where: Rect of minimap coords. Defaults to self.location
-		@param dump_data: Don't draw but return calculated data"""
-		self.minimap_image.set_drawing_enabled()
-
-		rt = self.minimap_image.rendertarget
-		render_name = self._get_render_name("base")
-
-		if where is None:
-			where = self.location
-			rt.removeAll(render_name)
-
-		# calculate which area of the real map is mapped to which pixel on the minimap
-		pixel_per_coord_x, pixel_per_coord_y = self._world_to_minimap_ratio
-
-		# calculate values here so we don't have to do it in the loop
-		pixel_per_coord_x_half_as_int = int(pixel_per_coord_x/2)
-		pixel_per_coord_y_half_as_int = int(pixel_per_coord_y/2)
-
-		world_min_x = self.world.min_x
-		world_min_y = self.world.min_y
-		island_col = self.COLORS["island"]
-		water_col = self.COLORS["water"]
-		location_left = self.location.left
-		location_top = self.location.top
-		if dump_data:
-			data = []
-			draw_point = lambda name, fife_point, r, g, b : data.append((fife_point.x, fife_point.y, r, g, b))
-		else:
-			draw_point = rt.addPoint
-		fife_point = fife.Point(0, 0)
-
-		use_rotation = self._get_rotation_setting()
-		full_map = self.world.full_map
-
-		# loop through map coordinates, assuming (0, 0) is the origin of the minimap
-		# this facilitates calculating the real world coords
-		for x in xrange(where.left-self.location.left, where.left+where.width-self.location.left):
-			for y in xrange(where.top-self.location.top, where.top+where.height-self.location.top):
-
-				"""
-				This code should be here, but since python can't do inlining, we have to inline
-				ourselves for performance reasons
-				covered_area = Rect.init_from_topleft_and_size(
-				  int(x * pixel_per_coord_x)+world_min_x,
-				  int(y * pixel_per_coord_y)+world_min_y),
-				  int(pixel_per_coord_x), int(pixel_per_coord_y))
-				real_map_point = covered_area.center
-				"""
-				# use center of the rect that the pixel covers
-				real_map_x = int(x * pixel_per_coord_x) + world_min_x + pixel_per_coord_x_half_as_int
-				real_map_y = int(y * pixel_per_coord_y) + world_min_y + pixel_per_coord_y_half_as_int
-				real_map_coords = (real_map_x, real_map_y)
-
-				# check what's at the covered_area
-				if real_map_coords in full_map:
-					# this pixel is an island
-					tile = full_map[real_map_coords]
+	def _get_palette_index(self, color):
+		index = self._palette_indices.get(color)
+		if index is None:
+			index = len(self._palette)
+			assert index < 256, 'too many colors for the minimap raster'
+			self._palette.append(color)
+			self._palette_indices[color] = index
+		return index
+
+	def _calculate_area(self, left, top, right, bottom):
+		"""Calculate which pixels of the area show what and store it in the raster.
+		@param left, top, right, bottom: minimap coords, right and bottom are exclusive
+		@return: list of (x, y, palette index) of the pixels that have changed"""
+		raster = self._raster
+		width = self.location.width
+		pixel_xs = self._pixel_world_xs
+		pixel_ys = self._pixel_world_ys
+		get_island = self.world.island_map.get
+		water_index = self.WATER_INDEX
+		island_index = self.ISLAND_INDEX
+		owner_indices = {} # {owner: palette index}
+
+		changed_pixels = []
+		for y in xrange(top, bottom):
+			real_map_y = pixel_ys[y]
+			offset = y * width
+			for x in xrange(left, right):
+				# check what's at the center of the area that the pixel covers
+				coords = (pixel_xs[x], real_map_y)
+				island = get_island(coords)
+				if island is None:
+					# sea, don't look it up in the full map, that would create its tile
+					index = water_index
+				else:
+					tile = island.ground_map[coords]
 					settlement = tile.settlement
 					if settlement is None:
 						# island without settlement
-						if tile.id <= 0:
-							color = water_col
-						else:
-							color = island_col
+						index = water_index if tile.id <= 0 else island_index
 					else:
 						# pixel belongs to a player
-						color = settlement.owner.color.to_tuple()
-				else:
-					color = water_col
+						owner = settlement.owner
+						index = owner_indices.get(owner)
+						if index is None:
+							index = owner_indices[owner] = self._get_palette_index(owner.color.to_tuple())
+
+				if raster[offset + x] != index:
+					raster[offset + x] = index
+					changed_pixels.append((x, y, index))
+		return changed_pixels
+
+	def _get_rotated_pixels(self, pixels):
+		"""Apply the rotation to pixels calculated by _calculate_area.
+		@return: list of (x, y, palette index)"""
+		if not self._get_rotation_setting():
+			return pixels
+		# inlined _get_rotated_coords, the rotation is the same for all pixels
+		rotation = self._rotations[self.rotation]
+		rot_sin = sin(rotation)
+		rot_cos = cos(rotation)
+		location = self.location
+		center_x = self.location_center.x - location.left
+		center_y = self.location_center.y - location.top
+		max_x = location.right - location.left
+		max_y = location.bottom - location.top
+		rotated_pixels = []
+		for x, y, index in pixels:
+			dx = x - center_x
+			dy = y - center_y
+			rot_x = int(round(dx * rot_cos - dy * rot_sin + center_x))
+			rot_y = int(round(dx * rot_sin + dy * rot_cos + center_y))
+			rotated_pixels.append((min(max_x, max(0, rot_x)), min(max_y, max(0, rot_y)), index))
+		return rotated_pixels
+
+	def _draw_pixels(self, pixels):
+		"""Draw pixels calculated by _calculate_area."""
+		draw_point = self.minimap_image.rendertarget.addPoint
+		render_name = self._get_render_name("base")
+		palette = self._palette
+		fife_point = fife.Point(0, 0)
+		for x, y, index in self._get_rotated_pixels(pixels):
+			fife_point.set(x, y)
+			draw_point(render_name, fife_point, *palette[index])
 
-				if use_rotation:
-					# inlined _get_rotated_coords
-					rot_x, rot_y = self._rotate((location_left + x, location_top + y), self._rotations)
-					fife_point.set(rot_x - location_left, rot_y - location_top)
-				else:
-					fife_point.set(x, y)
+	def _recalculate(self, dump_data=False):
+		"""Calculate which pixel of the minimap should display what and draw it
+
+		The result is kept as a raster of palette indices. Only pixels that aren't water are
+		drawn, since the background already has the water color. Later changes are drawn by
+		_redraw_dirty_areas, which only draws the pixels that have changed.
+		@param dump_data: Don't draw but return calculated data"""
+		# real world coords at the center of the area that each minimap column / row covers
+		pixel_per_coord_x, pixel_per_coord_y = self._world_to_minimap_ratio
+		offset_x = int(pixel_per_coord_x / 2) + self.world.min_x
+		offset_y = int(pixel_per_coord_y / 2) + self.world.min_y
+		self._pixel_world_xs = [int(x * pixel_per_coord_x) + offset_x for x in xrange(self.location.width)]
+		self._pixel_world_ys = [int(y * pixel_per_coord_y) + offset_y for y in xrange(self.location.height)]
 
-				draw_point(render_name, fife_point, *color)
+		self._raster = bytearray(self.location.width * self.location.height) # all water
+		self._dirty_areas.clear()
+		changed_pixels = self._calculate_area(0, 0, self.location.width, self.location.height)
 
 		if dump_data:
-			return json.dumps(data)
+			palette = self._palette
+			return json.dumps([(x, y) + tuple(palette[index]) for x, y, index in self._get_rotated_pixels(changed_pixels)])
 
+		self.minimap_image.set_drawing_enabled()
+		self.minimap_image.rendertarget.removeAll(self._get_render_name("base"))
+		self._draw_pixels(changed_pixels)
 
 	def _timed_update(self, force=False):
 		"""Regular updates for domains we can't or don't want to keep track of."""
 		# OPTIMIZATION NOTE: There can be pretty many ships.
 		# Don't rely on the loop being rarely executed!
 		# update ship icons
+		use_rotation = self._get_rotation_setting()
+		ship_state = [] # what is drawn for the ships, redraw only if it has changed
+		for ship in self.world.ships:
+			if not ship.in_ship_map:
+				continue # no fisher ships, etc
+			coord = self._world_to_minimap(ship.position.to_tuple(), use_rotation)
+			ship_state.append((ship, coord, ship.owner.color.to_tuple(), ship in self.session.selected_instances))
+		if force or ship_state != self._last_ship_state:
+			self._draw_ships(ship_state)
+			self._last_ship_state = ship_state
+
+		# draw settlement warehouses if something has changed
+		settlements = self.world.settlements
+		# save only worldids as to not introduce actual coupling
+		cur_settlements = set(i.worldid for i in settlements)
+		if force or \
+		   (not hasattr(self, "_last_settlements") or cur_settlements != self._last_settlements):
+			# update necessary
+			self.minimap_image.set_drawing_enabled()
+			warehouse_render_name = self._get_render_name("warehouse")
+			self.minimap_image.rendertarget.removeAll(warehouse_render_name)
+			for settlement in settlements:
+				coord = settlement.warehouse.position.center.to_tuple()
+				coord = self._world_to_minimap(coord, use_rotation)
+				self._update_image(self.__class__.WAREHOUSE_IMAGE,
+				                   warehouse_render_name,
+				                   coord)
+			self._last_settlements = cur_settlements
+
+	def _draw_ships(self, ship_state):
+		"""Draw the ship icons.
+		@param ship_state: list of (ship, minimap coords, owner color, whether the ship is selected)"""
 		self.minimap_image.set_drawing_enabled()
 		render_name = self._get_render_name("ship")
 		self.minimap_image.rendertarget.removeAll(render_name)
-		use_rotation = self._get_rotation_setting()
 		# Make use of these dummy points instead of creating fife.Point instances
 		# (which are consuming a lot of resources).
 		dummy_point0 = fife.Point(0, 0)
 		dummy_point1 = fife.Point(0, 0)
-		for ship in self.world.ships:
-			if not ship.in_ship_map:
-				continue # no fisher ships, etc
-			coord = self._world_to_minimap(ship.position.to_tuple(), use_rotation)
-			color = ship.owner.color.to_tuple()
+		for ship, coord, color, selected in ship_state:
 			# set correct icon
 			if ship.owner is self.session.world.pirate:
 				ship_icon_path = self.__class__.SHIP_PIRATE
@@ -608,7 +707,7 @@ class Minimap(object):
 			# TODO: nicer selected view
 			dummy_point0.set(coord[0], coord[1])
 			draw_point = self.minimap_image.rendertarget.addPoint
-			if ship in self.session.selected_instances:
+			if selected:
 				draw_point(render_name, dummy_point0, *Minimap.COLORS["water"])
 				for x_off, y_off in ((-2,  0),
 				                     (+2,  0),
@@ -617,23 +716,6 @@ class Minimap(object):
 					dummy_point1.set(coord[0] + x_off, coord[1] + y_off)
 					draw_point(render_name, dummy_point1, *color)
 
-		# draw settlement warehouses if something has changed
-		settlements = self.world.settlements
-		# save only worldids as to not introduce actual coupling
-		cur_settlements = set(i.worldid for i in settlements)
-		if force or \
-		   (not hasattr(self, "_last_settlements") or cur_settlements != self._last_settlements):
-			# update necessary
-			warehouse_render_name = self._get_render_name("warehouse")
-			self.minimap_image.rendertarget.removeAll(warehouse_render_name)
-			for settlement in settlements:
-				coord = settlement.warehouse.position.center.to_tuple()
-				coord = self._world_to_minimap(coord, use_rotation)
-				self._update_image(self.__class__.WAREHOUSE_IMAGE,
-				                   warehouse_render_name,
-				                   coord)
-			self._last_settlements = cur_settlements
-
 	def _update_image(self, img_path, name, coord_tuple):
 		"""Updates image as part of minimap (e.g. when it has moved)"""
 		img = self.imagemanager.load(img_path)
@@ -0,0 +1,77 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from fife.extensions.pychan.widgets import Label
+
+from horizons.constants import GAME
+from horizons.extscheduler import ExtScheduler
+from horizons.gui.widgets.container import AutoResizeContainer
+from horizons.scheduler import Scheduler
+
+
+class TickProfilerDisplay(AutoResizeContainer):
+	"""Display the duration of the last tick and the most expensive scheduler callbacks.
+
+	Only available if the game has been started with --profile-ticks.
+	Updates once a second if visible.
+	"""
+
+	NUM_TARGETS = 5
+
+	def __init__(self):
+		super(TickProfilerDisplay, self).__init__()
+
+		self._label = Label(text=u"- - -", wrap_text=True, max_size=(500, 200))
+		self.addChild(self._label)
+		self.stylize('menu')
+		self.position_technique = "right:bottom"
+
+	@classmethod
+	def is_available(cls):
+		return GAME.PROFILE_TICKS is not None
+
+	def _update(self):
+		scheduler = Scheduler() # there is no scheduler outside of sessions
+		profiler = scheduler.profiler if scheduler is not None else None
+		if profiler is None or profiler.last_tick is None:
+			self._label.text = u"Ticks: - - -"
+		else:
+			tick, duration, callbacks = profiler.last_tick
+			lines = [u"Tick %d: %.1f ms, %d callbacks" % (tick, duration, callbacks)]
+			lines.extend(profiler.format_top_targets(self.NUM_TARGETS))
+			self._label.text = u"\n".join(lines)
+		self.resizeToContent()
+		self.toggle()  # hide and show again to fix position (pychan...)
+		self.toggle()
+
+	def show(self):
+		ExtScheduler().add_new_object(self._update, self, loops=-1)
+		return super(TickProfilerDisplay, self).show()
+
+	def hide(self):
+		ExtScheduler().rem_call(self, self._update)
+		return super(TickProfilerDisplay, self).hide()
+
+	def toggle(self):
+		if self._visible:
+			self.hide()
+		else:
+			self.show()
@@ -0,0 +1,123 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Headless mode: runs the simulation without FIFE, rendering and gui.
+
+Ticks are executed back to back as fast as possible instead of being paced by
+the wall clock, which makes this useful for AI-vs-AI soak tests and balancing
+runs. Start it with `run_uh.py --headless --max-ticks <n>` together with one of
+the usual game start parameters (e.g. --start-random-map).
+
+NOTE: Nothing from horizons.* that imports fife must be imported in global scope
+here, the fife dummy has to be installed first.
+"""
+
+import sys
+import time
+
+from horizons.ext.dummy import Dummy
+
+
+def install_fife_dummy():
+	"""Catch all imports of fife with a custom import hook and provide a dummy module.
+	Needs to be called before any module imports fife."""
+	class Importer(object):
+
+		def find_module(self, fullname, path=None):
+			if fullname.startswith('fife'):
+				return self
+			return None
+
+		def load_module(self, name):
+			return sys.modules.setdefault(name, Dummy)
+
+	sys.meta_path = [Importer()]
+
+
+def start(command_line_arguments):
+	"""Runs a game without graphics.
+	@param command_line_arguments: options object from optparse.OptionParser. see run_uh.py.
+	@return: bool, whether the game could be started
+	"""
+	install_fife_dummy()
+
+	import horizons.globals
+	import horizons.main
+	from horizons.constants import GAME, SINGLEPLAYER
+	from horizons.scheduler import Scheduler
+	from horizons.extscheduler import ExtScheduler
+	from horizons.headlesssession import HeadlessSession
+	from horizons.savegamemanager import SavegameManager
+	from horizons.util.startgameoptions import StartGameOptions
+
+	options = command_line_arguments
+	horizons.globals.fife = Dummy
+	horizons.main.setup_AI_settings(options)
+	if options.sp_seed:
+		SINGLEPLAYER.SEED = options.sp_seed
+	if options.profile_ticks:
+		GAME.PROFILE_TICKS = options.profile_ticks
+
+	ExtScheduler.create_instance(Dummy)
+	horizons.globals.db = horizons.main._create_main_db()
+	SavegameManager.init()
+
+	if options.start_random_map or options.start_specific_random_map is not None:
+		game_options = StartGameOptions.create_start_random_map(options.ai_players,
+			options.start_specific_random_map, options.force_player_id)
+	elif options.start_map is not None or options.start_dev_map:
+		map_name = 'development' if options.start_dev_map else options.start_map
+		map_file = horizons.main._find_matching_map(map_name, SavegameManager.get_maps())
+		if not map_file:
+			return False
+		game_options = StartGameOptions.create_start_singleplayer(map_file, False,
+			options.ai_players, True, True, options.force_player_id, True)
+	elif options.load_game is not None:
+		map_file = horizons.main._find_matching_map(options.load_game, SavegameManager.get_saves())
+		if not map_file:
+			return False
+		game_options = StartGameOptions.create_load_game(map_file, options.force_player_id)
+	else:
+		print "Error: The headless mode needs a game start parameter such as --start-random-map."
+		return False
+
+	session = HeadlessSession(horizons.globals.db)
+	session.load(game_options)
+
+	start_time = time.time()
+	ticks = session.run(options.max_ticks)
+	duration = time.time() - start_time
+
+	print "Ran {ticks} ticks in {duration:.2f}s ({rate:.1f} ticks/s)".format(
+		ticks=ticks, duration=duration, rate=ticks / max(duration, 1e-6))
+	if Scheduler().profiler is not None:
+		print "Most expensive callbacks:"
+		for line in Scheduler().profiler.format_top_targets():
+			print line
+	world = session.world
+	print "Path caches:"
+	print "  sea:", world.water_and_coastline_path_cache
+	for island in world.islands:
+		print "  island %d roads:" % island.worldid, island.path_nodes.road_path_cache
+
+	session.end()
+	ExtScheduler.destroy_instance()
+	return True
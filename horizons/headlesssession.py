@@ -0,0 +1,44 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.ext.dummy import Dummy
+from horizons.spsession import SPSession
+from horizons.timer import HeadlessTimer
+
+class HeadlessSession(SPSession):
+	"""Singleplayer session without view and ingame gui, used by horizons.headless.
+	Time only advances on calls to run()."""
+
+	def __init__(self, db, rng_seed=None):
+		super(HeadlessSession, self).__init__(db, rng_seed, ingame_gui_class=Dummy, view_class=Dummy)
+
+	def create_timer(self):
+		return HeadlessTimer()
+
+	def reset_autosave(self):
+		pass # there is no ExtScheduler running
+
+	def run(self, ticks=None):
+		"""Runs the simulation as fast as possible.
+		@param ticks: number of ticks to run, None to run until the game is paused
+		@return: number of ticks that have been run"""
+		return self.timer.run(ticks)
@@ -54,6 +54,7 @@ from horizons.util.startgameoptions import StartGameOptions
 from horizons.util.python import parse_port
 from horizons.util.python.callback import Callback
 from horizons.util.uhdbaccessor import UhDbAccessor
+from horizons.util.gamedbsnapshot import GameDbSnapshot
 from horizons.util.savegameaccessor import SavegameAccessor
 from horizons.util.atlasloadingthread import AtlasLoadingThread
 
@@ -109,6 +110,11 @@ def start(_command_line_arguments):
 		  ) )
 		sys.exit(0)
 
+	if command_line_arguments.generate_previews: # we've been called as subprocess to fill the preview cache
+		from horizons.gui.modules.singleplayermenu import generate_previews
+		generate_previews(json.loads(command_line_arguments.generate_previews))
+		sys.exit(0)
+
 	if debug: # also True if a specific module is logged (but not 'fife')
 		setup_debug_mode(command_line_arguments)
 
@@ -129,6 +135,8 @@ def start(_command_line_arguments):
 	# set MAX_TICKS
 	if command_line_arguments.max_ticks:
 		GAME.MAX_TICKS = command_line_arguments.max_ticks
+	if command_line_arguments.profile_ticks:
+		GAME.PROFILE_TICKS = command_line_arguments.profile_ticks
 
 	preload_lock = threading.Lock()
 	atlas_loading_thread = None
@@ -262,6 +270,9 @@ def setup_AI_settings(command_line_arguments):
 		AI.HIGHLIGHT_COMBAT = True
 	if command_line_arguments.human_ai:
 		AI.HUMAN_AI = True
+	if command_line_arguments.ai_workers:
+		from horizons.ai.aiplayer.evaluatorpool import EvaluatorPool
+		EvaluatorPool.workers = command_line_arguments.ai_workers
 
 def setup_debug_mode(command_line_arguments):
 	if not (command_line_arguments.debug_module
@@ -298,6 +309,9 @@ def quit():
 	"""Quits the game"""
 	# joing preload thread before quiting in case active
 	preload_game_join(preloading)
+	# stop the worker processes of the AI players, in case a session is still running
+	from horizons.ai.aiplayer.evaluatorpool import EvaluatorPool
+	EvaluatorPool().end()
 	horizons.globals.fife.quit()
 
 def quit_session():
@@ -532,10 +546,9 @@ def _create_main_db():
 	"""Returns a dbreader instance, that is connected to the main game data dbfiles.
 	NOTE: This data is read_only, so there are no concurrency issues."""
 	_db = UhDbAccessor(':memory:')
-	for i in PATHS.DB_FILES:
-		f = open(i, "r")
-		sql = "BEGIN TRANSACTION;" + f.read() + "COMMIT;"
-		_db.execute_script(sql)
+	if not GameDbSnapshot.load(_db, PATHS.DB_FILES):
+		GameDbSnapshot.execute_files(_db, PATHS.DB_FILES)
+		GameDbSnapshot.save(PATHS.DB_FILES) # for the next start
 	return _db
 
 def preload_game_data(lock):
@@ -210,6 +210,13 @@ class InstanceInventoryUpdated(Message):
 	"""
 	arguments = ('inventory', )
 
+class ResourceAvailable(Message):
+	"""Message sent whenever the amount of some resources in an inventory has increased.
+
+	This message is sent by StorageComponent, the sender is the instance.
+	"""
+	arguments = ('resources', )
+
 class SettlementInventoryUpdated(Message):
 	"""Message sent whenever a settlement's inventory is updated."""
 	pass
@@ -31,6 +31,8 @@ from collections import defaultdict
 
 from horizons.constants import PATHS, VERSION
 from horizons.util.dbreader import DbReader
+from horizons.util.savegamecatalog import SavegameCatalog
+from horizons.util.savegamewriter import SavegameSnapshot
 from horizons.util.yamlcache import YamlCache
 
 import horizons.globals
@@ -94,17 +96,18 @@ class SavegameManager(object):
 				os.makedirs(d)
 
 	@classmethod
-	def __get_displaynames(cls, files):
+	def __get_displaynames(cls, files, timestamps):
 		"""Returns player-facing names for the savegames *files*.
 
 		@param files: iterable object containing strings.
+		@param timestamps: { file: timestamp from metadata } for auto- and quicksaves
 		@return: list of names to be displayed for each file.
 		"""
 		displaynames = []
-		def get_timestamp_string(savegameinfo):
-			if savegameinfo['timestamp'] == -1:
+		def get_timestamp_string(timestamp):
+			if timestamp == -1:
 				return u""
-			timestamp = time.localtime(savegameinfo['timestamp'])
+			timestamp = time.localtime(timestamp)
 			try:
 				return time.strftime('%c', timestamp).decode('utf-8')
 			except UnicodeDecodeError:
@@ -113,9 +116,9 @@ class SavegameManager(object):
 
 		for f in files:
 			if f.startswith(cls.autosave_dir):
-				name = u"Autosave {date}".format(date=get_timestamp_string(cls.get_metadata(f)))
+				name = u"Autosave {date}".format(date=get_timestamp_string(timestamps[f]))
 			elif f.startswith(cls.quicksave_dir):
-				name = u"Quicksave {date}".format(date=get_timestamp_string(cls.get_metadata(f)))
+				name = u"Quicksave {date}".format(date=get_timestamp_string(timestamps[f]))
 			else:
 				name = os.path.splitext(os.path.basename(f))[0]
 
@@ -129,15 +132,31 @@ class SavegameManager(object):
 		"""Returns the savegame files in each directory in *dirs*. Internal method.
 
 		@param include_displaynames: Whether to add player-readable names displayed in gui.
+		@param order_by_date: Whether to sort the files by modification time, newest first.
+		                      These are savegame directories, which are listed through the
+		                      SavegameCatalog, so the files aren't touched.
 		"""
 		if not filename_extension:
 			filename_extension = cls.savegame_extension
-		files = sorted((-os.path.getmtime(f) if order_by_date else 0, f)
-		               for p in dirs for f in glob.glob(p + '/*.' + filename_extension)
-		               if os.path.isfile(f))
+		timestamps = {}
+		if order_by_date:
+			files = []
+			for p in dirs:
+				for entry in SavegameCatalog.get_entries(p, filename_extension):
+					# keep the paths in the format glob would have returned them
+					f = os.path.join(p, os.path.basename(entry['path']))
+					files.append((-entry['mtime'], f))
+					timestamps[f] = entry['timestamp']
+			files.sort()
+		else:
+			files = sorted((0, f) for p in dirs for f in glob.glob(p + '/*.' + filename_extension)
+			               if os.path.isfile(f))
 		files = zip(*files)[1] if files else []
 		if include_displaynames:
-			return (files, cls.__get_displaynames(files))
+			if not order_by_date:
+				timestamps = dict((f, cls.get_metadata(f, include_screenshot=False)['timestamp'])
+				                  for f in files if f.startswith((cls.autosave_dir, cls.quicksave_dir)))
+			return (files, cls.__get_displaynames(files, timestamps))
 		else:
 			return (files,)
 
@@ -222,8 +241,9 @@ class SavegameManager(object):
 			return "undefined"
 
 	@classmethod
-	def get_metadata(cls, savegamefile):
-		"""Returns metainfo of a savegame as dict."""
+	def get_metadata(cls, savegamefile, include_screenshot=True):
+		"""Returns metainfo of a savegame as dict.
+		@param include_screenshot: Whether to read the screenshot, else it is None"""
 		metadata = cls.savegame_metadata.copy()
 		if isinstance(savegamefile, list):
 			return metadata
@@ -241,12 +261,13 @@ class SavegameManager(object):
 			return metadata
 
 		screenshot_data = None
-		try:
-			screenshot_data = db("SELECT value FROM metadata_blob where name = ?", "screen")[0][0]
-		except IndexError:
-			pass
-		except sqlite3.OperationalError:
-			pass
+		if include_screenshot:
+			try:
+				screenshot_data = db("SELECT value FROM metadata_blob where name = ?", "screen")[0][0]
+			except IndexError:
+				pass
+			except sqlite3.OperationalError:
+				pass
 		metadata['screenshot'] = screenshot_data
 
 		return metadata
@@ -302,6 +323,10 @@ class SavegameManager(object):
 
 		cls._write_screenshot(db)
 
+		# snapshots are written later, the catalog reads them when it scans the directory
+		if not isinstance(db, SavegameSnapshot):
+			SavegameCatalog.add(db.db_path, SavegameCatalog.read_entry(db))
+
 	@classmethod
 	def get_regular_saves(cls, include_displaynames=True):
 		"""Returns all savegames that were saved via the ingame save dialog.
@@ -26,17 +26,27 @@ import horizons.main
 
 from horizons.util.living import LivingObject
 from horizons.util.python.singleton import ManualConstructionSingleton
+from horizons.util.tickprofiler import TickProfiler
 from horizons.constants import GAME
 
 class Scheduler(LivingObject):
 	""""Class providing timed callbacks.
 	Master of time.
 
-	TODO:
-	- Refactor to use a data structure that is suitable for iteration (ticking) as well as
-	  searching/deleting by instance, possibly also by callback.
-	  Suggestion: { tick -> { instance -> [callback] }} (basically a k-d tree)
+	Callbacks are stored in a bucket queue: `schedule` maps a tick to a deque of
+	the callbacks that run at that tick, in the order they were added. This order
+	is relied upon by multiplayer and must not change.
 
+	Every scheduled callback is additionally indexed by its class instance in
+	`calls_by_instance`, so that cancelling (rem_object, rem_call,
+	rem_all_classinst_calls) never has to search the schedule. The buckets contain
+	(CallbackObject, token) entries. Scheduling and cancelling change the token of
+	the CallbackObject, so cancelled entries stay in their bucket until their tick
+	comes, where they are skipped because their token is outdated. This way a
+	CallbackObject can be removed and added again. The CallbackObject returned by
+	add_new_object can be used as handle for rem_object.
+
+	If GAME.PROFILE_TICKS is set, all ticks are measured by a TickProfiler (`profiler`).
 
 	@param timer: Timer instance the schedular registers itself with.
 	"""
@@ -52,10 +62,11 @@ class Scheduler(LivingObject):
 		@param timer: Timer obj
 		"""
 		super(Scheduler, self).__init__()
-		self.schedule = {}
+		self.schedule = {} # { tick: deque((CallbackObject, token)) }
 		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
-		self.calls_by_instance = {} # for get_classinst_calls
+		self.calls_by_instance = {} # { class_instance: set(CallbackObject) }, for get_classinst_calls and removal
 		self.cur_tick = self.__class__.FIRST_TICK_ID-1 # before ticking
+		self.profiler = TickProfiler(GAME.PROFILE_TICKS) if GAME.PROFILE_TICKS else None
 		self.timer = timer
 		self.timer.add_call(self.tick)
 
@@ -77,36 +88,38 @@ class Scheduler(LivingObject):
 			horizons.main.quit()
 			return
 
-		if self.cur_tick in self.schedule:
-			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(self.schedule[self.cur_tick]))
+		profiler = self.profiler
+		if profiler is not None:
+			profiler.start_tick(tick_id)
 
-			# use iteration method that works in case the list is altered during iteration
-			# this can happen for e.g. rem_all_classinst_calls
-			cur_schedule = self.schedule[self.cur_tick]
-			while cur_schedule:
-				callback = cur_schedule.popleft()
-				# TODO: some system-level unit tests fail if this list is not processed in the correct order
-				#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
-				#       in the program and should be fixed.
+		cur_schedule = self.schedule.get(self.cur_tick)
+		if cur_schedule is not None:
+			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(cur_schedule))
 
-				if hasattr(callback, "invalid"):
+			# use iteration method that works in case the deque is altered during iteration
+			# TODO: some system-level unit tests fail if this deque is not processed in the correct order
+			#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
+			#       in the program and should be fixed.
+			while cur_schedule:
+				callback, token = cur_schedule.popleft()
+				if callback.token != token:
 					self.log.debug("S(t:%s): %s: INVALID", tick_id, callback)
 					continue
 				self.log.debug("S(t:%s): %s", tick_id, callback)
-				callback.callback()
+				if profiler is None:
+					callback.callback()
+				else:
+					profiler.run_callback(callback)
 				assert callback.loops >= -1
+				if callback.token != token:
+					continue # removed or rescheduled by its own callback
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
-				else: # gone for good
-					if callback.class_instance in self.calls_by_instance:
-						# this can already be removed by e.g. rem_all_classinst_calls
-						if callback.finish_callback is not None:
-							callback.finish_callback()
-
-						try:
-							self.calls_by_instance[callback.class_instance].remove(callback)
-						except ValueError:
-							pass # also the callback can be deleted by e.g. rem_call
+				elif callback in self.calls_by_instance.get(callback.class_instance, ()): # gone for good
+					# this can already be removed by e.g. rem_all_classinst_calls
+					if callback.finish_callback is not None:
+						callback.finish_callback()
+					self._unindex(callback)
 			del self.schedule[self.cur_tick]
 
 			self.log.debug("Scheduler: finished tick %s", self.cur_tick)
@@ -114,7 +127,8 @@ class Scheduler(LivingObject):
 		# run jobs added in the loop above
 		self._run_additional_jobs()
 
-		assert (not self.schedule) or self.schedule.iterkeys().next() > self.cur_tick
+		if profiler is not None:
+			profiler.end_tick()
 
 	def before_ticking(self):
 		"""Called after game load and before game has started.
@@ -127,9 +141,23 @@ class Scheduler(LivingObject):
 	def _run_additional_jobs(self):
 		for callback in self.additional_cur_tick_schedule:
 			assert callback.loops == 0 # can't loop with no delay
-			callback.callback()
+			if self.profiler is None:
+				callback.callback()
+			else:
+				self.profiler.run_callback(callback)
 		self.additional_cur_tick_schedule = []
 
+	def _unindex(self, callback_obj):
+		"""Removes a CallbackObject from the per-instance index.
+		@return: bool, whether it was indexed"""
+		calls = self.calls_by_instance.get(callback_obj.class_instance)
+		if calls is None or callback_obj not in calls:
+			return False
+		calls.remove(callback_obj)
+		if not calls:
+			del self.calls_by_instance[callback_obj.class_instance]
+		return True
+
 	def add_object(self, callback_obj, readd=False):
 		"""Adds a new CallbackObject instance to the callbacks list for the first time
 		@param callback_obj: CallbackObject type object, containing all necessary  information
@@ -142,14 +170,18 @@ class Scheduler(LivingObject):
 		else: # default: run in future tick
 			interval = callback_obj.loop_interval if readd else callback_obj.run_in
 			tick_key = self.cur_tick + interval
-			if not tick_key in self.schedule:
-				self.schedule[tick_key] = deque()
 			callback_obj.tick = tick_key
-			self.schedule[tick_key].append(callback_obj)
-			if not readd:  # readded calls haven't been removed here
-				if not callback_obj.class_instance in self.calls_by_instance:
-					self.calls_by_instance[callback_obj.class_instance] = []
-				self.calls_by_instance[callback_obj.class_instance].append( callback_obj )
+			callback_obj.token += 1 # outdates an entry of a previous scheduling
+			entry = (callback_obj, callback_obj.token)
+			try:
+				self.schedule[tick_key].append(entry)
+			except KeyError:
+				self.schedule[tick_key] = deque((entry, ))
+			if not readd:  # readded calls are still indexed
+				try:
+					self.calls_by_instance[callback_obj.class_instance].add(callback_obj)
+				except KeyError:
+					self.calls_by_instance[callback_obj.class_instance] = set((callback_obj, ))
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None, finish_callback=None):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -157,46 +189,34 @@ class Scheduler(LivingObject):
 		@param class_instance: class instance the function belongs to.
 		@param run_in: int number of ticks after which the callback is called. Defaults to 1, run next tick.
 		@param loops: How often the callback is called. -1 = infinite times. Defaults to 1, run once.
-		@param loop_interval: Delay between subsequent loops in ticks. Defaults to run_in."""
+		@param loop_interval: Delay between subsequent loops in ticks. Defaults to run_in.
+		@return: the CallbackObject, which can be passed to rem_object"""
 		callback_obj = _CallbackObject(self, callback, class_instance, run_in, loops, loop_interval, finish_callback=finish_callback)
 		self.add_object(callback_obj)
+		return callback_obj
 
 	def rem_object(self, callback_obj):
 		"""Removes a CallbackObject from all callback lists
 		@param callback_obj: CallbackObject to remove
 		@return: int, number of removed calls
 		"""
-		removed_objs = 0
-		if self.schedule is not None:
-			for key in self.schedule:
-				while callback_obj in self.schedule[key]:
-					self.schedule[key].remove(callback_obj)
-					self.calls_by_instance[callback_obj.class_instance].remove(callback_obj)
-					removed_objs += 1
-
-		if not self.calls_by_instance[callback_obj.class_instance]:
-			del self.calls_by_instance[callback_obj.class_instance]
-
-		return removed_objs
+		if self.schedule is None or not self._unindex(callback_obj):
+			return 0
+		callback_obj.token += 1 # skipped when its tick comes
+		return 1
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		"""
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is class_instance:
-					del callback_objects[i]
-		"""
-		if class_instance in self.calls_by_instance:
-			for callback_obj in self.calls_by_instance[class_instance]:
-				callback_obj.invalid = True # don't remove, finding them all takes too long
-			del self.calls_by_instance[class_instance]
+		calls = self.calls_by_instance.pop(class_instance, None)
+		if calls is not None:
+			for callback_obj in calls:
+				callback_obj.token += 1
 
 		# filter additional callbacks as well
-		self.additional_cur_tick_schedule = \
-		    [cb for cb in self.additional_cur_tick_schedule
-		        if cb.class_instance is not class_instance]
+		if self.additional_cur_tick_schedule:
+			self.additional_cur_tick_schedule = \
+			    [cb for cb in self.additional_cur_tick_schedule
+			        if cb.class_instance is not class_instance]
 
 	def rem_call(self, instance, callback):
 		"""Removes all callbacks of 'instance' that are 'callback'
@@ -206,31 +226,20 @@ class Scheduler(LivingObject):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if (callback_objects[i].class_instance is instance
-				    and callback_objects[i].callback == callback
-				    and not hasattr(callback_objects[i], "invalid")):
-					del callback_objects[i]
-					removed_calls += 1
-
-		test = 0
-		if removed_calls > 0: # there also must be calls in the calls_by_instance dict
-			for i in xrange(len(self.calls_by_instance[instance]) - 1, -1, -1):
-				obj = self.calls_by_instance[instance][i]
-				if obj.callback == callback:
-					del self.calls_by_instance[instance][i]
-					test += 1
-			assert test == removed_calls, "%s, %s" % (test, removed_calls)
-			if not self.calls_by_instance[instance]:
+		calls = self.calls_by_instance.get(instance)
+		if calls is not None:
+			for callback_obj in [c for c in calls if c.callback == callback]:
+				calls.remove(callback_obj)
+				callback_obj.token += 1
+				removed_calls += 1
+			if not calls:
 				del self.calls_by_instance[instance]
 
-		for i in xrange(len(self.additional_cur_tick_schedule) - 1, -1, -1):
-			if self.additional_cur_tick_schedule[i].class_instance is instance and \
-				self.additional_cur_tick_schedule[i].callback == callback:
-					del callback_objects[i]
-					removed_calls += 1
+		if self.additional_cur_tick_schedule:
+			remaining = [cb for cb in self.additional_cur_tick_schedule
+			             if cb.class_instance is not instance or cb.callback != callback]
+			removed_calls += len(self.additional_cur_tick_schedule) - len(remaining)
+			self.additional_cur_tick_schedule = remaining
 
 		return removed_calls
 
@@ -245,7 +254,7 @@ class Scheduler(LivingObject):
 		calls = {}
 		if instance in self.calls_by_instance:
 			for callback_obj in self.calls_by_instance[instance]:
-				if  callback is None or callback_obj.callback == callback:
+				if callback is None or callback_obj.callback == callback:
 					calls[callback_obj] = callback_obj.tick - self.cur_tick
 		return calls
 
@@ -271,6 +280,9 @@ class Scheduler(LivingObject):
 
 class _CallbackObject(object):
 	"""Class used by the TimerManager Class to organize callbacks."""
+	__slots__ = ('callback', 'finish_callback', 'run_in', 'loops', 'loop_interval',
+	             'class_instance', 'tick', 'token')
+
 	def __init__(self, scheduler, callback, class_instance, run_in, loops, loop_interval, finish_callback=None):
 		"""Creates the CallbackObject instance.
 		@param scheduler: reference to the scheduler, necessary to react properly on weak reference callbacks
@@ -289,6 +301,8 @@ class _CallbackObject(object):
 		self.loops = loops
 		self.loop_interval = loop_interval if loop_interval is not None else run_in
 		self.class_instance = class_instance
+		self.tick = None
+		self.token = 0 # changed when (re)scheduled or removed, see Scheduler
 
 	def __str__(self):
 		cb = str(self.callback)
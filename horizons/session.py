@@ -32,9 +32,9 @@ import horizons.globals
 import horizons.main
 
 from horizons.ai.aiplayer import AIPlayer
+from horizons.ai.aiplayer.evaluatorpool import EvaluatorPool
 from horizons.gui.ingamegui import IngameGui
 from horizons.command.building import Tear
-from horizons.util.dbreader import DbReader
 from horizons.command.unit import RemoveUnit
 from horizons.scheduler import Scheduler
 from horizons.extscheduler import ExtScheduler
@@ -43,6 +43,7 @@ from horizons.world import World
 from horizons.entities import Entities
 from horizons.util.living import LivingObject, livingProperty
 from horizons.util.savegameaccessor import SavegameAccessor
+from horizons.util.savegamewriter import SavegameSnapshot, SavegameWriter, SavegameWriterThread
 from horizons.util.worldobject import WorldObject
 from horizons.util.uhdbaccessor import read_savegame_template
 from horizons.component.namedcomponent import NamedComponent
@@ -88,13 +89,14 @@ class Session(LivingObject):
 
 	log = logging.getLogger('session')
 
-	def __init__(self, db, rng_seed=None, ingame_gui_class=IngameGui):
+	def __init__(self, db, rng_seed=None, ingame_gui_class=IngameGui, view_class=View):
 		super(Session, self).__init__()
 		assert isinstance(db, horizons.util.uhdbaccessor.UhDbAccessor)
 		self.log.debug("Initing session")
 		self.db = db # main db for game data (game.sql)
 		# this saves how often the current game has been saved
 		self.savecounter = 0
+		self._background_save = None # (SavegameWriterThread, on_finished), see _save_in_background
 		self.is_alive = True
 
 		self._clear_caches()
@@ -105,7 +107,7 @@ class Session(LivingObject):
 		self.timer = self.create_timer()
 		Scheduler.create_instance(self.timer)
 		self.manager = self.create_manager()
-		self.view = View()
+		self.view = view_class()
 		Entities.load(self.db)
 		self.scenario_eventhandler = ScenarioEventHandler(self) # dummy handler with no events
 
@@ -162,6 +164,7 @@ class Session(LivingObject):
 
 	def end(self):
 		self.log.debug("Ending session")
+		self.wait_for_background_save()
 		self.is_alive = False
 
 		# Has to be done here, cause the manager uses Scheduler!
@@ -182,6 +185,9 @@ class Session(LivingObject):
 		self.timer = None
 		self.scenario_eventhandler = None
 
+		if Scheduler().profiler is not None:
+			path = Scheduler().profiler.dump()
+			self.log.info("Tick profile written to %s.{csv,json}", path)
 		Scheduler().end()
 		Scheduler.destroy_instance()
 
@@ -189,6 +195,8 @@ class Session(LivingObject):
 		self.selection_groups = None
 
 		self._clear_caches()
+		# stop the worker processes of the AI players, the next session may not need them
+		EvaluatorPool().end()
 
 		# discard() in case loading failed and we did not yet subscribe
 		SettingChanged.discard(self._on_setting_changed)
@@ -386,13 +394,14 @@ class Session(LivingObject):
 		"""Actual save code.
 		@param savegame: absolute path"""
 		assert os.path.isabs(savegame)
+		self.wait_for_background_save()
 		self.log.debug("Session: Saving to %s", savegame)
 		try:
 			if os.path.exists(savegame):
 				os.unlink(savegame)
 			self.savecounter += 1
 
-			db = DbReader(savegame)
+			db = SavegameWriter(savegame)
 		except IOError as e: # usually invalid filename
 			headline = _("Failed to create savegame file")
 			descr = _("There has been an error while creating your savegame file.")
@@ -411,20 +420,7 @@ class Session(LivingObject):
 			return self.save()
 
 		try:
-			read_savegame_template(db)
-
-			db("BEGIN")
-			self.world.save(db)
-			self.view.save(db)
-			self.ingame_gui.save(db)
-			self.scenario_eventhandler.save(db)
-
-			# Store RNG state
-			rng_state = json.dumps(self.random.getstate())
-			SavegameManager.write_metadata(db, self.savecounter, rng_state)
-
-			# Make sure everything gets written now
-			db("COMMIT")
+			self._write_savegame(db)
 			db.close()
 			return True
 		except Exception:
@@ -434,3 +430,71 @@ class Session(LivingObject):
 			db.close()
 			os.unlink(savegame)
 			return False
+
+	def _write_savegame(self, db):
+		"""Saves the session to db.
+		@param db: SavegameWriter or SavegameSnapshot"""
+		read_savegame_template(db)
+
+		db("BEGIN")
+		self.world.save(db)
+		self.view.save(db)
+		self.ingame_gui.save(db)
+		self.scenario_eventhandler.save(db)
+
+		# Store RNG state
+		rng_state = json.dumps(self.random.getstate())
+		SavegameManager.write_metadata(db, self.savecounter, rng_state)
+
+		# Make sure everything gets written now
+		db("COMMIT")
+
+	def _save_in_background(self, savegame, on_finished):
+		"""Saves without writing the savegame on the game thread.
+
+		The state of the session is recorded in a SavegameSnapshot, which only takes as long
+		as the save methods of the objects. A SavegameWriterThread writes it to the disk
+		afterwards. Only one savegame is written at a time.
+		The duration of the snapshot is logged and recorded by the tick profiler if enabled.
+
+		@param savegame: absolute path
+		@param on_finished: called on the game thread with whether the savegame has been written
+		"""
+		assert os.path.isabs(savegame)
+		self.wait_for_background_save()
+		self.log.debug("Session: Saving to %s in the background", savegame)
+		self.savecounter += 1
+		snapshot = SavegameSnapshot(savegame)
+		start = time.time()
+		try:
+			self._write_savegame(snapshot)
+		except Exception:
+			self.log.error("Save Exception:")
+			traceback.print_exc()
+			on_finished(False)
+			return
+		# this is the time the game is paused for
+		duration = time.time() - start
+		self.log.debug("Took snapshot of %s in %.3fs", savegame, duration)
+		profiler = Scheduler().profiler
+		if profiler is not None:
+			profiler.add_target_time(('Session', 'savegame_snapshot'), duration)
+
+		thread = SavegameWriterThread(snapshot)
+		thread.start()
+		self._background_save = (thread, on_finished)
+		ExtScheduler().add_new_object(self._check_background_save, self, run_in=0.1, loops=-1)
+
+	def _check_background_save(self):
+		if not self._background_save[0].is_alive():
+			self.wait_for_background_save()
+
+	def wait_for_background_save(self):
+		"""Blocks until the savegame that is being written in the background is complete."""
+		if self._background_save is None:
+			return
+		ExtScheduler().rem_call(self, self._check_background_save)
+		thread, on_finished = self._background_save
+		self._background_save = None
+		thread.join()
+		on_finished(thread.success)
@@ -24,6 +24,7 @@ import random
 from horizons.session import Session
 from horizons.manager import SPManager
 from horizons.constants import SINGLEPLAYER
+from horizons.extscheduler import ExtScheduler
 from horizons.savegamemanager import SavegameManager
 from horizons.timer import Timer
 
@@ -45,12 +46,24 @@ class SPSession(Session):
 		self.start()
 
 	def autosave(self):
-		"""Called automatically in an interval"""
+		"""Called automatically in an interval.
+		The savegame is written on a background thread, see Session._save_in_background."""
+		ExtScheduler().rem_call(self, self._try_autosave)
+		self._try_autosave()
+
+	def _try_autosave(self):
+		"""Autosaves unless an AI player is in the middle of a tick, else tries again shortly.
+		Saving would complete the AI tick early, so the game would continue differently."""
+		if self.world.is_ai_tick_in_progress():
+			self.log.debug("Session: postponing autosave until the AI ticks are complete")
+			ExtScheduler().add_new_object(self._try_autosave, self, run_in=0.1)
+			return
 		self.log.debug("Session: autosaving")
-		success = self._do_save(SavegameManager.create_autosave_filename())
-		if success:
-			SavegameManager.delete_dispensable_savegames(autosaves=True)
-			self.ingame_gui.message_widget.add('AUTOSAVE')
+		def on_finished(success):
+			if success:
+				SavegameManager.delete_dispensable_savegames(autosaves=True)
+				self.ingame_gui.message_widget.add('AUTOSAVE')
+		self._save_in_background(SavegameManager.create_autosave_filename(), on_finished)
 
 	def quicksave(self):
 		"""Called when user presses the quicksave hotkey"""
@@ -115,3 +115,28 @@ class Timer(LivingObject):
 				# If a callback changed the speed to zero, we have to exit
 				return
 			self.tick_next_time = (self.tick_next_time or time.time()) + 1.0 / self.ticks_per_second
+
+
+class HeadlessTimer(Timer):
+	"""Timer that is not registered with the engine pump and not paced by the wall clock.
+	Ticks are only executed on calls to run(), see horizons.headless."""
+
+	def activate(self):
+		pass
+
+	def end(self):
+		LivingObject.end(self)
+
+	def run(self, ticks=None):
+		"""Executes ticks back to back.
+		@param ticks: number of ticks to run, None to run until the game is paused
+		@return: number of ticks that have been run"""
+		start_tick = self.tick_next_id
+		while self.ticks_per_second != 0 and (ticks is None or self.tick_next_id - start_tick < ticks):
+			for f in self.tick_func_test:
+				if f(self.tick_next_id) == self.TEST_SKIP:
+					return self.tick_next_id - start_tick
+			for f in self.tick_func_call:
+				f(self.tick_next_id)
+			self.tick_next_id += 1
+		return self.tick_next_id - start_tick
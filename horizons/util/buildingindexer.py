@@ -19,6 +19,9 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import math
+from array import array
+
 from horizons.util.python import decorators
 
 
@@ -196,6 +199,210 @@ class BuildingIndex(object):
 		return len(self._list)
 
 
+class ArrayBuildingIndexer(object):
+	"""
+	Drop-in replacement for BuildingIndexer that doesn't need an object per tile.
+
+	The number of buildings in range of each tile is kept in a flat array, which is
+	updated row by row with the spans of tiles that are in range of a building. The
+	buildings themselves are kept in a coarse grid of cells. The sorted list of buildings
+	in range of a tile is only assembled when it is requested and cached until the
+	buildings change, so repeated queries don't allocate.
+
+	Queries return the buildings in the same order as BuildingIndexer, which is important
+	for get_random_building_in_range to stay deterministic.
+	"""
+
+	CELL_SIZE = 8
+
+	def __init__(self, radius, coords_list, random=None, buildings=None):
+		"""
+		@see BuildingIndexer.__init__
+		"""
+		self.radius = radius
+		self._random = random
+
+		coords_list = list(coords_list)
+		if coords_list:
+			self._min_x = min(coords[0] for coords in coords_list)
+			self._min_y = min(coords[1] for coords in coords_list)
+			max_x = max(coords[0] for coords in coords_list)
+			max_y = max(coords[1] for coords in coords_list)
+		else:
+			self._min_x = self._min_y = max_x = max_y = 0
+		self._width = max_x - self._min_x + 1
+		self._height = max_y - self._min_y + 1
+		size = self._width * self._height
+
+		self._in_map = bytearray(size)
+		for coords in coords_list:
+			self._in_map[self._get_index(coords)] = 1
+		self._counts = array('H', [0]) * size # number of buildings in range of each tile
+
+		self._buildings = set()
+		self._cells = {} # { (cx, cy): set of buildings, by the top left corner of their position }
+		self._max_extent = 0 # maximum width or height of the buildings
+		self._cache = {} # { index: tuple of (distance, top, bottom, left, right, building) }
+
+		self._add_set = set()
+		self._remove_set = set()
+		self._changed = False
+
+		if buildings:
+			self._add_set.update(buildings)
+			self._update()
+
+	def _get_index(self, coords):
+		return (coords[1] - self._min_y) * self._width + (coords[0] - self._min_x)
+
+	def _get_map_index(self, coords):
+		"""Returns the index of coords or None if they aren't part of the map."""
+		x = coords[0] - self._min_x
+		y = coords[1] - self._min_y
+		if 0 <= x < self._width and 0 <= y < self._height:
+			index = y * self._width + x
+			if self._in_map[index]:
+				return index
+		return None
+
+	def add(self, building):
+		self._remove_set.discard(building)
+		self._add_set.add(building)
+		self._changed = True
+
+	def remove(self, building):
+		self._add_set.discard(building)
+		self._remove_set.add(building)
+		self._changed = True
+
+	def _update(self):
+		for building in self._remove_set:
+			if building in self._buildings:
+				self._buildings.remove(building)
+				self._cells[self._get_cell(building)].remove(building)
+				self._update_counts(building, -1)
+		for building in self._add_set:
+			if building not in self._buildings:
+				self._buildings.add(building)
+				self._cells.setdefault(self._get_cell(building), set()).add(building)
+				self._update_counts(building, 1)
+				pos = building.position
+				self._max_extent = max(self._max_extent, pos.right - pos.left, pos.bottom - pos.top)
+
+		self._cache.clear()
+		self._changed = False
+		self._add_set.clear()
+		self._remove_set.clear()
+
+	def _get_cell(self, building):
+		return (building.position.left // self.CELL_SIZE, building.position.top // self.CELL_SIZE)
+
+	def _update_counts(self, building, delta):
+		"""Adds delta to the counts of all tiles in range of building.
+		These are the same tiles as in building.position.get_radius_coordinates(radius, include_self=True)."""
+		pos = building.position
+		radius = self.radius
+		radius_squared = radius * radius
+		counts = self._counts
+		width = self._width
+		min_x = self._min_x
+
+		for y in xrange(max(pos.top - radius, self._min_y), min(pos.bottom + radius, self._min_y + self._height - 1) + 1):
+			y_diff = max(0, pos.top - y, y - pos.bottom)
+			# the largest x_diff with x_diff ** 2 + y_diff ** 2 <= radius ** 2
+			x_diff = int(math.sqrt(radius_squared - y_diff * y_diff))
+			while x_diff * x_diff + y_diff * y_diff > radius_squared:
+				x_diff -= 1
+			while (x_diff + 1) ** 2 + y_diff * y_diff <= radius_squared:
+				x_diff += 1
+
+			row = (y - self._min_y) * width - min_x
+			left = max(pos.left - x_diff, min_x)
+			right = min(pos.right + x_diff, min_x + width - 1)
+			for index in xrange(row + left, row + right + 1):
+				counts[index] += delta
+
+	def _get_elements(self, index, coords):
+		"""Returns the sorted buildings in range of coords, as BuildingIndex does.
+		@return: tuple of (distance, top, bottom, left, right, building)"""
+		try:
+			return self._cache[index]
+		except KeyError:
+			pass
+
+		elements = []
+		if self._counts[index]:
+			x, y = coords
+			radius = self.radius
+			radius_squared = radius * radius
+			margin = radius + self._max_extent
+			min_cx, min_cy = (x - margin) // self.CELL_SIZE, (y - margin) // self.CELL_SIZE
+			max_cx, max_cy = (x + radius) // self.CELL_SIZE, (y + radius) // self.CELL_SIZE
+			for cx in xrange(min_cx, max_cx + 1):
+				for cy in xrange(min_cy, max_cy + 1):
+					for building in self._cells.get((cx, cy), ()):
+						pos = building.position
+						left = pos.left
+						right = pos.right
+						top = pos.top
+						bottom = pos.bottom
+
+						x_diff = left - x
+						if x_diff < x - right:
+							x_diff = x - right
+						if x_diff < 0:
+							x_diff = 0
+
+						y_diff = top - y
+						if y_diff < y - bottom:
+							y_diff = y - bottom
+						if y_diff < 0:
+							y_diff = 0
+
+						distance = x_diff * x_diff + y_diff * y_diff
+						if distance <= radius_squared:
+							elements.append((distance, top, bottom, left, right, building))
+			elements.sort()
+
+		elements = tuple(elements)
+		self._cache[index] = elements
+		return elements
+
+	def get_buildings_in_range(self, coords):
+		"""
+		@see BuildingIndexer.get_buildings_in_range
+		"""
+		index = self._get_map_index(coords)
+		if index is not None:
+			if self._changed:
+				self._update()
+			return (element[5] for element in self._get_elements(index, coords))
+		return []
+
+	def get_random_building_in_range(self, coords):
+		"""
+		@see BuildingIndexer.get_random_building_in_range
+		"""
+		index = self._get_map_index(coords)
+		if index is not None:
+			if self._changed:
+				self._update()
+			if self._counts[index]:
+				return self._random.choice(self._get_elements(index, coords))[5]
+		return None
+
+	def get_num_buildings_in_range(self, coords):
+		"""
+		@see BuildingIndexer.get_num_buildings_in_range
+		"""
+		index = self._get_map_index(coords)
+		if index is not None:
+			if self._changed:
+				self._update()
+			return self._counts[index]
+
+
 # apply make_constant to classes
 decorators.bind_all(BuildingIndexer)
 decorators.bind_all(BuildingIndex)
+decorators.bind_all(ArrayBuildingIndexer)
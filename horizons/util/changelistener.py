@@ -33,6 +33,8 @@ class ChangeListener(object):
 	NOTE: ChangeListeners aren't saved, they have to be reregistered on load
 	NOTE: RemoveListeners must not access the object, as it is in progress of being destroyed.
 	"""
+	# allows subclasses with __slots__ (e.g. storages) to do without a __dict__
+	__slots__ = ('__listeners', '__remove_listeners', '__event_call_number', '__hard_remove')
 
 	log = logging.getLogger('changelistener')
 
@@ -76,6 +76,9 @@ def get_option_parser():
 	             help="Shows AI plans as highlights (for development only).")
 	ai_group.add_option("--ai-combat-highlights", dest="ai_combat_highlights", action="store_true",
 	             help="Highlights combat ranges for units controlled by AI Players (for development only).")
+	ai_group.add_option("--ai-workers", dest="ai_workers", metavar="<workers>",
+	             type="int", default=0,
+	             help="Uses <workers> processes to evaluate building locations for the AI players (defaults to 0, no extra processes).")
 	p.add_option_group(ai_group)
 
 	dev_group = optparse.OptionGroup(p, "Development options")
@@ -88,8 +91,14 @@ def get_option_parser():
 	             help="Writes log to <filename> instead of to the uh-userdir")
 	dev_group.add_option("--profile", dest="profile", action="store_true",
 	             default=False, help="Enable profiling (for developing only).")
+	dev_group.add_option("--profile-ticks", dest="profile_ticks", metavar="<ticks>", type="int",
+	             help="Measure the duration of ticks and scheduler callbacks, keeping the last <ticks> ticks. "
+	                  "The results are written to the profiling directory in the user dir when the game ends.")
 	dev_group.add_option("--max-ticks", dest="max_ticks", metavar="<max_ticks>", type="int",
 	             help="Run the game for <max_ticks> ticks.")
+	dev_group.add_option("--headless", dest="headless", action="store_true",
+	             default=False, help="Run the game without graphics and as fast as possible. "
+	                                 "Requires a game start parameter, combine with --max-ticks.")
 	dev_group.add_option("--no-freeze-protection", dest="freeze_protection", action="store_false",
 	             default=True, help="Disable freeze protection.")
 	dev_group.add_option("--string-previewer", dest="stringpreview", action="store_true",
@@ -106,6 +115,8 @@ def get_option_parser():
 	             help="Use this seed for singleplayer sessions.")
 	dev_group.add_option("--generate-minimap", dest="generate_minimap",
 	             metavar="<parameters>", help=optparse.SUPPRESS_HELP)
+	dev_group.add_option("--generate-previews", dest="generate_previews",
+	             metavar="<parameters>", help=optparse.SUPPRESS_HELP)
 	dev_group.add_option("--create-mp-game", action="store_true", dest="create_mp_game",
 	             help="Create an multiplayer game with default settings.")
 	dev_group.add_option("--join-mp-game", action="store_true", dest="join_mp_game",
@@ -0,0 +1,143 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import hashlib
+import logging
+import os
+import sqlite3
+
+from horizons.constants import PATHS
+from horizons.util.dbreader import DbReader
+
+
+class GameDbSnapshot(object):
+	"""Prebuilt sqlite file of the game data in PATHS.DB_FILES.
+
+	Executing the sql files takes a while, especially with the generated atlas.sql. Instead,
+	they are executed once into a database file, which is then copied into the in-memory
+	game db on every start. The snapshot stores the sha1 of the content of the files it was
+	built from and is rebuilt as soon as any of them changes.
+
+	Python 2's sqlite3 has no backup API, the tables are copied by attaching the snapshot
+	and executing INSERT ... SELECT, which doesn't leave sqlite either.
+	"""
+
+	filename = PATHS.GAME_DB_SNAPSHOT_PATH
+
+	# table in the snapshot that contains the hash, it isn't copied
+	INFO_TABLE = 'snapshot_info'
+
+	log = logging.getLogger("util.gamedbsnapshot")
+
+	@classmethod
+	def get_hash(cls, files):
+		"""@return: hex digest of the names and contents of files"""
+		h = hashlib.sha1()
+		for filename in files:
+			h.update(filename + '\0')
+			with open(filename, 'rb') as f:
+				h.update(f.read())
+			h.update('\0')
+		return h.hexdigest()
+
+	@classmethod
+	def execute_files(cls, db, files):
+		"""Executes the sql files in db, this is what the snapshot replaces.
+		@param db: DbReader"""
+		for filename in files:
+			with open(filename, 'r') as f:
+				db.execute_script("BEGIN TRANSACTION;" + f.read() + "COMMIT;")
+
+	@classmethod
+	def load(cls, db, files):
+		"""Fills db with the game data of the snapshot of files.
+		@param db: DbReader of an empty database
+		@return: whether the snapshot was up to date and has been loaded"""
+		if not os.path.exists(cls.filename):
+			return False
+		filehash = cls.get_hash(files)
+		try:
+			db("ATTACH DATABASE ? AS snapshot", cls.filename)
+		except sqlite3.Error as e:
+			cls.log.warning("Can't open game db snapshot %s: %s", cls.filename, e)
+			return False
+		try:
+			try:
+				if db("SELECT hash FROM snapshot.%s" % cls.INFO_TABLE) != [(filehash, )]:
+					return False
+			except sqlite3.Error:
+				return False
+
+			try:
+				db("BEGIN")
+				cls._copy(db)
+				db("COMMIT")
+			except sqlite3.Error as e:
+				cls.log.warning("Failed to load game db snapshot %s: %s", cls.filename, e)
+				db("ROLLBACK")
+				return False
+		finally:
+			db("DETACH DATABASE snapshot")
+		return True
+
+	@classmethod
+	def _copy(cls, db):
+		"""Copies schema and content of the attached snapshot to the main database of db."""
+		objects = db("SELECT type, name, sql FROM snapshot.sqlite_master "
+		             "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' AND name != ?", cls.INFO_TABLE)
+		# the content has to be copied before triggers exist and is faster without indices
+		for object_type, name, sql in objects:
+			if object_type == 'table':
+				db(sql)
+				columns = ', '.join('"%s"' % column[1] for column in db('PRAGMA snapshot.table_info("%s")' % name))
+				db('INSERT INTO main."{table}"(rowid, {columns}) SELECT rowid, {columns} FROM snapshot."{table}"'
+				   .format(table=name, columns=columns))
+		for object_type, name, sql in objects:
+			if object_type != 'table':
+				db(sql)
+
+	@classmethod
+	def save(cls, files):
+		"""Builds the snapshot of files.
+		@return: whether the snapshot has been written"""
+		tmp_filename = '%s.%d.tmp' % (cls.filename, os.getpid())
+		try:
+			if os.path.exists(tmp_filename):
+				os.unlink(tmp_filename)
+			db = DbReader(tmp_filename)
+			try:
+				cls.execute_files(db, files)
+				db("CREATE TABLE %s (hash TEXT)" % cls.INFO_TABLE)
+				db("INSERT INTO %s (hash) VALUES (?)" % cls.INFO_TABLE, cls.get_hash(files))
+			finally:
+				db.close()
+			try:
+				os.rename(tmp_filename, cls.filename)
+			except OSError: # windows doesn't replace existing files
+				os.unlink(cls.filename)
+				os.rename(tmp_filename, cls.filename)
+		except (sqlite3.Error, IOError, OSError) as e:
+			cls.log.warning("Failed to write game db snapshot %s: %s", cls.filename, e)
+			if os.path.exists(tmp_filename):
+				os.unlink(tmp_filename)
+			return False
+		return True
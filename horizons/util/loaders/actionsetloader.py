@@ -26,6 +26,7 @@ import horizons.globals
 
 from horizons.constants import PATHS
 from horizons.util.loaders.loader import GeneralLoader
+from horizons.util.loaders.directoryindexcache import DirectoryIndexCache
 from horizons.util.loaders.jsondecoder import JsonDecoder
 
 class ActionSetLoader(object):
@@ -54,12 +55,18 @@ class ActionSetLoader(object):
 				if os.path.isdir(full_path) and entry != ".DS_Store":
 					cls._find_action_sets(full_path)
 
+	@classmethod
+	def _load_action_sets(cls, directory):
+		cls.action_sets = {}
+		cls._find_action_sets(directory)
+		return cls.action_sets
+
 	@classmethod
 	def load(cls):
 		if not cls._loaded:
 			cls.log.debug("Loading action_sets...")
 			if not horizons.globals.fife.use_atlases:
-				cls._find_action_sets(PATHS.ACTION_SETS_DIRECTORY)
+				cls.action_sets = DirectoryIndexCache.get(PATHS.ACTION_SETS_DIRECTORY, cls._load_action_sets)
 			else:
 				cls.action_sets = JsonDecoder.load(PATHS.ACTION_SETS_JSON_FILE)
 			cls.log.debug("Done!")
@@ -0,0 +1,97 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import logging
+import os
+import threading
+import time
+
+from horizons.constants import PATHS
+from horizons.util.yamlcachestorage import YamlCacheStorage
+
+
+class DirectoryIndexCache(object):
+	"""Persistent cache for data that only depends on the names of the files and directories
+	in a directory tree, like the action sets. Threadsafe.
+
+	The mtime of a directory changes whenever an entry is added, removed or renamed in it, so
+	the data is up to date as long as the mtimes of all directories in the tree are the same
+	as when the data was loaded. Checking that only needs a stat for each directory.
+	"""
+
+	cache = None
+	cache_filename = os.path.join(PATHS.USER_DIR, 'gfxindex.cache')
+
+	# increment this when the loaders change the data they create
+	version = 1
+
+	# directories modified more recently than this (in seconds) are considered changed on the
+	# next start, since changes within the resolution of the mtime aren't detectable
+	MTIME_RESOLUTION = 2
+
+	lock = threading.Lock()
+
+	log = logging.getLogger("util.loaders.directoryindexcache")
+
+	@classmethod
+	def get(cls, directory, load):
+		"""Returns load(directory), from the cache if the directory tree hasn't changed.
+		@param load: function that loads the data of a directory tree, the result has to be picklable
+		"""
+		key = '%s:%s' % (load.__name__, directory)
+		with cls.lock:
+			if cls.cache is None:
+				cls.cache = YamlCacheStorage.open(cls.cache_filename)
+
+			if key in cls.cache:
+				version, mtimes, data = cls.cache[key]
+				if version == cls.version and cls._is_unchanged(mtimes):
+					return data
+
+			cls.log.debug("Loading %s from %s", load.__name__, directory)
+			# get the mtimes first, changes while loading mustn't go unnoticed
+			mtimes = cls._get_mtimes(directory)
+			data = load(directory)
+			cls.cache[key] = (cls.version, mtimes, data)
+			cls.cache.sync()
+			return data
+
+	@classmethod
+	def _get_mtimes(cls, directory):
+		"""@return: {path: mtime or None if it may still change unnoticed} of all directories in the tree"""
+		now = time.time()
+		mtimes = {}
+		for path, dirnames, filenames in os.walk(directory, followlinks=True):
+			# the atlas generator uses int mtimes, the game floats
+			mtime = int(os.stat(path).st_mtime)
+			mtimes[path] = mtime if now - mtime > cls.MTIME_RESOLUTION else None
+		return mtimes
+
+	@classmethod
+	def _is_unchanged(cls, mtimes):
+		for path, mtime in mtimes.iteritems():
+			try:
+				if mtime is None or int(os.stat(path).st_mtime) != mtime:
+					return False
+			except OSError:
+				return False
+		return True
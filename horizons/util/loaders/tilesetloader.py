@@ -26,6 +26,7 @@ import horizons.globals
 
 from horizons.constants import PATHS
 from horizons.util.loaders.loader import GeneralLoader
+from horizons.util.loaders.directoryindexcache import DirectoryIndexCache
 from horizons.util.loaders.jsondecoder import JsonDecoder
 
 class TileSetLoader(object):
@@ -54,13 +55,19 @@ class TileSetLoader(object):
 				if os.path.isdir(full_path) and entry != ".DS_Store":
 					cls._find_tile_sets(full_path)
 
+	@classmethod
+	def _load_tile_sets(cls, directory):
+		cls.tile_sets = {}
+		cls._find_tile_sets(directory)
+		return cls.tile_sets
+
 	@classmethod
 	def load(cls):
 		#print "called"
 		if not cls._loaded:
 			cls.log.debug("Loading tile_sets...")
 			if not horizons.globals.fife.use_atlases:
-				cls._find_tile_sets(PATHS.TILE_SETS_DIRECTORY)
+				cls.tile_sets = DirectoryIndexCache.get(PATHS.TILE_SETS_DIRECTORY, cls._load_tile_sets)
 			else:
 				cls.tile_sets = JsonDecoder.load(PATHS.TILE_SETS_JSON_FILE)
 			cls.log.debug("Done!")
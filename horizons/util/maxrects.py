@@ -0,0 +1,134 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+class MaxRectsBin(object):
+	"""Packs rectangles into a fixed size area with the MaxRects algorithm.
+
+	The free space is kept as a list of maximal free rectangles, which may overlap. A new
+	rectangle is put into the free rectangle that leaves the shortest side over (best short
+	side fit), then all free rectangles that intersect it are split into the parts around it.
+
+	Rectangles can also be removed again, their area is added back as a free rectangle and
+	joined with free rectangles next to it.
+	Rectangles are never rotated.
+	"""
+
+	def __init__(self, width, height):
+		self.width = width
+		self.height = height
+		self.free_rects = [(0, 0, width, height)] # [(x, y, width, height)]
+		self.used_area = 0
+
+	def insert(self, width, height):
+		"""Finds a place for a rectangle and marks it as used.
+		@return: (x, y) of the rectangle or None if there is no space for it"""
+		best_score = None
+		best_position = None
+		for (free_x, free_y, free_width, free_height) in self.free_rects:
+			if width <= free_width and height <= free_height:
+				left_x = free_width - width
+				left_y = free_height - height
+				score = (min(left_x, left_y), max(left_x, left_y))
+				if best_score is None or score < best_score:
+					best_score = score
+					best_position = (free_x, free_y)
+		if best_position is None:
+			return None
+
+		self._place(best_position[0], best_position[1], width, height)
+		self.used_area += width * height
+		return best_position
+
+	def _place(self, x, y, width, height):
+		"""Removes the area of a rectangle from the free rectangles."""
+		right = x + width
+		bottom = y + height
+		free_rects = []
+		for rect in self.free_rects:
+			(free_x, free_y, free_width, free_height) = rect
+			free_right = free_x + free_width
+			free_bottom = free_y + free_height
+			if x >= free_right or right <= free_x or y >= free_bottom or bottom <= free_y:
+				free_rects.append(rect)
+				continue
+			# split into the parts that don't intersect
+			if x > free_x:
+				free_rects.append((free_x, free_y, x - free_x, free_height))
+			if right < free_right:
+				free_rects.append((right, free_y, free_right - right, free_height))
+			if y > free_y:
+				free_rects.append((free_x, free_y, free_width, y - free_y))
+			if bottom < free_bottom:
+				free_rects.append((free_x, bottom, free_width, free_bottom - bottom))
+		self.free_rects = self._prune(free_rects)
+
+	@classmethod
+	def _prune(cls, rects):
+		"""Removes the rectangles that are contained in another one."""
+		# bigger rectangles first, a rectangle can only be contained in one that comes before it
+		rects = sorted(set(rects), key=lambda rect: rect[2] * rect[3], reverse=True)
+		result = []
+		for rect in rects:
+			(x, y, width, height) = rect
+			for (other_x, other_y, other_width, other_height) in result:
+				if other_x <= x and other_y <= y and x + width <= other_x + other_width and \
+				   y + height <= other_y + other_height:
+					break
+			else:
+				result.append(rect)
+		return result
+
+	@classmethod
+	def _merge(cls, rects):
+		"""Joins rectangles that share a whole edge."""
+		rects = list(rects)
+		merged = True
+		while merged:
+			merged = False
+			for i, (x, y, width, height) in enumerate(rects):
+				for j in xrange(i + 1, len(rects)):
+					(other_x, other_y, other_width, other_height) = rects[j]
+					if y == other_y and height == other_height and \
+					   (x + width == other_x or other_x + other_width == x):
+						rects[i] = (min(x, other_x), y, width + other_width, height)
+					elif x == other_x and width == other_width and \
+					     (y + height == other_y or other_y + other_height == y):
+						rects[i] = (x, min(y, other_y), width, height + other_height)
+					else:
+						continue
+					del rects[j]
+					merged = True
+					break
+				if merged:
+					break
+		return rects
+
+	def remove(self, x, y, width, height):
+		"""Marks the area of a rectangle that has been inserted before as free."""
+		self.free_rects = self._prune(self._merge(self.free_rects + [(x, y, width, height)]))
+		self.used_area -= width * height
+
+	@property
+	def occupancy(self):
+		"""@return: used fraction of the area"""
+		return float(self.used_area) / (self.width * self.height)
@@ -0,0 +1,289 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+from itertools import islice
+
+from horizons.util.pathfinding.pathfinding import FindPath
+
+"""
+This file contains a variant of the FindPath algorithm that works on a PathGrid instead
+of a dict of path nodes. It finds exactly the same paths as FindPath. As FindPath, it
+should only be used through the Pather interface.
+"""
+
+class PathGrid(object):
+	"""Walkable nodes of a rectangular area, stored in flat arrays.
+
+	A node (x, y) has the index (y - min_y + 1) * width + (x - min_x + 1). The grid has a
+	border of one unwalkable node on each side, so neighbors of nodes inside the area never
+	wrap around to another row.
+
+	Besides the node data, the grid owns the buffers used by GridFindPath. They are
+	allocated on the first search and reused afterwards. Instead of clearing them,
+	every search uses a new stamp.
+
+	The generation is increased whenever the walkable nodes change, which allows to
+	detect outdated search results (see PathCache). The coords of the last changes are
+	kept, so that users of the grid can find out what has changed since a generation.
+	"""
+
+	# number of changes that are remembered by get_changes_since
+	MAX_CHANGES = 1024
+
+	def __init__(self, min_x, min_y, max_x, max_y):
+		self.min_x = min_x
+		self.min_y = min_y
+		self.max_x = max_x
+		self.max_y = max_y
+		self.width = max_x - min_x + 3
+		self.height = max_y - min_y + 3
+		size = self.width * self.height
+
+		self.walkable = bytearray(size)
+		self.speed = array('d', [0.0]) * size
+		self.generation = 0
+		self._changes = deque(maxlen=self.MAX_CHANGES)
+
+		# search buffers, see next_stamp
+		self.stamp = 0
+		self.seen_stamp = None
+		self.previous = None
+		self.distance = None
+
+	@classmethod
+	def from_nodes(cls, nodes, rect=None):
+		"""Creates a grid containing the nodes.
+		@param nodes: { (x, y): speed } or iterable of (x, y)
+		@param rect: Rect that limits the area of the grid, defaults to the bounding box of nodes
+		"""
+		if rect is not None:
+			grid = cls(rect.left, rect.top, rect.right, rect.bottom)
+		elif nodes:
+			xs = [coords[0] for coords in nodes]
+			ys = [coords[1] for coords in nodes]
+			grid = cls(min(xs), min(ys), max(xs), max(ys))
+		else:
+			grid = cls(0, 0, 0, 0)
+
+		if isinstance(nodes, dict):
+			for coords, speed in nodes.iteritems():
+				grid.add(coords, speed)
+		else:
+			for coords in nodes:
+				grid.add(coords)
+		return grid
+
+	def get_index(self, coords):
+		"""Returns the index of coords or None if they are outside of the grid."""
+		x, y = coords
+		if self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y:
+			return (y - self.min_y + 1) * self.width + (x - self.min_x + 1)
+		return None
+
+	def add(self, coords, speed=1.0):
+		index = self.get_index(coords)
+		assert index is not None, 'coords %s are outside of the grid' % (coords, )
+		if not self.walkable[index] or self.speed[index] != speed:
+			self.walkable[index] = 1
+			self.speed[index] = speed
+			self.generation += 1
+			self._changes.append(coords)
+
+	def remove(self, coords):
+		index = self.get_index(coords)
+		if index is not None and self.walkable[index]:
+			self.walkable[index] = 0
+			self.speed[index] = 0.0
+			self.generation += 1
+			self._changes.append(coords)
+
+	def get_changes_since(self, generation):
+		"""Returns the coords that changed after the generation.
+		@return: list of (x, y), or None if the changes aren't known anymore"""
+		count = self.generation - generation
+		if count > len(self._changes):
+			return None
+		return list(islice(self._changes, len(self._changes) - count, None))
+
+	def __contains__(self, coords):
+		index = self.get_index(coords)
+		return index is not None and self.walkable[index] == 1
+
+	def get(self, coords, default=None):
+		"""Returns the speed of a walkable node, like dict.get for path nodes."""
+		index = self.get_index(coords)
+		if index is None or not self.walkable[index]:
+			return default
+		return self.speed[index]
+
+	def next_stamp(self):
+		"""Invalidates the search buffers.
+		@return: the stamp marking entries of the new search"""
+		self.stamp += 1
+		if self.stamp == 1 or self.stamp > 0xffffffff:
+			# first search or the stamp can't be represented in the arrays any more
+			size = self.width * self.height
+			self.seen_stamp = array('L', [0]) * size
+			self.previous = array('l', [-1]) * size
+			self.distance = array('d', [0.0]) * size
+			self.stamp = 1
+		return self.stamp
+
+
+class GridFindPath(FindPath):
+	"""FindPath on a PathGrid.
+
+	Node lookups are index operations on the arrays of the grid instead of dict lookups of
+	coordinate tuples, which makes searches on large areas (e.g. ships on the sea) a lot
+	cheaper. Nodes are expanded in the same order as in FindPath, so the resulting paths
+	are the same.
+
+	After a search, explored_area is the bounding box (min_x, min_y, max_x, max_y) of the
+	nodes it has looked at, except for the destination. The result only depends on these
+	nodes, so changes of the grid outside of the area and the destination don't affect it.
+	It is None if the nodes aren't known.
+	"""
+
+	explored_area = None
+
+	def __call__(self, source, destination, path_grid, blocked_coords=None,
+		        diagonal=False, make_target_walkable=True):
+		"""
+		@param path_grid: PathGrid
+		@see FindPath.__call__
+		"""
+		blocked_coords = blocked_coords or []
+		assert isinstance(path_grid, PathGrid)
+		assert isinstance(blocked_coords, (dict, list, set))
+
+		self.source = source
+		self.destination = destination
+		self.path_nodes = path_grid
+		self.blocked_coords = blocked_coords
+		self.diagonal = diagonal
+		self.make_target_walkable = make_target_walkable
+		self.explored_area = None
+
+		if not self.setup():
+			return None
+
+		path = self.execute()
+		self.log.debug('found path: %s', path)
+		return path
+
+	def execute(self):
+		"""Executes algorithm, see FindPath.execute for details"""
+		grid = self.path_nodes
+		destination = self.destination
+		destination_to_tuple_distance_func = destination.get_distance_function((0, 0))
+		get_index = grid.get_index
+
+		source_coords = self.source.get_coordinates()
+		dest_coords = destination.get_coordinates()
+		if not self.make_target_walkable:
+			dest_coords = [coords for coords in dest_coords if coords in grid]
+		if not source_coords or not dest_coords:
+			return None
+
+		source_indices = [get_index(coords) for coords in source_coords]
+		dest_indices = [get_index(coords) for coords in dest_coords]
+		if None in source_indices or None in dest_indices:
+			# the grid doesn't cover the coords, this is only supported by FindPath
+			return FindPath.execute(self)
+
+		stamp = grid.next_stamp()
+		walkable = grid.walkable
+		speed = grid.speed
+		seen = grid.seen_stamp # nodes that are or have been in the heap
+		previous = grid.previous
+		distance = grid.distance
+
+		# blocked nodes are just never added to the heap
+		for coords in self.blocked_coords:
+			index = get_index(coords)
+			if index is not None:
+				seen[index] = stamp
+
+		# bounding box of the expanded nodes, their neighbors are checked as well
+		min_x = min(coords[0] for coords in source_coords)
+		min_y = min(coords[1] for coords in source_coords)
+		max_x = max(coords[0] for coords in source_coords)
+		max_y = max(coords[1] for coords in source_coords)
+
+		heap = []
+		for coords, index in sorted(set(zip(source_coords, source_indices))):
+			seen[index] = stamp
+			previous[index] = -1
+			distance[index] = 0
+			heappush(heap, (destination_to_tuple_distance_func(destination, coords), coords[0], coords[1], index))
+
+		# the destination is reachable even if it is not walkable, temporarily make it walkable
+		dest_set = set(dest_indices)
+		unwalkable_dest_indices = [index for index in dest_set if not walkable[index]]
+		for index in unwalkable_dest_indices:
+			walkable[index] = 1
+
+		w = grid.width
+		if self.diagonal:
+			# same order as in FindPath, which doesn't matter for the result though
+			neighbor_offsets = ((-1, -1, -w-1), (-1, 0, -1), (-1, 1, w-1), (0, -1, -w),
+			                    (0, 1, w), (1, -1, -w+1), (1, 0, 1), (1, 1, w+1))
+		else:
+			neighbor_offsets = ((-1, 0, -1), (1, 0, 1), (0, -1, -w), (0, 1, w))
+
+		try:
+			while heap:
+				(_, x, y, index) = heappop(heap)
+				if x < min_x:
+					min_x = x
+				elif x > max_x:
+					max_x = x
+				if y < min_y:
+					min_y = y
+				elif y > max_y:
+					max_y = y
+
+				if index in dest_set:
+					path = []
+					while index != -1:
+						path.append(((index % w) + grid.min_x - 1, (index // w) + grid.min_y - 1))
+						index = previous[index]
+					path.reverse()
+					return path
+
+				dist_to_neighbor = distance[index] + speed[index]
+				for (dx, dy, offset) in neighbor_offsets:
+					neighbor = index + offset
+					if seen[neighbor] != stamp and walkable[neighbor]:
+						seen[neighbor] = stamp
+						previous[neighbor] = index
+						distance[neighbor] = dist_to_neighbor
+						neighbor_coords = (x + dx, y + dy)
+						heappush(heap, (destination_to_tuple_distance_func(destination, neighbor_coords) + dist_to_neighbor,
+						                neighbor_coords[0], neighbor_coords[1], neighbor))
+			return None
+		finally:
+			for index in unwalkable_dest_indices:
+				walkable[index] = 0
+			self.explored_area = (min_x - 1, min_y - 1, max_x + 1, max_y + 1)
@@ -0,0 +1,485 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+from heapq import heappush, heappop
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
+from horizons.util.shapes import Point
+
+"""
+This file contains a hierarchical pathfinding algorithm (HPA*) for units that move
+diagonally on large PathGrids, i.e. ships. As FindPath, it should only be used through
+the Pather interface.
+"""
+
+class PathHierarchy(object):
+	"""Abstraction of a PathGrid into clusters connected by entrances.
+
+	The grid is divided into square clusters. Wherever walkable nodes of two neighboring
+	clusters touch, the border is an entrance, which is represented by one or two pairs of
+	nodes (one node on each side of the border). These nodes make up the abstract graph:
+	nodes of the same cluster are connected by the length of the shortest path within the
+	cluster, pairs of an entrance are connected directly.
+
+	A long path is then found by searching the small abstract graph and refining only the
+	segments between consecutive abstract nodes on the grid. The resulting paths are not
+	necessarily optimal, but close to it.
+
+	The edges within a cluster are calculated on first use. Changes of the grid are applied
+	before each search (see _sync): the entrances of the affected clusters are recalculated
+	and their edges are dropped.
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	CLUSTER_SIZE = 16
+
+	# entrances that are at least this long are represented by two pairs at their ends
+	LONG_ENTRANCE_LENGTH = 6
+
+	def __init__(self, path_grid, cluster_size=CLUSTER_SIZE):
+		self.grid = path_grid
+		self.cluster_size = cluster_size
+		self.num_clusters_x = (path_grid.max_x - path_grid.min_x) // cluster_size + 1
+		self.num_clusters_y = (path_grid.max_y - path_grid.min_y) // cluster_size + 1
+
+		# { ('h', cx, cy): [(index, index), ..] }: pairs of the border between (cx, cy) and (cx + 1, cy)
+		# { ('v', cx, cy): [(index, index), ..] }: pairs of the border between (cx, cy) and (cx, cy + 1)
+		self._entrances = {}
+		# { (cx, cy): { index: [(index, cost), ..] } }: abstract graph, built on demand
+		self._edges = {}
+		# { (cx, cy): { (index, index): [(x, y), ..] } }: paths of the edges of clusters that aren't open
+		self._segments = {}
+		# { (cx, cy): speed or None }, see _is_open
+		self._open = {}
+		# generation of the grid the abstraction is based on
+		self._generation = None
+		self._sync()
+
+	def get_cluster(self, coords):
+		"""@return: (cx, cy) of the cluster containing coords"""
+		return ((coords[0] - self.grid.min_x) // self.cluster_size,
+		        (coords[1] - self.grid.min_y) // self.cluster_size)
+
+	def _get_cluster_rect(self, cluster):
+		"""@return: (min_x, min_y, max_x, max_y) of the cluster, limited to the grid"""
+		min_x = self.grid.min_x + cluster[0] * self.cluster_size
+		min_y = self.grid.min_y + cluster[1] * self.cluster_size
+		return (min_x, min_y, min(min_x + self.cluster_size - 1, self.grid.max_x),
+		        min(min_y + self.cluster_size - 1, self.grid.max_y))
+
+	def _get_coords(self, index):
+		w = self.grid.width
+		return ((index % w) + self.grid.min_x - 1, (index // w) + self.grid.min_y - 1)
+
+	def _update_entrances(self, border):
+		"""Recalculates the pairs of nodes of a border."""
+		direction, cx, cy = border
+		if not (0 <= cx < self.num_clusters_x and 0 <= cy < self.num_clusters_y) or \
+		   (direction == 'h' and cx + 1 >= self.num_clusters_x) or \
+		   (direction == 'v' and cy + 1 >= self.num_clusters_y):
+			return # no such border
+
+		min_x, min_y, max_x, max_y = self._get_cluster_rect((cx, cy))
+		if direction == 'h':
+			# (x, y) on the right border and (x + 1, y)
+			cells = [(max_x, y) for y in xrange(min_y, max_y + 1)]
+			offset = 1
+			along = self.grid.width
+		else:
+			# (x, y) on the bottom border and (x, y + 1)
+			cells = [(x, max_y) for x in xrange(min_x, max_x + 1)]
+			offset = self.grid.width
+			along = 1
+
+		walkable = self.grid.walkable
+		pairs = []
+		run = []
+		for coords in cells + [None]:
+			index = self.grid.get_index(coords) if coords is not None else None
+			if index is not None and walkable[index] and walkable[index + offset]:
+				run.append(index)
+				continue
+			if index is not None and walkable[index]:
+				# units can squeeze diagonally between two unwalkable nodes. such a connection
+				# can lead into the diagonally neighboring cluster at the ends of the border.
+				for other in (index + offset - along, index + offset + along):
+					if walkable[other] and not walkable[other - offset]:
+						pairs.append((index, other))
+			if run:
+				if len(run) < self.LONG_ENTRANCE_LENGTH:
+					run = [run[len(run) // 2]]
+				else:
+					run = [run[0], run[-1]]
+				pairs.extend((i, i + offset) for i in run)
+				run = []
+
+		if pairs:
+			self._entrances[border] = pairs
+		else:
+			self._entrances.pop(border, None)
+
+	def _get_borders(self, cluster):
+		"""@return: the borders that can have pairs with nodes in the cluster"""
+		cx, cy = cluster
+		return (('h', cx, cy), ('h', cx - 1, cy - 1), ('h', cx - 1, cy), ('h', cx - 1, cy + 1),
+		        ('v', cx, cy), ('v', cx - 1, cy - 1), ('v', cx, cy - 1), ('v', cx + 1, cy - 1))
+
+	def _sync(self):
+		"""Applies the changes of the grid since the last call."""
+		if self._generation == self.grid.generation:
+			return
+		changes = None
+		if self._generation is not None:
+			changes = self.grid.get_changes_since(self._generation)
+		if changes is None:
+			self._update_all()
+		else:
+			self.update(changes)
+		self._generation = self.grid.generation
+
+	def _update_all(self):
+		"""Recalculates all entrances and drops all edges."""
+		self._entrances.clear()
+		self._edges.clear()
+		self._segments.clear()
+		self._open.clear()
+		for cx in xrange(self.num_clusters_x):
+			for cy in xrange(self.num_clusters_y):
+				self._update_entrances(('h', cx, cy))
+				self._update_entrances(('v', cx, cy))
+
+	def update(self, coords):
+		"""Updates the abstraction after the walkability of coords changed in the grid.
+		@param coords: iterable of (x, y)"""
+		clusters = set(self.get_cluster(c) for c in coords)
+		for (cx, cy) in clusters:
+			for border in self._get_borders((cx, cy)):
+				self._update_entrances(border)
+			for x in xrange(cx - 1, cx + 2):
+				for y in xrange(cy - 1, cy + 2):
+					self._edges.pop((x, y), None)
+					self._segments.pop((x, y), None)
+			self._open.pop((cx, cy), None)
+
+	def _search_cluster(self, cluster, seeds):
+		"""Dijkstra restricted to a cluster.
+		@param seeds: indices of nodes in the cluster to start from
+		@return: ({ index: distance }, { index: previous index }) of all reachable nodes in the cluster"""
+		min_x, min_y, max_x, max_y = self._get_cluster_rect(cluster)
+		grid = self.grid
+		w = grid.width
+		walkable = grid.walkable
+		speed = grid.speed
+		neighbor_offsets = (-w-1, -1, w-1, -w, w, -w+1, 1, w+1)
+		# the cluster's rows and columns, in index space
+		row_min, row_max = min_y - grid.min_y + 1, max_y - grid.min_y + 1
+		col_min, col_max = min_x - grid.min_x + 1, max_x - grid.min_x + 1
+
+		distance = {}
+		previous = {}
+		heap = [(0, index) for index in sorted(set(seeds))]
+		for index in seeds:
+			distance[index] = 0
+			previous[index] = None
+		while heap:
+			dist, index = heappop(heap)
+			if dist > distance[index]:
+				continue
+			dist_to_neighbor = dist + speed[index]
+			for offset in neighbor_offsets:
+				neighbor = index + offset
+				if not walkable[neighbor] or not (row_min <= neighbor // w <= row_max and
+				                                  col_min <= neighbor % w <= col_max):
+					continue
+				if dist_to_neighbor < distance.get(neighbor, dist_to_neighbor + 1):
+					distance[neighbor] = dist_to_neighbor
+					previous[neighbor] = index
+					heappush(heap, (dist_to_neighbor, neighbor))
+		return distance, previous
+
+	def _is_open(self, cluster):
+		"""@return: speed of all nodes if all nodes of the cluster are walkable and equally fast, else None"""
+		try:
+			return self._open[cluster]
+		except KeyError:
+			self._open[cluster] = self._check_open(cluster)
+			return self._open[cluster]
+
+	def _check_open(self, cluster):
+		min_x, min_y, max_x, max_y = self._get_cluster_rect(cluster)
+		grid = self.grid
+		speeds = set()
+		for y in xrange(min_y, max_y + 1):
+			start = grid.get_index((min_x, y))
+			if not all(grid.walkable[start:start + max_x - min_x + 1]):
+				return None
+			speeds.update(grid.speed[start:start + max_x - min_x + 1])
+			if len(speeds) > 1:
+				return None
+		return speeds.pop()
+
+	def _get_edges(self, cluster):
+		"""@return: { index: [(index, cost), ..] } for the abstract nodes of the cluster"""
+		edges = self._edges.get(cluster)
+		if edges is not None:
+			return edges
+
+		edges = {}
+		for border in self._get_borders(cluster):
+			for pair in self._entrances.get(border, ()):
+				for (node, other) in (pair, pair[::-1]):
+					if self.get_cluster(self._get_coords(node)) == cluster:
+						edges.setdefault(node, []).append((other, self.grid.speed[node]))
+
+		nodes = sorted(edges)
+		open_speed = self._is_open(cluster)
+		segments = {}
+		for node in nodes:
+			if open_speed is not None:
+				# the distance is the number of diagonal steps
+				x, y = self._get_coords(node)
+				for other in nodes:
+					if other != node:
+						other_x, other_y = self._get_coords(other)
+						edges[node].append((other, max(abs(x - other_x), abs(y - other_y)) * open_speed))
+			else:
+				distance, previous = self._search_cluster(cluster, [node])
+				for other in nodes:
+					if other != node and other in distance:
+						edges[node].append((other, distance[other]))
+						# remember the path, it is needed to refine this edge
+						path = []
+						index = other
+						while index is not None:
+							path.append(self._get_coords(index))
+							index = previous[index]
+						path.reverse()
+						segments[(node, other)] = path
+
+		self._edges[cluster] = edges
+		self._segments[cluster] = segments
+		return edges
+
+	def _get_distances_to_nodes(self, coords):
+		"""@return: { index: distance } to the abstract nodes of the clusters of coords"""
+		seeds = {}
+		for c in coords:
+			seeds.setdefault(self.get_cluster(c), []).append(c)
+
+		result = {}
+		for cluster, cluster_coords in sorted(seeds.iteritems()):
+			open_speed = self._is_open(cluster)
+			if open_speed is not None:
+				distance = {}
+				for node in self._get_edges(cluster):
+					x, y = self._get_coords(node)
+					distance[node] = min(max(abs(x - c[0]), abs(y - c[1])) for c in cluster_coords) * open_speed
+			else:
+				distance = self._search_cluster(cluster, [self.grid.get_index(c) for c in cluster_coords])[0]
+			for node in self._get_edges(cluster):
+				if node in distance and distance[node] < result.get(node, distance[node] + 1):
+					result[node] = distance[node]
+		return result
+
+	def _find_abstract_path(self, source_coords, dest_coords, destination):
+		"""A* on the abstract graph.
+		@return: list of indices of abstract nodes or None"""
+		start = self._get_distances_to_nodes(source_coords)
+		goal = self._get_distances_to_nodes(dest_coords)
+		if not start or not goal:
+			return None
+
+		destination_to_tuple_distance_func = destination.get_distance_function((0, 0))
+		heuristic = lambda index: destination_to_tuple_distance_func(destination, self._get_coords(index))
+
+		GOAL = -1
+		distance = {}
+		previous = {}
+		heap = []
+		for node, dist in sorted(start.iteritems()):
+			distance[node] = dist
+			previous[node] = None
+			heappush(heap, (dist + heuristic(node), dist, node))
+
+		while heap:
+			(_, dist, node) = heappop(heap)
+			if node == GOAL:
+				path = []
+				node = previous[GOAL]
+				while node is not None:
+					path.append(node)
+					node = previous[node]
+				path.reverse()
+				return path
+			if dist > distance[node]:
+				continue
+
+			neighbors = self._get_edges(self.get_cluster(self._get_coords(node)))[node]
+			if node in goal:
+				neighbors = neighbors + [(GOAL, goal[node])]
+			for (neighbor, cost) in neighbors:
+				new_dist = dist + cost
+				if new_dist < distance.get(neighbor, new_dist + 1):
+					distance[neighbor] = new_dist
+					previous[neighbor] = node
+					estimate = 0 if neighbor == GOAL else heuristic(neighbor)
+					heappush(heap, (new_dist + estimate, new_dist, neighbor))
+		return None
+
+	def find_path(self, source, destination, blocked_coords=None, make_target_walkable=False):
+		"""Finds a path with diagonal movement, see FindPath.__call__ for the parameters.
+		Paths between close coords and any searches that can't be done hierarchically are
+		done by GridFindPath on the whole grid.
+		@return: list of coords as tuples or None if no path is found"""
+		if hasattr(source, 'position'):
+			source = source.position
+		if hasattr(destination, 'position'):
+			destination = destination.position
+		grid = self.grid
+		self._sync()
+
+		source_coords = source.get_coordinates()
+		dest_coords = [c for c in destination.get_coordinates() if c in grid]
+		if not dest_coords or make_target_walkable or \
+		   not all(grid.get_index(c) is not None for c in source_coords):
+			return self._find_path_on_grid(source, destination, blocked_coords, make_target_walkable)
+
+		# nearby destinations don't profit from the hierarchy
+		if min(max(abs(s[0] - d[0]), abs(s[1] - d[1])) for s in source_coords[:1] for d in dest_coords) \
+		   < 2 * self.cluster_size:
+			return self._find_path_on_grid(source, destination, blocked_coords, make_target_walkable)
+
+		abstract_path = self._find_abstract_path(source_coords, dest_coords, destination)
+		if abstract_path is None:
+			# the abstract graph has the same connectivity as the grid
+			return None
+
+		path = self._refine(source, destination, abstract_path, blocked_coords or ())
+		if path is None:
+			# a segment is blocked, e.g. by a ship on an entrance
+			return self._find_path_on_grid(source, destination, blocked_coords, make_target_walkable)
+		return self._smooth(path, blocked_coords or ())
+
+	def _refine(self, source, destination, abstract_path, blocked_coords):
+		"""Turns the abstract path into a path on the grid, segment by segment.
+		@return: list of coords as tuples or None if a segment is blocked"""
+		find_path = GridFindPath()
+		waypoints = [self._get_coords(index) for index in abstract_path]
+
+		if isinstance(source, Point):
+			path = self._get_segment(source.to_tuple(), waypoints[0], blocked_coords)
+		else:
+			path = find_path(source, Point(*waypoints[0]), self.grid, blocked_coords, True, False)
+
+		for start, end in zip(waypoints, waypoints[1:]):
+			if path is None:
+				return None
+			segment = self._get_segment(start, end, blocked_coords)
+			path = path + segment[1:] if segment is not None else None
+
+		if path is not None:
+			segment = find_path(Point(*waypoints[-1]), destination, self.grid, blocked_coords, True, False)
+			path = path + segment[1:] if segment is not None else None
+		return path
+
+	def _get_segment(self, start, end, blocked_coords):
+		"""Path between two coords that are in the same or in neighboring clusters.
+		@return: list of coords as tuples or None"""
+		start_cluster = self.get_cluster(start)
+		if start_cluster == self.get_cluster(end):
+			if self._is_open(start_cluster) is not None:
+				path = self._get_line(start, end)
+			else:
+				# the path has been calculated when the edges were built (or start is the source)
+				self._get_edges(start_cluster)
+				path = self._segments[start_cluster].get((self.grid.get_index(start), self.grid.get_index(end)))
+			if path is not None and not any(coords in blocked_coords for coords in path[1:]):
+				return path
+		elif max(abs(start[0] - end[0]), abs(start[1] - end[1])) == 1 and end not in blocked_coords:
+			# the nodes of an entrance
+			return [start, end]
+		return GridFindPath()(Point(*start), Point(*end), self.grid, blocked_coords, True, False)
+
+	@classmethod
+	def _get_line(cls, start, end):
+		"""@return: the shortest path from start to end without obstacles: diagonally until one of
+		the coords matches, then straight"""
+		x, y = start
+		path = [start]
+		while (x, y) != end:
+			x += cmp(end[0], x)
+			y += cmp(end[1], y)
+			path.append((x, y))
+		return path
+
+	def _smooth(self, path, blocked_coords):
+		"""Replaces detours of a refined path by straight lines.
+		The abstract nodes are on the borders of the clusters, so the refined path often runs
+		through a node that is off the way. Lines of up to the cluster size are tried.
+		@return: list of coords as tuples"""
+		grid = self.grid
+		get_index = grid.get_index
+		walkable = grid.walkable
+		speed = grid.speed
+		width = grid.width
+		# costs[i] is the cost of moving from path[0] to path[i], a step costs the speed of the node it starts at
+		costs = [0.0]
+		for coords in path[:-1]:
+			costs.append(costs[-1] + speed[get_index(coords)])
+
+		smooth_path = [path[0]]
+		i = 0
+		last = len(path) - 1
+		while i < last:
+			start = path[i]
+			for j in xrange(min(last, i + self.cluster_size), i + 1, -1):
+				end = path[j]
+				if max(abs(start[0] - end[0]), abs(start[1] - end[1])) >= j - i:
+					# the path to end is as short as a line, and so are the paths to the nodes before
+					i += 1
+					smooth_path.append(path[i])
+					break
+				# walk along the line until it turns out to be blocked or not cheaper
+				max_cost = costs[j] - costs[i]
+				x, y = start
+				index = get_index(start)
+				cost = 0.0
+				while (x, y) != end:
+					cost += speed[index]
+					dx = cmp(end[0], x)
+					dy = cmp(end[1], y)
+					x += dx
+					y += dy
+					index += dx + dy * width
+					if not walkable[index] or cost >= max_cost or (x, y) in blocked_coords:
+						break
+				else:
+					smooth_path.extend(self._get_line(start, end)[1:])
+					i = j
+					break
+			else:
+				i += 1
+				smooth_path.append(path[i])
+		return smooth_path
+
+	def _find_path_on_grid(self, source, destination, blocked_coords, make_target_walkable):
+		return GridFindPath()(source, destination, self.grid, blocked_coords, True, make_target_walkable)
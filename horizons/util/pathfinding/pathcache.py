@@ -0,0 +1,128 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from collections import OrderedDict
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
+from horizons.util.shapes import Point, Rect
+
+
+def _get_shape_key(shape):
+	"""Returns a hashable key describing the shape or None if the shape isn't supported.
+	Only shapes that are completely described by their coordinates are supported, since
+	the heuristic of the search depends on the exact destination shape."""
+	if hasattr(shape, 'position'):
+		shape = shape.position
+	if isinstance(shape, Point):
+		return (shape.x, shape.y)
+	elif isinstance(shape, Rect):
+		return (shape.left, shape.top, shape.right, shape.bottom)
+	return None
+
+
+class PathCache(object):
+	"""LRU cache for the results of GridFindPath on one PathGrid.
+
+	Paths are stored together with the generation of the grid at the time they were
+	calculated and the area the search depended on (see GridFindPath.explored_area). The
+	generation is increased on every change of the grid (e.g. by IslandPathNodes.register_road).
+	An entry from an older generation is only returned if none of the changes since then
+	are in its area, else it is calculated again.
+
+	Searches with blocked coords can't be cached, since those change all the time.
+	Without blocked coords, the result only depends on the arguments and the grid,
+	so a cached path is exactly the path a new search would find.
+	"""
+
+	DEFAULT_SIZE = 256
+
+	def __init__(self, size=DEFAULT_SIZE):
+		self.size = size
+		# { key: (generation, path, area) }, least recently used first
+		self._entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def find_path(self, source, destination, path_grid, diagonal=False, make_target_walkable=True):
+		"""Same as GridFindPath()(source, destination, path_grid, None, diagonal, make_target_walkable),
+		but uses cached results where possible.
+		@return: list of coords as tuples or None if no path is found"""
+		source_key = _get_shape_key(source)
+		destination_key = _get_shape_key(destination)
+		if source_key is None or destination_key is None:
+			return GridFindPath()(source, destination, path_grid, None, diagonal, make_target_walkable)
+
+		key = (source_key, destination_key, diagonal, make_target_walkable)
+		entry = self._entries.pop(key, None)
+		if entry is not None and entry[0] != path_grid.generation and \
+		   self._is_unaffected(entry, path_grid):
+			entry = (path_grid.generation, entry[1], entry[2])
+		if entry is not None and entry[0] == path_grid.generation:
+			self.hits += 1
+			path = entry[1]
+		else:
+			self.misses += 1
+			finder = GridFindPath()
+			path = finder(source, destination, path_grid, None, diagonal, make_target_walkable)
+			area = finder.explored_area
+			if area is not None:
+				# the walkability of the destination is checked as well
+				dest_area = destination_key if len(destination_key) == 4 else destination_key * 2
+				area = (min(area[0], dest_area[0]), min(area[1], dest_area[1]),
+				        max(area[2], dest_area[2]), max(area[3], dest_area[3]))
+			entry = (path_grid.generation, path, area)
+			if len(self._entries) >= self.size:
+				self._entries.popitem(last=False)
+		self._entries[key] = entry # (re)insert as most recently used
+
+		# paths are modified by their users (see AbstractPather.end_move)
+		return list(path) if path is not None else None
+
+	@classmethod
+	def _is_unaffected(cls, entry, path_grid):
+		"""Checks whether the changes of the grid since the entry was stored are outside of its area."""
+		area = entry[2]
+		if area is None:
+			return False
+		changes = path_grid.get_changes_since(entry[0])
+		if changes is None:
+			return False
+		min_x, min_y, max_x, max_y = area
+		for (x, y) in changes:
+			if min_x <= x <= max_x and min_y <= y <= max_y:
+				return False
+		return True
+
+	def clear(self):
+		self._entries.clear()
+
+	def __len__(self):
+		return len(self._entries)
+
+	@property
+	def hit_rate(self):
+		"""@return: fraction of lookups that were answered from the cache"""
+		lookups = self.hits + self.misses
+		return float(self.hits) / lookups if lookups else 0.0
+
+	def __str__(self):
+		return "PathCache(%d/%d entries, %d hits, %d misses, %.1f%% hit rate)" % \
+		       (len(self), self.size, self.hits, self.misses, self.hit_rate * 100)
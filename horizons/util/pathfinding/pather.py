@@ -27,6 +27,7 @@ from horizons.util.shapes import Point
 
 from horizons.util.pathfinding import PathBlockedError
 from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
 
 """
 In this file, you will find an interface to the pathfinding algorithm.
@@ -66,6 +67,21 @@ class AbstractPather(object):
 		Return value type must be supported by FindPath"""
 		raise NotImplementedError
 
+	def _get_path_grid(self):
+		"""Returns a PathGrid with the nodes of _get_path_nodes, or None if there is none.
+		If available, the path is calculated by GridFindPath on the grid."""
+		return None
+
+	def _get_path_cache(self):
+		"""Returns the PathCache for paths on the grid of _get_path_grid, or None if there is none.
+		The cache is only used if there are no blocked coords."""
+		return None
+
+	def _get_path_hierarchy(self):
+		"""Returns a PathHierarchy of the grid of _get_path_grid, or None if there is none.
+		If available, the path is calculated hierarchically, which is faster for long paths."""
+		return None
+
 	def _get_blocked_coords(self):
 		"""Returns blocked coordinates
 		Return value type must be supported by FindPath"""
@@ -104,10 +120,25 @@ class AbstractPather(object):
 			source = self._get_position()
 
 		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
-		                  self._get_blocked_coords(), self.move_diagonal,
-		                  self.make_target_walkable)
+		# to use a different pathfinding code, just change the following lines
+		path_grid = self._get_path_grid()
+		blocked_coords = self._get_blocked_coords()
+		path_cache = self._get_path_cache() if not blocked_coords else None
+		path_hierarchy = self._get_path_hierarchy()
+		if path_hierarchy is not None:
+			path = path_hierarchy.find_path(source, destination, blocked_coords,
+			                                self.make_target_walkable)
+		elif path_cache is not None:
+			path = path_cache.find_path(source, destination, path_grid,
+			                            self.move_diagonal, self.make_target_walkable)
+		elif path_grid is not None:
+			path = GridFindPath()(source, destination, path_grid,
+			                      blocked_coords, self.move_diagonal,
+			                      self.make_target_walkable)
+		else:
+			path = FindPath()(source, destination, self._get_path_nodes(),
+			                  blocked_coords, self.move_diagonal,
+			                  self.make_target_walkable)
 
 		if path is None:
 			return False
@@ -217,6 +248,12 @@ class ShipPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.session.world.water
 
+	def _get_path_grid(self):
+		return self.session.world.water_grid
+
+	def _get_path_hierarchy(self):
+		return self.session.world.water_hierarchy
+
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
 
@@ -226,6 +263,15 @@ class FisherShipPather(ShipPather):
 	def _get_path_nodes(self):
 		return self.session.world.water_and_coastline
 
+	def _get_path_grid(self):
+		return self.session.world.water_and_coastline_grid
+
+	def _get_path_hierarchy(self):
+		return None
+
+	def _get_path_cache(self):
+		return self.session.world.water_and_coastline_path_cache
+
 	def _get_blocked_coords(self):
 		# don't let fisher be blocked by other ships (#1023)
 		return []
@@ -241,6 +287,14 @@ class BuildingCollectorPather(AbstractPather):
 		from horizons.component.collectingcomponent import CollectingComponent
 		return self.unit.home_building.get_component(CollectingComponent).path_nodes.nodes
 
+	def _get_path_grid(self):
+		from horizons.component.collectingcomponent import CollectingComponent
+		return self.unit.home_building.get_component(CollectingComponent).path_nodes.grid
+
+	def _get_path_cache(self):
+		from horizons.component.collectingcomponent import CollectingComponent
+		return self.unit.home_building.get_component(CollectingComponent).path_nodes.path_cache
+
 
 class RoadPather(AbstractPather):
 	"""Pather for collectors, that depend on roads (e.g. the one used for the warehouse)"""
@@ -251,6 +305,12 @@ class RoadPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.island.path_nodes.road_nodes
 
+	def _get_path_grid(self):
+		return self.island.path_nodes.road_grid
+
+	def _get_path_cache(self):
+		return self.island.path_nodes.road_path_cache
+
 
 class SoldierPather(AbstractPather):
 	"""Pather for units, that move absolutely freely (such as soldiers)
@@ -264,6 +324,10 @@ class SoldierPather(AbstractPather):
 		island = self.session.world.get_island(self.unit.position)
 		return island.path_nodes.nodes
 
+	def _get_path_grid(self):
+		island = self.session.world.get_island(self.unit.position)
+		return island.path_nodes.grid
+
 	def _get_blocked_coords(self):
 		return self.session.world.ground_unit_map
 
@@ -291,7 +355,7 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		return island.path_nodes.road_path_cache.find_path(source, destination, island.path_nodes.road_grid)
 
 
 decorators.bind_all(AbstractPather)
@@ -21,6 +21,10 @@
 
 import logging
 
+from horizons.util.pathfinding.gridpathfinding import PathGrid
+from horizons.util.pathfinding.pathcache import PathCache
+from horizons.util.pathfinding.roadpathfinder import RoadPathFinder
+
 class PathNodes(object):
 	"""
 	Abstract class; used to derive list of path nodes from, which is used for pathfinding.
@@ -40,6 +44,8 @@ class ConsumerBuildingPathNodes(PathNodes):
 	"""List of path nodes for a consumer, that is a building
 	Interface:
 	self.nodes: {(x, y): speed, ...} of the home_building, where the collectors can walk
+	self.grid: PathGrid containing the same nodes
+	self.path_cache: PathCache for paths on self.grid
 	"""
 	def __init__(self, consumerbuilding):
 		super(ConsumerBuildingPathNodes, self).__init__()
@@ -48,6 +54,8 @@ class ConsumerBuildingPathNodes(PathNodes):
 		for coords in consumerbuilding.position.get_radius_coordinates(consumerbuilding.radius, include_self=False):
 			if coords in ground_map and not 'coastline' in ground_map[coords].classes:
 				self.nodes[coords] = self.NODE_DEFAULT_SPEED
+		self.grid = PathGrid.from_nodes(self.nodes)
+		self.path_cache = PathCache()
 
 
 class IslandPathNodes(PathNodes):
@@ -55,6 +63,11 @@ class IslandPathNodes(PathNodes):
 	Interface:
 	self.nodes: List of nodes on island, where the terrain allows to be walked on
 	self.road_nodes: dictionary of nodes, where a road is built on
+	self.grid, self.road_grid: PathGrids that are kept in sync with the dicts above
+	self.road_path_cache: PathCache for paths on the road grid. Every change of the grid
+	  increases its generation, which invalidates the cached paths that depend on it. Paths
+	  on self.grid aren't cached, since units walking freely on the island (e.g. wild
+	  animals) hardly ever search the same path twice.
 
 	(un)register_road has to be called for each coord, where a road is built on (destroyed)
 	reset_tile_walkablity has to be called when the terrain changes the walkability
@@ -73,17 +86,36 @@ class IslandPathNodes(PathNodes):
 		for coord in self.island:
 			if self.is_walkable(coord):
 				self.nodes[coord] = self.NODE_DEFAULT_SPEED
+		self.grid = PathGrid.from_nodes(self.nodes, self.island.position)
 
 		# nodes where a real road is built on.
 		self.road_nodes = {}
+		self.road_grid = PathGrid.from_nodes(self.road_nodes, self.island.position)
+		self.road_path_cache = PathCache()
+
+		# (source, destination, clockwise, generation of self.grid, path) of the last get_road_line
+		self._last_road_line = None
 
 	def register_road(self, road):
 		for i in road.position:
 			self.road_nodes[ (i.x, i.y) ] = self.NODE_DEFAULT_SPEED
+			self.road_grid.add((i.x, i.y), self.NODE_DEFAULT_SPEED)
 
 	def unregister_road(self, road):
 		for i in road.position:
 			del self.road_nodes[ (i.x, i.y) ]
+			self.road_grid.remove((i.x, i.y))
+
+	def get_road_line(self, source, destination, clockwise=True):
+		"""Returns RoadPathFinder()(self.nodes, source, destination, clockwise), the path of a
+		road that is dragged by the player. The building tool updates its preview whenever the
+		settlement changes, so the last path is kept until the walkable nodes change."""
+		key = (source, destination, clockwise, self.grid.generation)
+		if self._last_road_line is None or self._last_road_line[:4] != key:
+			path = RoadPathFinder()(self.nodes, source, destination, clockwise)
+			self._last_road_line = key + (path, )
+		path = self._last_road_line[4]
+		return list(path) if path is not None else None
 
 	def is_road(self, x, y):
 		"""Return if there is a road on (x, y)"""
@@ -122,5 +154,7 @@ class IslandPathNodes(PathNodes):
 		in_list = (coord in self.nodes)
 		if not in_list and actually_walkable:
 			self.nodes[coord] = self.NODE_DEFAULT_SPEED
+			self.grid.add(coord, self.NODE_DEFAULT_SPEED)
 		if in_list and not actually_walkable:
 			del self.nodes[coord]
+			self.grid.remove(coord)
@@ -0,0 +1,180 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import zlib
+
+from horizons.constants import PATHS
+from horizons.util.dbreader import DbReader
+
+
+class PreviewCache(object):
+	"""Persistent store for the previews shown in the map and savegame browsers.
+
+	Previews are keyed by the sha1 of the file they were made of, so renamed or copied
+	files share their previews. Hashing a savegame means reading the whole file, therefore
+	the hashes are remembered together with size and mtime of each path and only
+	recalculated when those change. Lookups never hash: a file that hasn't been indexed
+	yet is simply a miss.
+
+	The cache is filled by the code that displays the previews and by a worker process
+	(see start_worker), which renders the previews of all maps and extracts the screenshots
+	of all savegames in the background.
+
+	The worker and the game write to the same database, a locked database is treated like
+	a cache miss.
+	"""
+
+	# kinds of previews
+	MINIMAP = 'minimap' # data of Minimap.dump_data
+	SCREENSHOT = 'screenshot' # screenshot of a savegame as png, empty if the savegame has none
+
+	filename = PATHS.PREVIEW_CACHE_PATH
+
+	_db = None
+	_worker = None
+
+	log = logging.getLogger("util.previewcache")
+
+	@classmethod
+	def _get_db(cls):
+		if cls._db is None:
+			db = DbReader(cls.filename)
+			db.execute_script("""
+				CREATE TABLE IF NOT EXISTS file (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT);
+				CREATE TABLE IF NOT EXISTS preview (hash TEXT, kind TEXT, width INTEGER, height INTEGER, data BLOB,
+				                                    PRIMARY KEY (hash, kind, width, height));
+			""")
+			cls._db = db
+		return cls._db
+
+	@classmethod
+	def close(cls):
+		if cls._db is not None:
+			cls._db.close()
+			cls._db = None
+
+	@classmethod
+	def _get_stat(cls, filename):
+		"""@return: (size, mtime) of filename or None if it doesn't exist"""
+		try:
+			stat = os.stat(filename)
+		except OSError:
+			return None
+		return (stat.st_size, stat.st_mtime)
+
+	@classmethod
+	def get_cached_hash(cls, filename):
+		"""Returns the hash of filename if it is known and the file hasn't changed since, else None."""
+		stat = cls._get_stat(filename)
+		if stat is None:
+			return None
+		result = cls._get_db()("SELECT size, mtime, hash FROM file WHERE path = ?", os.path.abspath(filename))
+		if result and tuple(result[0][:2]) == stat:
+			return result[0][2]
+		return None
+
+	@classmethod
+	def get_hash(cls, filename):
+		"""Returns the sha1 of the content of filename (same as SavegameAccessor.get_hash).
+		The hash is only calculated if the file isn't indexed already or has changed.
+		@return: hex digest or None if the file doesn't exist"""
+		filehash = cls.get_cached_hash(filename)
+		if filehash is not None:
+			return filehash
+
+		stat = cls._get_stat(filename)
+		if stat is None:
+			return None
+		h = hashlib.sha1()
+		with open(filename, 'rb') as f:
+			for chunk in iter(lambda: f.read(1 << 16), ''):
+				h.update(chunk)
+		filehash = h.hexdigest()
+		cls._get_db()("INSERT OR REPLACE INTO file(path, size, mtime, hash) VALUES(?, ?, ?, ?)",
+		              os.path.abspath(filename), stat[0], stat[1], filehash)
+		return filehash
+
+	@classmethod
+	def get(cls, filename, kind, size=(0, 0)):
+		"""Returns the stored preview of filename.
+		@param kind: MINIMAP or SCREENSHOT
+		@param size: (width, height) the preview was made for
+		@return: str or None if there is no up to date preview"""
+		try:
+			filehash = cls.get_cached_hash(filename)
+			if filehash is None:
+				return None
+			result = cls._get_db()("SELECT data FROM preview WHERE hash = ? AND kind = ? AND width = ? AND height = ?",
+			                       filehash, kind, size[0], size[1])
+		except sqlite3.OperationalError as e: # e.g. locked by the worker
+			cls.log.debug("Preview cache lookup of %s failed: %s", filename, e)
+			return None
+		if not result:
+			return None
+		return zlib.decompress(result[0][0])
+
+	@classmethod
+	def set(cls, filename, kind, data, size=(0, 0)):
+		"""Stores a preview of filename, see get.
+		@return: whether the preview has been stored"""
+		try:
+			filehash = cls.get_hash(filename)
+			if filehash is None:
+				return False
+			cls._get_db()("INSERT OR REPLACE INTO preview(hash, kind, width, height, data) VALUES(?, ?, ?, ?, ?)",
+			              filehash, kind, size[0], size[1], sqlite3.Binary(zlib.compress(data)))
+		except sqlite3.OperationalError as e:
+			cls.log.debug("Storing the preview of %s failed: %s", filename, e)
+			return False
+		return True
+
+	@classmethod
+	def prune(cls):
+		"""Removes entries of files that don't exist any more and previews that no file refers to."""
+		db = cls._get_db()
+		missing = [(path, ) for (path, ) in db("SELECT path FROM file") if not os.path.exists(path)]
+		db.execute_many("DELETE FROM file WHERE path = ?", missing)
+		db("DELETE FROM preview WHERE hash NOT IN (SELECT hash FROM file)")
+
+	@classmethod
+	def start_worker(cls, minimap_size):
+		"""Starts a process that fills the cache for all maps and savegames, see generate_previews.
+		Nothing happens if the worker of an earlier call is still running.
+		@param minimap_size: (width, height) of the minimap previews"""
+		if cls._worker is not None and cls._worker.poll() is None:
+			return
+
+		import horizons.main
+		args = [sys.executable, sys.argv[0], "--generate-previews", json.dumps(minimap_size)]
+		# We're running UH in a new process, make sure fife is setup correctly
+		if horizons.main.command_line_arguments.fife_path:
+			args.extend(["--fife-path", horizons.main.command_line_arguments.fife_path])
+
+		cls.log.debug("Starting preview worker: %s", args)
+		with open(os.devnull, 'w') as devnull:
+			cls._worker = subprocess.Popen(args=args, stdout=devnull)
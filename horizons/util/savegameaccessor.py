@@ -240,15 +240,16 @@ class SavegameAccessor(DbReader):
 
 	def _load_building_collector(self):
 		self._building_collector = {}
-		for row in self("SELECT rowid, home_building, creation_tick FROM building_collector"):
-			self._building_collector[int(row[0])] = (int(row[1]) if row[1] is not None else None, row[2])
+		for row in self("SELECT rowid, home_building, creation_tick, waiting_since FROM building_collector"):
+			self._building_collector[int(row[0])] = (int(row[1]) if row[1] is not None else None, row[2], row[3])
 
 		self._building_collector_job_history = defaultdict(deque)
 		for collector_id, tick, utilization in self("SELECT collector, tick, utilisation FROM building_collector_job_history ORDER BY collector, tick"):
 			self._building_collector_job_history[int(collector_id)].append((tick, utilization))
 
 	def get_building_collectors_data(self, worldid):
-		"""Returns (id of the building collector's home or None otherwise, creation_tick)"""
+		"""Returns (id of the building collector's home or None otherwise, creation_tick,
+		tick since when it waits for a job or None)"""
 		return self._building_collector.get(int(worldid))
 
 	def get_building_collector_job_history(self, worldid):
@@ -0,0 +1,219 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import glob
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+
+from horizons.constants import PATHS
+from horizons.util.dbreader import DbReader
+
+
+class SavegameCatalog(object):
+	"""Persistent index of the savegames in the savegame directories.
+
+	For every savegame, the catalog stores the metadata needed to list and sort savegames,
+	so the savegame files don't have to be opened for that. An entry is a dict with the keys:
+	path, mtime, timestamp, savecounter, savegamerev, players, map_name, hash and has_screenshot.
+	The hash is only calculated when it is requested with get_hash.
+
+	A directory is only scanned again when its mtime has changed, which happens whenever a
+	savegame is created, deleted or renamed. Savegames are never changed in place (saving
+	replaces the file), so the entries of an unchanged directory are up to date. When a
+	directory is scanned, only new files and files with a different size or mtime are read.
+
+	SavegameManager.write_metadata adds the savegame that is being written right away. Its
+	size and mtime are filled in on the next scan, before that the file isn't complete yet.
+	"""
+
+	FIELDS = ('timestamp', 'savecounter', 'savegamerev', 'players', 'map_name', 'has_screenshot')
+
+	# metadata of a savegame with default values, see SavegameManager.savegame_metadata
+	DEFAULTS = {'timestamp': -1, 'savecounter': 0, 'savegamerev': 0,
+	            'players': 0, 'map_name': None, 'has_screenshot': False}
+
+	# directories modified more recently than this (in seconds) are scanned again on the
+	# next access, since changes within the resolution of the mtime aren't detectable
+	MTIME_RESOLUTION = 2
+
+	filename = PATHS.SAVEGAME_CATALOG_PATH
+
+	_db = None
+
+	log = logging.getLogger("util.savegamecatalog")
+
+	@classmethod
+	def _get_db(cls):
+		if cls._db is None:
+			db = DbReader(cls.filename)
+			db.execute_script("""
+				CREATE TABLE IF NOT EXISTS directory (path TEXT PRIMARY KEY, mtime REAL);
+				CREATE TABLE IF NOT EXISTS savegame (path TEXT PRIMARY KEY, directory TEXT, size INTEGER, mtime REAL,
+				                                     timestamp REAL, savecounter INTEGER, savegamerev INTEGER,
+				                                     players INTEGER, map_name TEXT, hash TEXT, has_screenshot INTEGER);
+				CREATE INDEX IF NOT EXISTS savegame_directory ON savegame(directory);
+			""")
+			cls._db = db
+		return cls._db
+
+	@classmethod
+	def close(cls):
+		if cls._db is not None:
+			cls._db.close()
+			cls._db = None
+
+	@classmethod
+	def read_entry(cls, db):
+		"""Reads the catalog fields of a savegame.
+		@param db: DbReader of the savegame
+		@return: dict with the keys of FIELDS"""
+		entry = cls.DEFAULTS.copy()
+		try:
+			for name, value in db("SELECT name, value FROM metadata WHERE name IN (?, ?, ?, ?)",
+			                      'timestamp', 'savecounter', 'savegamerev', 'map_name'):
+				entry[name] = value
+			entry['players'] = db("SELECT count(rowid) FROM player WHERE is_trader = 0 AND is_pirate = 0")[0][0]
+			entry['has_screenshot'] = bool(db("SELECT count(*) FROM metadata_blob WHERE name = ?", 'screen')[0][0])
+		except sqlite3.OperationalError as e:
+			cls.log.warning('Warning: Cannot read savegame {file}: {exception}'
+			                ''.format(file=db.db_path, exception=e))
+		entry['timestamp'] = float(entry['timestamp'])
+		entry['savecounter'] = int(entry['savecounter'])
+		entry['savegamerev'] = int(entry['savegamerev'])
+		return entry
+
+	@classmethod
+	def add(cls, savegamefile, entry):
+		"""Adds the entry of a savegame that is currently being written.
+		@param entry: dict with the keys of FIELDS, see read_entry"""
+		path = os.path.abspath(savegamefile)
+		cls._store(path, None, entry)
+		# make sure the directory is scanned on the next access, which completes the entry
+		cls._get_db()("DELETE FROM directory WHERE path = ?", os.path.dirname(path))
+
+	@classmethod
+	def _store(cls, path, stat, entry):
+		size, mtime = stat if stat is not None else (None, None)
+		cls._get_db()("INSERT OR REPLACE INTO savegame(path, directory, size, mtime, timestamp, savecounter, "
+		              "savegamerev, players, map_name, hash, has_screenshot) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+		              path, os.path.dirname(path), size, mtime, entry['timestamp'], entry['savecounter'],
+		              entry['savegamerev'], entry['players'], entry['map_name'], None,
+		              int(entry['has_screenshot']))
+
+	@classmethod
+	def _scan(cls, directory, extension):
+		"""Updates the entries of directory to the files that currently are in it."""
+		db = cls._get_db()
+		try:
+			dir_mtime = os.stat(directory).st_mtime
+		except OSError:
+			db("DELETE FROM savegame WHERE directory = ?", directory)
+			db("DELETE FROM directory WHERE path = ?", directory)
+			return
+
+		known = dict((path, (size, mtime)) for (path, size, mtime)
+		             in db("SELECT path, size, mtime FROM savegame WHERE directory = ?", directory))
+		db("BEGIN")
+		try:
+			for path in glob.glob(os.path.join(directory, '*.' + extension)):
+				try:
+					stat = os.stat(path)
+				except OSError:
+					continue
+				stat = (stat.st_size, stat.st_mtime)
+				if path in known:
+					known_stat = known.pop(path)
+					if known_stat == stat:
+						continue
+					elif known_stat == (None, None): # added by write_metadata
+						db("UPDATE savegame SET size = ?, mtime = ? WHERE path = ?", stat[0], stat[1], path)
+						continue
+
+				savegame_db = DbReader(path)
+				try:
+					entry = cls.read_entry(savegame_db)
+				finally:
+					savegame_db.close()
+				cls._store(path, stat, entry)
+
+			# the rest of the known files doesn't exist any more
+			db.execute_many("DELETE FROM savegame WHERE path = ?", [(path, ) for path in known])
+
+			# remember the mtime only if changes at the same mtime are impossible from now on
+			if time.time() - dir_mtime < cls.MTIME_RESOLUTION:
+				dir_mtime = None
+			db("INSERT OR REPLACE INTO directory(path, mtime) VALUES(?, ?)", directory, dir_mtime)
+			db("COMMIT")
+		except:
+			db("ROLLBACK")
+			raise
+
+	@classmethod
+	def get_entries(cls, directory, extension):
+		"""Returns the entries of all savegames in a directory.
+		@param extension: file extension of the savegames without dot
+		@return: list of entries, see class docstring"""
+		directory = os.path.abspath(directory)
+		db = cls._get_db()
+		try:
+			dir_mtime = os.stat(directory).st_mtime
+		except OSError:
+			dir_mtime = None
+		known_mtime = db("SELECT mtime FROM directory WHERE path = ?", directory)
+		if dir_mtime is None or not known_mtime or known_mtime[0][0] != dir_mtime:
+			cls._scan(directory, extension)
+
+		columns = ('path', 'mtime', 'hash') + cls.FIELDS
+		entries = []
+		for row in db("SELECT %s FROM savegame WHERE directory = ? AND path LIKE ?" % ', '.join(columns),
+		              directory, '%.' + extension):
+			entry = dict(zip(columns, row))
+			entry['has_screenshot'] = bool(entry['has_screenshot'])
+			entries.append(entry)
+		return entries
+
+	@classmethod
+	def get_hash(cls, savegamefile):
+		"""Returns the sha1 of the content of a savegame (same as SavegameAccessor.get_hash).
+		It is only calculated once for each version of the file.
+		@return: hex digest or None if the savegame isn't in the catalog"""
+		path = os.path.abspath(savegamefile)
+		db = cls._get_db()
+		try:
+			stat = os.stat(path)
+		except OSError:
+			return None
+		result = db("SELECT size, mtime, hash FROM savegame WHERE path = ?", path)
+		if not result or result[0][:2] != (stat.st_size, stat.st_mtime):
+			return None
+		if result[0][2] is not None:
+			return result[0][2]
+
+		h = hashlib.sha1()
+		with open(path, 'rb') as f:
+			for chunk in iter(lambda: f.read(1 << 16), ''):
+				h.update(chunk)
+		filehash = h.hexdigest()
+		db("UPDATE savegame SET hash = ? WHERE path = ?", filehash, path)
+		return filehash
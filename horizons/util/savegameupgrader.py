@@ -389,6 +389,10 @@ class SavegameUpgrader(object):
 	def _upgrade_to_rev74(self, db):
 		db("INSERT INTO metadata VALUES (?, ?)", "selected_tab", None)
 
+	def _upgrade_to_rev75(self, db):
+		# collectors that wait for a job, see BuildingCollector._wait_for_job
+		db('ALTER TABLE building_collector ADD COLUMN "waiting_since" INT DEFAULT NULL')
+
 
 	def _upgrade(self):
 		# fix import loop
@@ -461,6 +465,8 @@ class SavegameUpgrader(object):
 				self._upgrade_to_rev73(db)
 			if rev < 74:
 				self._upgrade_to_rev74(db)
+			if rev < 75:
+				self._upgrade_to_rev75(db)
 
 			db('COMMIT')
 			db.close()
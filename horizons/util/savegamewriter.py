@@ -0,0 +1,198 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from horizons.util.dbreader import DbReader
+
+
+class SavegameWriter(DbReader):
+	"""DbReader for writing a new savegame, which executes INSERTs in batches.
+
+	The save methods of all objects call db("INSERT INTO table ...", ...) for every row.
+	Instead of executing them right away, the rows are collected per table and statement
+	and executed with executemany. Everything else is executed directly, after all collected
+	rows have been written, so statements like UPDATE or SELECT in save methods see the
+	same data as without batching.
+
+	Within a table, rows are written in the order they were added, so their rowids don't
+	change. Rows of different tables are not written in order, which is fine for a database
+	without triggers and foreign key constraints.
+
+	Errors of collected statements (e.g. constraint violations) are raised by the call that
+	writes them, usually the final COMMIT. Rows that haven't been written when the db is
+	closed are discarded, like the changes of a transaction that hasn't been committed.
+	"""
+
+	# INSERT statements with a plain VALUES list, these don't depend on other rows
+	INSERT_REGEX = re.compile(r'^\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+[`"\']?(\w+)[`"\']?[^;]*?\bVALUES\s*\(',
+	                          re.IGNORECASE)
+
+	# { command: table of the INSERT statement or None }, commands are mostly literals
+	_tables = {}
+
+	def __init__(self, dbfile):
+		super(SavegameWriter, self).__init__(dbfile)
+		# the file is new and deleted if saving fails, there's no need for a journal on disk
+		self.cur.execute("PRAGMA journal_mode = MEMORY").fetchall()
+		self._pending = OrderedDict() # { table: [(command, list of args), ...] }
+		# the rows of the last statement of each table, more rows of the same statement are appended
+		self._last_rows = {} # { command: list of args }
+		self._last_commands = {} # { table: command }
+		self.row_counts = {} # { table: number of inserted rows }
+
+	def __call__(self, command, *args):
+		"""Same as DbReader.__call__, but INSERT ... VALUES statements are only collected.
+		@return: result of the command, always an empty list for collected statements"""
+		rows = self._last_rows.get(command)
+		if rows is not None:
+			rows.append(args)
+			return []
+
+		try:
+			table = self._tables[command]
+		except KeyError:
+			assert not command.endswith(";")
+			match = self.INSERT_REGEX.match(command)
+			table = self._tables[command] = match.group(1) if match is not None else None
+		if table is None:
+			self.flush()
+			return super(SavegameWriter, self).__call__(command, *args)
+
+		# a different statement for the table, start a new batch to keep the order of the rows
+		last_command = self._last_commands.get(table)
+		if last_command is not None:
+			del self._last_rows[last_command]
+		rows = [args]
+		self._pending.setdefault(table, []).append((command, rows))
+		self._last_rows[command] = rows
+		self._last_commands[table] = command
+		return []
+
+	def _clear(self):
+		self._pending = OrderedDict()
+		self._last_rows.clear()
+		self._last_commands.clear()
+
+	def flush(self):
+		"""Writes all collected rows."""
+		if not self._pending:
+			return
+		pending = self._pending
+		self._clear()
+		for table, statements in pending.iteritems():
+			for command, rows in statements:
+				self.cur.executemany(command, rows)
+				self.row_counts[table] = self.row_counts.get(table, 0) + len(rows)
+
+	def execute_many(self, command, parameters):
+		self.flush()
+		return super(SavegameWriter, self).execute_many(command, parameters)
+
+	def execute_script(self, script):
+		self.flush()
+		return super(SavegameWriter, self).execute_script(script)
+
+	def close(self):
+		self._clear()
+		super(SavegameWriter, self).close()
+
+
+class SavegameSnapshot(object):
+	"""Records the statements of a save to write them later, possibly on another thread.
+
+	It is used like a DbReader by the save methods, recording a statement is much cheaper
+	than executing it. The values passed to the statements are plain values, so the
+	recorded statements are a consistent copy of the state at the time of the save.
+	Reading from the savegame is not possible.
+	"""
+
+	def __init__(self, dbfile):
+		self.db_path = dbfile
+		self.statements = [] # [(method name, command, args)]
+
+	def __call__(self, command, *args):
+		assert not command.lstrip().upper().startswith('SELECT'), "can't read from a savegame snapshot"
+		self.statements.append(('__call__', command, args))
+		return []
+
+	def execute_many(self, command, parameters):
+		self.statements.append(('execute_many', command, list(parameters)))
+
+	def execute_script(self, script):
+		self.statements.append(('execute_script', script, None))
+
+	def write(self):
+		"""Writes the recorded statements to db_path.
+		A temporary file is written and renamed afterwards, so the savegame never exists
+		in an incomplete state."""
+		tmp_path = self.db_path + '.tmp'
+		if os.path.exists(tmp_path):
+			os.unlink(tmp_path)
+		db = SavegameWriter(tmp_path)
+		try:
+			for method, command, args in self.statements:
+				if method == '__call__':
+					db(command, *args)
+				elif method == 'execute_many':
+					db.execute_many(command, args)
+				else:
+					db.execute_script(command)
+		except:
+			db.close()
+			os.unlink(tmp_path)
+			raise
+		db.close()
+		try:
+			os.rename(tmp_path, self.db_path)
+		except OSError: # windows doesn't replace existing files
+			os.unlink(self.db_path)
+			os.rename(tmp_path, self.db_path)
+
+
+class SavegameWriterThread(threading.Thread):
+	"""Writes a SavegameSnapshot in the background.
+
+	`success` tells whether the savegame has been written after the thread has finished.
+	"""
+
+	log = logging.getLogger("util.savegamewriter")
+
+	def __init__(self, snapshot):
+		super(SavegameWriterThread, self).__init__(name='SavegameWriterThread')
+		self.daemon = False # the game has to wait for the savegame on exit
+		self.snapshot = snapshot
+		self.success = False
+
+	def run(self):
+		start = time.time()
+		try:
+			self.snapshot.write()
+		except Exception:
+			self.log.exception("Failed to write savegame %s", self.snapshot.db_path)
+			return
+		self.success = True
+		self.log.debug("Wrote %s in %.3fs", self.snapshot.db_path, time.time() - start)
@@ -0,0 +1,130 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from operator import itemgetter
+
+from horizons.util.python import decorators
+from horizons.util.shapes import Circle
+
+
+class SpatialIndex(object):
+	"""
+	Uniform grid of objects with a position, e.g. ships or buildings.
+
+	Used to answer queries of the form 'which objects are in this radius / rect' by only
+	looking at the cells that intersect the area instead of at all objects.
+
+	The objects are indexed by a Point, which has to be updated by calling move() when
+	the object moves. Query results are ordered by the time the objects have been added,
+	so they are in the same order as a list of the objects that has been maintained
+	with append and remove.
+	"""
+
+	CELL_SIZE = 8
+
+	def __init__(self, cell_size=CELL_SIZE):
+		self.cell_size = cell_size
+		self._cells = {} # { (cx, cy): set of objects }
+		self._entries = {} # { object: (number, Point) }
+		self._next_number = 0
+
+	def _get_cell(self, point):
+		return self._get_cell_coords(point.x, point.y)
+
+	def add(self, obj, point):
+		"""Adds obj at point.
+		@param point: Point"""
+		assert obj not in self._entries
+		self._entries[obj] = (self._next_number, point)
+		self._next_number += 1
+		self._cells.setdefault(self._get_cell(point), set()).add(obj)
+
+	def remove(self, obj):
+		point = self._entries.pop(obj)[1]
+		cell = self._get_cell(point)
+		objects = self._cells[cell]
+		objects.remove(obj)
+		if not objects:
+			del self._cells[cell]
+
+	def move(self, obj, point):
+		"""Updates the position of obj to point."""
+		number, old_point = self._entries[obj]
+		self._entries[obj] = (number, point)
+		old_cell = self._get_cell(old_point)
+		new_cell = self._get_cell(point)
+		if old_cell != new_cell:
+			objects = self._cells[old_cell]
+			objects.remove(obj)
+			if not objects:
+				del self._cells[old_cell]
+			self._cells.setdefault(new_cell, set()).add(obj)
+
+	def __contains__(self, obj):
+		return obj in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def _get_entries_in_area(self, left, top, right, bottom):
+		"""@return: list of (number, Point, object) of all objects in cells intersecting the area"""
+		entries = []
+		min_cx, min_cy = self._get_cell_coords(left, top)
+		max_cx, max_cy = self._get_cell_coords(right, bottom)
+		if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+			# the area is large compared to the number of occupied cells
+			cells = [objects for (cx, cy), objects in self._cells.iteritems()
+			         if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy]
+		else:
+			cells = [self._cells[(cx, cy)] for cx in xrange(min_cx, max_cx + 1)
+			         for cy in xrange(min_cy, max_cy + 1) if (cx, cy) in self._cells]
+		for objects in cells:
+			for obj in objects:
+				number, point = self._entries[obj]
+				entries.append((number, point, obj))
+		return entries
+
+	def _get_cell_coords(self, x, y):
+		return (int(x // self.cell_size), int(y // self.cell_size))
+
+	def get_in_radius(self, center, radius):
+		"""Returns all objects whose point is contained in Circle(center, radius).
+		@param center: Point
+		@param radius: int
+		@return: list of objects, ordered by the time they have been added"""
+		circle = Circle(center, radius)
+		entries = [entry for entry in self._get_entries_in_area(center.x - radius, center.y - radius,
+		                                                        center.x + radius, center.y + radius)
+		           if circle.contains(entry[1])]
+		entries.sort(key=itemgetter(0))
+		return [entry[2] for entry in entries]
+
+	def get_in_rect(self, rect):
+		"""Returns all objects whose point is contained in rect.
+		@param rect: Rect
+		@return: list of objects, ordered by the time they have been added"""
+		entries = [entry for entry in self._get_entries_in_area(rect.left, rect.top, rect.right, rect.bottom)
+		           if rect.contains_tuple((entry[1].x, entry[1].y))]
+		entries.sort(key=itemgetter(0))
+		return [entry[2] for entry in entries]
+
+
+decorators.bind_all(SpatialIndex)
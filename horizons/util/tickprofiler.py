@@ -0,0 +1,151 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import csv
+import functools
+import json
+import os
+import time
+from collections import deque
+from operator import itemgetter
+
+from horizons.constants import PATHS
+from horizons.util.python.callback import Callback
+
+
+def get_callback_target(callback_obj):
+	"""Returns a (class name, function name) tuple describing what a scheduler callback runs."""
+	func = callback_obj.callback
+	while True:
+		if isinstance(func, Callback):
+			func = func.callback
+		elif isinstance(func, functools.partial):
+			func = func.func
+		else:
+			break
+	func_name = getattr(func, '__name__', func.__class__.__name__)
+	cls = callback_obj.class_instance.__class__
+	# classes of buildings and units are created per type, name them by their base class
+	return (cls.__dict__.get('class_name', cls.__name__), func_name)
+
+
+class TickProfiler(object):
+	"""Measures the time spent in Scheduler ticks.
+
+	For each of the last `size` ticks, the wall time and the number of executed callbacks
+	is kept in a ring buffer. Additionally, the time of all callbacks is accumulated per
+	callback target, i.e. the class of the callback's instance and the called function.
+
+	The Scheduler uses it if the game is started with --profile-ticks. Work that isn't
+	done in scheduler callbacks can be recorded as target with add_target_time.
+	"""
+
+	def __init__(self, size=1000):
+		self.ticks = deque(maxlen=size) # (tick id, duration in ms, number of callbacks)
+		self.targets = {} # { (class name, function name): [number of calls, seconds] }
+		self._tick_id = None
+		self._tick_start = None
+		self._num_callbacks = 0
+
+	def start_tick(self, tick_id):
+		self._tick_id = tick_id
+		self._num_callbacks = 0
+		self._tick_start = time.time()
+
+	def end_tick(self):
+		duration = (time.time() - self._tick_start) * 1000
+		self.ticks.append((self._tick_id, duration, self._num_callbacks))
+
+	def run_callback(self, callback_obj):
+		"""Executes a scheduler callback and records its duration."""
+		start = time.time()
+		callback_obj.callback()
+		duration = time.time() - start
+
+		self._num_callbacks += 1
+		self.add_target_time(get_callback_target(callback_obj), duration)
+
+	def add_target_time(self, key, duration):
+		"""Records one call of a target.
+		@param key: (class name, function name) tuple
+		@param duration: seconds"""
+		try:
+			stats = self.targets[key]
+			stats[0] += 1
+			stats[1] += duration
+		except KeyError:
+			self.targets[key] = [1, duration]
+
+	@property
+	def last_tick(self):
+		"""@return: (tick id, duration in ms, number of callbacks) of the last tick or None"""
+		return self.ticks[-1] if self.ticks else None
+
+	def get_top_targets(self, n=10):
+		"""Returns the callback targets that used up the most time.
+		@return: list of (class name, function name, number of calls, seconds), most expensive first"""
+		top = sorted(self.targets.iteritems(), key=lambda item: item[1][1], reverse=True)[:n]
+		return [(cls, func, calls, seconds) for ((cls, func), (calls, seconds)) in top]
+
+	def get_slowest_ticks(self, n=10):
+		"""@return: list of (tick id, duration in ms, number of callbacks), slowest first"""
+		return sorted(self.ticks, key=itemgetter(1), reverse=True)[:n]
+
+	def dump_csv(self, filename):
+		"""Writes the recorded ticks to a csv file."""
+		with open(filename, 'wb') as f:
+			writer = csv.writer(f)
+			writer.writerow(('tick', 'duration_ms', 'callbacks'))
+			writer.writerows(self.ticks)
+
+	def dump_json(self, filename):
+		"""Writes the recorded ticks and the callback target statistics to a json file."""
+		data = {
+			'ticks': list(self.ticks),
+			'targets': [
+				{'class': cls, 'function': func, 'calls': calls, 'seconds': seconds}
+				for (cls, func, calls, seconds) in self.get_top_targets(len(self.targets))
+			],
+		}
+		with open(filename, 'w') as f:
+			json.dump(data, f, indent=1)
+
+	def dump(self):
+		"""Writes csv and json files into the profiling directory in the user dir.
+		@return: path of the files without extension"""
+		profiling_dir = os.path.join(PATHS.USER_DIR, 'profiling')
+		if not os.path.exists(profiling_dir):
+			os.makedirs(profiling_dir)
+
+		pattern = os.path.join(profiling_dir, time.strftime('%Y-%m-%d') + '.ticks.%02d')
+		num = 1
+		while os.path.exists(pattern % num + '.json'):
+			num += 1
+		path = pattern % num
+
+		self.dump_csv(path + '.csv')
+		self.dump_json(path + '.json')
+		return path
+
+	def format_top_targets(self, n=10):
+		"""@return: list of lines describing the most expensive callback targets"""
+		return [u"%6.0f ms %7d x %s.%s" % (seconds * 1000, calls, cls, func)
+		        for (cls, func, calls, seconds) in self.get_top_targets(n)]
@@ -226,11 +226,17 @@ class UhDbAccessor(DbReader):
 
 	# Tile sets
 
+	@decorators.cachedmethod
+	def get_tile_sets(self, ground_id):
+		"""Returns the tile sets for tiles of type ground_id
+		@return: tuple of tile set ids"""
+		sql = "SELECT set_id FROM tile_set WHERE ground_id = ?"
+		return tuple(row[0] for row in self(sql, ground_id))
+
 	def get_random_tile_set(self, ground_id):
 		"""Returns a tile set for a tile of type ground_id"""
-		sql = "SELECT set_id FROM tile_set WHERE ground_id = ?"
-		db_data = self.cached_query(sql, ground_id)
-		return random.choice(db_data)[0] if db_data else None
+		tile_sets = self.get_tile_sets(ground_id)
+		return random.choice(tile_sets) if tile_sets else None
 
 	@decorators.cachedmethod
 	def get_translucent_buildings(self):
@@ -31,10 +31,14 @@ import horizons.globals
 from horizons.world.island import Island
 from horizons.world.player import HumanPlayer
 from horizons.scheduler import Scheduler
-from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.buildingindexer import ArrayBuildingIndexer
 from horizons.util.color import Color
+from horizons.util.pathfinding.gridpathfinding import PathGrid
+from horizons.util.pathfinding.hierarchicalpathfinding import PathHierarchy
+from horizons.util.pathfinding.pathcache import PathCache
 from horizons.util.python import decorators
 from horizons.util.shapes import Circle, Point, Rect
+from horizons.util.spatialindex import SpatialIndex
 from horizons.util.worldobject import WorldObject
 from horizons.constants import UNITS, BUILDINGS, RES, GROUND, GAME, MAP, PATHS
 from horizons.ai.trader import Trader
@@ -43,6 +47,8 @@ from horizons.ai.aiplayer import AIPlayer
 from horizons.entities import Entities
 from horizons.world.buildingowner import BuildingOwner
 from horizons.world.diplomacy import Diplomacy
+from horizons.world.ground import GroundInstanceLoader
+from horizons.world.seamap import FullMap, OpenSeaMap, SeaMap
 from horizons.world.units.weapon import Weapon
 from horizons.command.unit import CreateUnit
 from horizons.component.healthcomponent import HealthComponent
@@ -97,8 +103,12 @@ class World(BuildingOwner, WorldObject):
 		# and having at least one reference to them
 		self.ships = []
 		self.ground_units = []
+		# spatial indices of the units in the lists above, see get_ships
+		self.ship_index = SpatialIndex()
+		self.ground_unit_index = SpatialIndex()
 
 		self.islands = []
+		self.ground_instances = None
 
 		super(World, self).__init__(worldid=GAME.WORLD_WORLDID)
 
@@ -126,11 +136,21 @@ class World(BuildingOwner, WorldObject):
 		self.fake_tile_map = None
 		self.full_map = None
 		self.island_map = None
+		if self.ground_instances is not None:
+			self.ground_instances.end()
+			self.ground_instances = None
 		self.water = None
+		self.water_grid = None
+		self.water_hierarchy = None
+		self.water_and_coastline = None
+		self.water_and_coastline_grid = None
+		self.water_and_coastline_path_cache = None
 		self.ships = None
+		self.ship_index = None
 		self.ship_map = None
 		self.fish_indexer = None
 		self.ground_units = None
+		self.ground_unit_index = None
 
 		if self.pirate is not None:
 			self.pirate.end()
@@ -165,6 +185,10 @@ class World(BuildingOwner, WorldObject):
 		# all static data
 		LoadingProgress.broadcast(self, 'world_load_map')
 		self.load_raw_map(savegame_db)
+		self.ground_instances = GroundInstanceLoader(self.session.view)
+		for island in self.islands:
+			self.ground_instances.add_tiles(island.ground_map.itervalues())
+		self.ground_instances.start()
 
 		# load world buildings (e.g. fish)
 		LoadingProgress.broadcast(self, 'world_load_buildings')
@@ -174,7 +198,9 @@ class World(BuildingOwner, WorldObject):
 
 		# use a dict because it's directly supported by the pathfinding algo
 		LoadingProgress.broadcast(self, 'world_init_water')
-		self.water = dict((tile, 1.0) for tile in self.ground_map)
+		self.water = dict.fromkeys(self.ground_map, 1.0)
+		self.water_grid = PathGrid.from_nodes(self.water)
+		self.water_hierarchy = PathHierarchy(self.water_grid)
 		self._init_water_bodies()
 		self.sea_number = self.water_body[(self.min_x, self.min_y)]
 		for island in self.islands:
@@ -189,6 +215,8 @@ class World(BuildingOwner, WorldObject):
 			for coord, tile in island.ground_map.iteritems():
 				if 'coastline' in tile.classes or 'constructible' not in tile.classes:
 					self.water_and_coastline[coord] = 1.0
+		self.water_and_coastline_grid = PathGrid.from_nodes(self.water_and_coastline)
+		self.water_and_coastline_path_cache = PathCache()
 		self._init_shallow_water_bodies()
 		self.shallow_sea_number = self.shallow_water_body[(self.min_x, self.min_y)]
 
@@ -284,31 +312,26 @@ class World(BuildingOwner, WorldObject):
 
 		# Add water.
 		self.log.debug("Filling world with water...")
-		self.ground_map = {}
 
 		# big sea water tile class
 		if not preview:
 			default_grounds = Entities.grounds[self.properties.get('default_ground', '%d-straight' % GROUND.WATER[0])]
 
 		fake_tile_class = Entities.grounds['-1-special']
-		fake_tile_size = 10
-		for x in xrange(self.min_x-MAP.BORDER, self.max_x+MAP.BORDER, fake_tile_size):
-			for y in xrange(self.min_y-MAP.BORDER, self.max_y+MAP.BORDER, fake_tile_size):
-				fake_tile_x = x - 1
-				fake_tile_y = y + fake_tile_size - 1
-				if not preview:
+		fake_tile_size = SeaMap.BLOCK_SIZE
+		if not preview:
+			for x in xrange(self.min_x-MAP.BORDER, self.max_x+MAP.BORDER, fake_tile_size):
+				for y in xrange(self.min_y-MAP.BORDER, self.max_y+MAP.BORDER, fake_tile_size):
 					# we don't need no references, we don't need no mem control
-					default_grounds(self.session, fake_tile_x, fake_tile_y)
-				for x_offset in xrange(fake_tile_size):
-					if self.min_x <= x + x_offset < self.max_x:
-						for y_offset in xrange(fake_tile_size):
-							if self.min_y <= y + y_offset < self.max_y:
-								self.ground_map[(x+x_offset, y+y_offset)] = fake_tile_class(self.session, fake_tile_x, fake_tile_y)
-		self.fake_tile_map = copy.copy(self.ground_map)
+					default_grounds(self.session, x - 1, y + fake_tile_size - 1)
+		# the tiles of the water are only created when they are needed
+		self.fake_tile_map = SeaMap(self.session, fake_tile_class, self.min_x, self.min_y, self.max_x, self.max_y,
+		                            (self.min_x - MAP.BORDER, self.min_y - MAP.BORDER))
+		self.ground_map = OpenSeaMap(self.fake_tile_map)
 
 		# Remove parts that are occupied by islands, create the island map and the full map.
 		self.island_map = {}
-		self.full_map = copy.copy(self.ground_map)
+		self.full_map = FullMap(self.fake_tile_map)
 		for island in self.islands:
 			for coords in island.ground_map:
 				if coords in self.ground_map:
@@ -398,7 +421,7 @@ class World(BuildingOwner, WorldObject):
 	def init_fish_indexer(self):
 		radius = Entities.buildings[ BUILDINGS.FISHER ].radius
 		buildings = self.provider_buildings.provider_by_resources[RES.FISH]
-		self.fish_indexer = BuildingIndexer(radius, self.full_map, buildings=buildings)
+		self.fish_indexer = ArrayBuildingIndexer(radius, self.full_map, buildings=buildings)
 
 	def init_new_world(self, trader_enabled, pirate_enabled, natural_resource_multiplier):
 		"""
@@ -539,7 +562,10 @@ class World(BuildingOwner, WorldObject):
 		@param point: coords as Point
 		@return: instance of Ground at x, y
 		"""
-		return self.full_map.get( (point.x, point.y) )
+		try:
+			return self.full_map[(point.x, point.y)]
+		except KeyError:
+			return None
 
 	@property
 	def settlements(self):
@@ -604,16 +630,14 @@ class World(BuildingOwner, WorldObject):
 		@return: List of ships.
 		"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [ship for ship in self.ships if circle.contains(ship.position)]
+			return self.ship_index.get_in_radius(position, radius)
 		else:
 			return self.ships
 
 	def get_ground_units(self, position=None, radius=None):
 		"""@see get_ships"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [unit for unit in self.ground_units if circle.contains(unit.position)]
+			return self.ground_unit_index.get_in_radius(position, radius)
 		else:
 			return self.ground_units
 
@@ -621,11 +645,8 @@ class World(BuildingOwner, WorldObject):
 		"""@see get_ships"""
 		buildings = []
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
 			for island in self.islands:
-				for building in island.buildings:
-					if circle.contains(building.position.center):
-						buildings.append(building)
+				buildings.extend(island.building_index.get_in_radius(position, radius))
 			return buildings
 		else:
 			return [b for b in island.buildings for island in self.islands]
@@ -648,9 +669,20 @@ class World(BuildingOwner, WorldObject):
 				instances.append(instance)
 		return instances
 
+	def is_ai_tick_in_progress(self):
+		"""Returns whether an AI player is in the middle of a tick (see TickExecutor).
+		Saving at this point completes the tick early."""
+		return any(isinstance(player, AIPlayer) and player.tick_executor.busy for player in self.players)
+
 	def save(self, db):
 		"""Saves the current game to the specified db.
 		@param db: DbReader object of the db the game is saved to."""
+		for player in self.players:
+			if isinstance(player, AIPlayer):
+				# do the remaining steps of AI ticks now, before anything is saved.
+				# this changes the course of the game, autosaves therefore wait for
+				# the end of AI ticks (see is_ai_tick_in_progress)
+				player.finish_tick()
 		super(World, self).save(db)
 		if isinstance(self.map_name, list):
 			db("INSERT INTO metadata VALUES(?, ?)", 'random_island_sequence', ' '.join(self.map_name))
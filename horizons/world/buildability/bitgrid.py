@@ -0,0 +1,242 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from operator import and_
+
+# origins of rectangles that only partly overlap the island can be this far outside of it
+GRID_PADDING = 5
+
+
+def get_grid_geometry(coords_iterable):
+	"""
+	Return the geometry (min_x, min_y, height) of grids that can contain the coordinates.
+
+	All caches of an island use the geometry of its land_or_coast set, which makes it
+	possible to combine them row by row.
+	"""
+	min_x = min_y = max_y = None
+	for x, y in coords_iterable:
+		if min_x is None:
+			min_x, min_y, max_y = x, y, y
+		elif x < min_x:
+			min_x = x
+		if y < min_y:
+			min_y = y
+		elif y > max_y:
+			max_y = y
+	if min_x is None:
+		return (0, 0, 0)
+	return (min_x - GRID_PADDING, min_y - GRID_PADDING, max_y - min_y + 1 + GRID_PADDING)
+
+
+class BitGrid(object):
+	"""
+	Set of coordinates that is stored as a bit mask per row.
+
+	(x, y) is in the grid if and only if bit x - min_x of rows[y - min_y] is set. A row is a
+	python integer, so operations on whole rows (like shifting and combining them) are cheap.
+	Grids with the same geometry can be intersected by combining their rows with a bitwise and.
+
+	Instances can be used like read-only sets of (x, y) tuples. They are views: the caches
+	update the rows in place and all users see the changes.
+	"""
+
+	__slots__ = ('min_x', 'min_y', 'rows')
+
+	def __init__(self, min_x, min_y, height):
+		self.min_x = min_x
+		self.min_y = min_y
+		self.rows = [0] * height
+
+	@classmethod
+	def from_coords(cls, geometry, coords_iterable):
+		"""Create a grid of the given geometry that contains the coordinates."""
+		self = cls(*geometry)
+		self.add(coords_iterable)
+		return self
+
+	@property
+	def geometry(self):
+		return (self.min_x, self.min_y, len(self.rows))
+
+	def add(self, coords_iterable):
+		"""Add the coordinates and return the set of changed row indices."""
+		min_x = self.min_x
+		min_y = self.min_y
+		rows = self.rows
+		changed_rows = set()
+		for x, y in coords_iterable:
+			rows[y - min_y] |= 1 << (x - min_x)
+			changed_rows.add(y - min_y)
+		return changed_rows
+
+	def remove(self, coords_iterable):
+		"""Remove the coordinates and return the set of changed row indices."""
+		min_x = self.min_x
+		min_y = self.min_y
+		rows = self.rows
+		changed_rows = set()
+		for x, y in coords_iterable:
+			rows[y - min_y] &= ~(1 << (x - min_x))
+			changed_rows.add(y - min_y)
+		return changed_rows
+
+	def __contains__(self, coords):
+		x, y = coords
+		i = y - self.min_y
+		if i < 0 or x < self.min_x:
+			return False
+		try:
+			return (self.rows[i] >> (x - self.min_x)) & 1 == 1
+		except IndexError:
+			return False
+
+	def __iter__(self):
+		min_x = self.min_x
+		y = self.min_y
+		for row in self.rows:
+			while row:
+				low_bit = row & -row
+				yield (min_x + low_bit.bit_length() - 1, y)
+				row ^= low_bit
+			y += 1
+
+	def __len__(self):
+		return sum(bin(row).count('1') for row in self.rows)
+
+	def __nonzero__(self):
+		return any(self.rows)
+
+	def _compatible(self, other):
+		return isinstance(other, BitGrid) and self.geometry == other.geometry
+
+	def intersection(self, *others):
+		"""Return the set of coordinates that are in this grid and in all others (sets or grids)."""
+		if all(self._compatible(other) for other in others):
+			result = BitGrid(*self.geometry)
+			rows = self.rows
+			for other in others:
+				rows = map(and_, rows, other.rows)
+			result.rows = rows
+			return set(result)
+		return set(self).intersection(*others)
+
+	def union(self, *others):
+		return set(self).union(*others)
+
+	def __eq__(self, other):
+		if self._compatible(other):
+			return self.rows == other.rows
+		if isinstance(other, (BitGrid, set, frozenset)):
+			return set(self) == set(other)
+		return NotImplemented
+
+	def __ne__(self, other):
+		result = self.__eq__(other)
+		return result if result is NotImplemented else not result
+
+	__hash__ = None
+
+	def __repr__(self):
+		return 'BitGrid(%s)' % sorted(self)
+
+
+def get_window_row(row, width, operator):
+	"""
+	Return the row of the origins of the horizontal windows with the given width.
+
+	Bit b of the result is operator applied to the bits b..b + width - 1 of row, which
+	means and_ for windows that are entirely inside the row and or_ for windows that
+	overlap it.
+	"""
+	result = row
+	for i in xrange(1, width):
+		result = operator(result, row >> i)
+	return result
+
+
+def get_rectangle_row(window_rows, index, height, operator):
+	"""
+	Return row index of the origins of rectangles with the given height.
+
+	window_rows are the rows of windows with the width of the rectangles, see get_window_row.
+	"""
+	end = index + height
+	if end > len(window_rows):
+		if operator is and_:
+			return 0 # the rectangles would reach below the grid
+		end = len(window_rows)
+	result = window_rows[index]
+	for i in xrange(index + 1, end):
+		result = operator(result, window_rows[i])
+	return result
+
+
+class RectangleBitGrids(object):
+	"""
+	BitGrids of the origins of rectangles of several sizes that are inside of an area.
+
+	The area is the grid base. Depending on the operator, the rectangles either have to be
+	entirely inside of the area (and_) or only overlap it (or_). grids[(width, height)]
+	contains the origins of the rectangles of that size.
+
+	After changing rows of base, update_rows has to be called with the changed row indices.
+	Each of them only affects one row of the windows of each width and height rows of the
+	rectangles of each size, so updates are cheap.
+	"""
+
+	def __init__(self, geometry, sizes, operator):
+		self.operator = operator
+		self.base = BitGrid(*geometry)
+		self.windows = {1: self.base} # {width: BitGrid of horizontal windows, ...}
+		self.grids = {} # {(width, height): BitGrid, ...}
+		for size in sizes:
+			width = size[0]
+			if width not in self.windows:
+				self.windows[width] = BitGrid(*geometry)
+			if size == (1, 1):
+				self.grids[size] = self.base
+			elif size[1] == 1:
+				self.grids[size] = self.windows[width]
+			else:
+				self.grids[size] = BitGrid(*geometry)
+
+	def update_rows(self, changed_rows):
+		operator = self.operator
+		base_rows = self.base.rows
+		for width, grid in self.windows.iteritems():
+			if width == 1:
+				continue
+			rows = grid.rows
+			for i in changed_rows:
+				rows[i] = get_window_row(base_rows[i], width, operator)
+
+		for (width, height), grid in self.grids.iteritems():
+			if height == 1:
+				continue
+			window_rows = self.windows[width].rows
+			rows = grid.rows
+			affected_rows = set()
+			for i in changed_rows:
+				affected_rows.update(xrange(max(0, i - height + 1), i + 1))
+			for i in affected_rows:
+				rows[i] = get_rectangle_row(window_rows, i, height, operator)
+
@@ -33,6 +33,14 @@ class ConnectedAreaCache(object):
 	connected area. It is only valid between updates of the cache (any addition/removal
 	may change the area id). Thus the ids should never be used for anything other than
 	(in)equality checks.
+
+	The areas are kept as a disjoint-set structure that is always fully compressed, i.e.
+	area_numbers maps every coordinate directly to the id of its area and a query is a
+	single dict lookup. Areas are united by size: the coordinates of the smaller areas get
+	the id of the largest one, so each coordinate is relabeled at most O(log n) times while
+	the area grows. A removal can only split the areas it touches; they are searched from
+	the remaining neighbors of the removed coordinates in parallel, which only needs to
+	relabel the parts that are split off.
 	"""
 
 	__moves = [(-1, 0), (0, -1), (0, 1), (1, 0)]
@@ -42,76 +50,126 @@ class ConnectedAreaCache(object):
 		self.areas = {} # {area id: set((x, y), ...), ...}
 		self._next_area_id = 1
 
-	def _label_area(self, seed_coords):
+	def _get_neighbors(self, coords):
+		x, y = coords
+		return [(x + dx, y + dy) for (dx, dy) in self.__moves]
+
+	def _create_area(self, coords_set):
 		area_id = self._next_area_id
 		self._next_area_id += 1
-
+		self.areas[area_id] = coords_set
 		area_numbers = self.area_numbers
-		area_numbers[seed_coords] = area_id
-		new_area = set([seed_coords])
-		self.areas[area_id] = new_area
-
-		moves = self.__moves
-		queue = deque([seed_coords])
-		while queue:
-			(x, y) = queue.popleft()
-			for (dx, dy) in moves:
-				coords = (x + dx, y + dy)
-				if coords not in area_numbers:
-					continue
-				if area_numbers[coords] == area_id:
-					continue
+		for coords in coords_set:
+			area_numbers[coords] = area_id
+		return area_id
 
-				area_numbers[coords] = area_id
-				new_area.add(coords)
-				queue.append(coords)
-
-	def _renumber_affected_areas(self, affected_areas):
-		for area_id in affected_areas:
-			for coords in self.areas[area_id]:
-				if self.area_numbers[coords] == area_id:
-					self._label_area(coords)
-					assert self.area_numbers[coords] != area_id
-			del self.areas[area_id]
+	def _unite_areas(self, area_ids):
+		"""Unite the given areas and return the id of the resulting area."""
+		areas = self.areas
+		# the largest area keeps its id; ties are broken by id to stay deterministic
+		largest_id = max(area_ids, key=lambda area_id: (len(areas[area_id]), -area_id))
+		largest_area = areas[largest_id]
+		area_numbers = self.area_numbers
+		for area_id in area_ids:
+			if area_id == largest_id:
+				continue
+			for coords in areas[area_id]:
+				area_numbers[coords] = largest_id
+			largest_area.update(areas[area_id])
+			del areas[area_id]
+		return largest_id
 
 	def add_area(self, coords_list):
 		"""Add a list of new coordinates to the area."""
-		moves = self.__moves
-		affected_areas = set()
+		area_numbers = self.area_numbers
 		for coords in coords_list:
-			assert coords not in self.area_numbers
+			assert coords not in area_numbers
 			nearby_areas = []
-			for (dx, dy) in moves:
-				neighbor_coords = (coords[0] + dx, coords[1] + dy)
-				if neighbor_coords in self.area_numbers:
-					area_id = self.area_numbers[neighbor_coords]
+			for neighbor_coords in self._get_neighbors(coords):
+				if neighbor_coords in area_numbers:
+					area_id = area_numbers[neighbor_coords]
 					if area_id not in nearby_areas:
 						nearby_areas.append(area_id)
 
 			if not nearby_areas:
-				# create a new area
-				area_id = self._next_area_id
-				self._next_area_id += 1
-				self.area_numbers[coords] = area_id
-				self.areas[area_id] = set([coords])
+				self._create_area(set([coords]))
 			else:
-				# add to one of the nearby areas
-				area_id = nearby_areas[0]
-				self.area_numbers[coords] = area_id
+				area_id = nearby_areas[0] if len(nearby_areas) == 1 else self._unite_areas(nearby_areas)
+				area_numbers[coords] = area_id
 				self.areas[area_id].add(coords)
-				if len(nearby_areas) > 1:
-					# more than one nearby area; merge them later on
-					for nearby_area_id in nearby_areas:
-						affected_areas.add(nearby_area_id)
 
-		self._renumber_affected_areas(affected_areas)
+	def _split_area(self, area_id, seeds):
+		"""
+		Give new ids to the parts of the area that are no longer connected to the rest.
+
+		A breadth-first search is started from each seed and the searches take turns.
+		Searches that meet are merged. A search that runs out of coordinates has found a
+		separate part of the area, so the work is proportional to the number of seeds times
+		the size of the parts that are split off. The last search keeps the old area id.
+		"""
+		area = self.areas[area_id]
+		owners = {} # {(x, y): search number, ...}
+		searches = [] # [(set((x, y), ...), deque([(x, y), ...])), ...]
+		for coords in seeds:
+			if coords not in owners:
+				owners[coords] = len(searches)
+				searches.append((set([coords]), deque([coords])))
+		active = range(len(searches))
+
+		while len(active) > 1:
+			for number in list(active):
+				if searches[number] is None:
+					continue
+				visited, queue = searches[number]
+				if not queue:
+					# this search has found a whole part, it is disconnected from the others
+					area.difference_update(visited)
+					self._create_area(visited)
+					searches[number] = None
+					active.remove(number)
+					if len(active) == 1:
+						break
+					continue
+
+				for coords in self._get_neighbors(queue.popleft()):
+					if coords not in area:
+						continue
+					other_number = owners.get(coords)
+					if other_number is None:
+						owners[coords] = number
+						visited.add(coords)
+						queue.append(coords)
+					elif other_number != number:
+						# both searches are in the same part; continue with the larger one
+						other_visited, other_queue = searches[other_number]
+						if len(other_visited) > len(visited):
+							number, other_number = other_number, number
+							visited, queue, other_visited, other_queue = other_visited, other_queue, visited, queue
+						for other_coords in other_visited:
+							owners[other_coords] = number
+						visited.update(other_visited)
+						queue.extend(other_queue)
+						searches[other_number] = None
+						active.remove(other_number)
+				if len(active) == 1:
+					break
 
 	def remove_area(self, coords_list):
 		"""Remove a list of existing coordinates from the area."""
-		affected_areas = set()
+		area_numbers = self.area_numbers
+		affected_areas = {} # {area id: [(x, y), ...], ...}
 		for coords in coords_list:
-			area_id = self.area_numbers[coords]
-			del self.area_numbers[coords]
-			affected_areas.add(area_id)
+			area_id = area_numbers.pop(coords)
 			self.areas[area_id].discard(coords)
-		self._renumber_affected_areas(affected_areas)
+			affected_areas.setdefault(area_id, []).append(coords)
+
+		for area_id, removed_coords_list in sorted(affected_areas.iteritems()):
+			if not self.areas[area_id]:
+				del self.areas[area_id]
+				continue
+			seeds = []
+			for removed_coords in removed_coords_list:
+				for coords in self._get_neighbors(removed_coords):
+					if area_numbers.get(coords) == area_id:
+						seeds.append(coords)
+			self._split_area(area_id, seeds)
@@ -19,7 +19,10 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from operator import and_, or_
+
 from horizons.util.shapes.rect import Rect
+from horizons.world.buildability.bitgrid import BitGrid, RectangleBitGrids, get_grid_geometry
 
 class TerrainRequirement:
 	LAND = 1 # buildings that must be entirely on flat land
@@ -48,8 +51,9 @@ class TerrainBuildabilityCache(object):
 		self._island = island
 		self._land = None
 		self._coast = None
+		self._geometry = None
 		self.land_or_coast = None # set((x, y), ...)
-		self.cache = None # {terrain type: {(width, height): set((x, y), ...), ...}, ...}
+		self.cache = None # {terrain type: {(width, height): BitGrid, ...}, ...}
 		self.create_cache()
 
 	def _init_land_and_coast(self):
@@ -62,120 +66,38 @@ class TerrainBuildabilityCache(object):
 			elif 'coastline' in tile.classes:
 				coast.add(coords)
 
+		self.land_or_coast = land.union(coast)
+		self._geometry = get_grid_geometry(self.land_or_coast)
 		self._land = land
 		self._coast = coast
-		self.land_or_coast = land.union(coast)
 
-	def _init_rows(self):
-		# these dicts show whether there is a constructible and/or coastline tile in a row
-		# of 2 or 3 tiles starting from the coords and going right
-		# both are in the format {(x, y): (has land, has coast), ...}
-		row2 = {}
-		row3 = {}
-
-		land = self._land
-		coast = self._coast
-		land_or_coast = self.land_or_coast
-
-		for (x, y) in self.land_or_coast:
-			if (x + 1, y) not in land_or_coast:
-				continue
-
-			has_land = (x, y) in land or (x + 1, y) in land
-			has_coast = (x, y) in coast or (x + 1, y) in coast
-			row2[(x, y)] = (has_land, has_coast)
-			if (x + 2, y) not in land_or_coast:
-				continue
-
-			has_land = has_land or (x + 2, y) in land
-			has_coast = has_coast or (x + 2, y) in coast
-			row3[(x, y)] = (has_land, has_coast)
-
-		self.row2 = row2
-		self.row3 = row3
-
-	def _init_squares(self):
-		self._init_rows()
-		row2 = self.row2
-		row3 = self.row3
-
-		sq2 = {}
-		for coords in row2:
-			coords2 = (coords[0], coords[1] + 1)
-			if coords2 in row2:
-				has_land = row2[coords][0] or row2[coords2][0]
-				has_coast = row2[coords][1] or row2[coords2][1]
-				sq2[coords] = (has_land, has_coast)
-
-		sq3 = {}
-		for coords in row3:
-			coords2 = (coords[0], coords[1] + 1)
-			coords3 = (coords[0], coords[1] + 2)
-			if coords2 in row3 and coords3 in row3:
-				has_land = row3[coords][0] or row3[coords2][0] or row3[coords3][0]
-				has_coast = row3[coords][1] or row3[coords2][1] or row3[coords3][1]
-				sq3[coords] = (has_land, has_coast)
-
-		self.sq2 = sq2
-		self.sq3 = sq3
+	def _create_grids(self, coords_set, sizes, operator):
+		grids = RectangleBitGrids(self._geometry, sizes, operator)
+		grids.update_rows(grids.base.add(coords_set))
+		return grids.grids
 
 	def create_cache(self):
 		self._init_land_and_coast()
 
-		land = {}
-		land_and_coast = {}
-
-		land[(1, 1)] = self._land
+		land_sizes = set()
 		for size in self.sizes:
-			if size != (1, 1):
-				land[size] = set()
-				if size[0] != size[1]:
-					land[(size[1], size[0])] = set()
-
-		for size in [(2, 2), (3, 3)]:
-			land_and_coast[size] = set()
-
-		self._init_squares()
-
-		sq2 = self.sq2
-		for coords, (has_land, has_coast) in sq2.iteritems():
-			x, y = coords
-			if has_land and has_coast:
-				# handle 2x2 coastal buildings
-				land_and_coast[(2, 2)].add(coords)
-			elif has_land and not has_coast:
-				# handle 2x2, 2x3, and 2x4 land buildings
-				land[(2, 2)].add(coords)
-
-				if (x + 2, y) in sq2 and not sq2[(x + 2, y)][1]:
-					land[(3, 2)].add(coords)
-					land[(4, 2)].add(coords)
-				elif (x + 1, y) in sq2 and not sq2[(x + 1, y)][1]:
-					land[(3, 2)].add(coords)
-
-				if (x, y + 2) in sq2 and not sq2[(x, y + 2)][1]:
-					land[(2, 3)].add(coords)
-					land[(2, 4)].add(coords)
-				elif (x, y + 1) in sq2 and not sq2[(x, y + 1)][1]:
-					land[(2, 3)].add(coords)
-
-		sq3 = self.sq3
-		for coords, (has_land, has_coast) in sq3.iteritems():
-			x, y = coords
-			if has_land and has_coast:
-				# handle 3x3 coastal buildings
-				land_and_coast[(3, 3)].add(coords)
-			elif has_land and not has_coast:
-				# handle other buildings that have both sides >= 3 (3x3, 4x4, 6x6)
-				land[(3, 3)].add(coords)
-
-				if (x, y + 3) in sq3 and not sq3[(x, y + 3)][1] and (x + 3, y) in sq3 \
-					    and not sq3[(x + 3, y)][1] and (x + 3, y + 3) in sq3 and not sq3[(x + 3, y + 3)][1]:
-					land[(4, 4)].add(coords)
-					land[(6, 6)].add(coords)
-				elif (x, y + 1) in sq3 and not sq3[(x, y + 1)][1] and (x + 1, y) in sq3 \
-					    and not sq3[(x + 1, y)][1] and (x + 1, y + 1) in sq3 and not sq3[(x + 1, y + 1)][1]:
-					land[(4, 4)].add(coords)
+			land_sizes.add(size)
+			land_sizes.add((size[1], size[0]))
+		# buildings that must be entirely on flat land
+		land = self._create_grids(self._land, land_sizes, and_)
+
+		# coastal buildings have to be entirely on land or coast and partly on both of them
+		coastal_sizes = [(2, 2), (3, 3)]
+		land_or_coast_grids = self._create_grids(self.land_or_coast, coastal_sizes, and_)
+		some_land_grids = self._create_grids(self._land, coastal_sizes, or_)
+		some_coast_grids = self._create_grids(self._coast, coastal_sizes, or_)
+
+		land_and_coast = {}
+		for size in coastal_sizes:
+			grid = BitGrid(*self._geometry)
+			grid.rows[:] = map(and_, land_or_coast_grids[size].rows,
+			                   map(and_, some_land_grids[size].rows, some_coast_grids[size].rows))
+			land_and_coast[size] = grid
 
 		self.cache = {}
 		self.cache[TerrainRequirement.LAND] = land
@@ -203,10 +125,13 @@ class TerrainBuildabilityCache(object):
 					break
 
 		self.cache[TerrainRequirement.LAND_AND_COAST_NEAR_SEA] = {}
-		self.cache[TerrainRequirement.LAND_AND_COAST_NEAR_SEA][(3, 3)] = near_sea
+		self.cache[TerrainRequirement.LAND_AND_COAST_NEAR_SEA][(3, 3)] = BitGrid.from_coords(self._geometry, near_sea)
 
 	def get_buildability_intersection(self, terrain_type, size, *other_cache_layers):
-		result = self.cache[terrain_type][size]
-		for cache_layer in other_cache_layers:
-			result = result.intersection(cache_layer.cache[size])
-		return result
+		"""
+		Return the set of origins of buildings of the given type that are also in the other layers.
+
+		The other layers are caches of the same island, so the grids can be intersected row by row.
+		"""
+		grids = [cache_layer.cache[size] for cache_layer in other_cache_layers]
+		return self.cache[terrain_type][size].intersection(*grids)
@@ -23,13 +23,8 @@
 from building import BasicBuilding
 from buildable import BuildableSingleOnOcean
 from horizons.world.building.buildingresourcehandler import BuildingResourceHandler
-from horizons.component.storagecomponent import StorageComponent
 
 class BoatBuilder(BuildingResourceHandler, BuildableSingleOnOcean, BasicBuilding):
 
 	def __init__(self, **kwargs):
 		super(BoatBuilder, self).__init__(**kwargs)
-
-	def initialize(self, **kwargs):
-		super(BoatBuilder, self).initialize(**kwargs)
-		self.get_component(StorageComponent).inventory.limit = 10
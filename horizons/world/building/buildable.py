@@ -21,7 +21,6 @@
 
 import itertools
 
-from horizons.util.pathfinding.roadpathfinder import RoadPathFinder
 from horizons.util.python import decorators
 from horizons.util.shapes import Circle, Point, Rect
 from horizons.util.worldobject import WorldObject
@@ -381,8 +380,8 @@ class BuildableLine(Buildable):
 		if island is None:
 			return []
 
-		path = RoadPathFinder()(island.path_nodes.nodes, point1.to_tuple(),
-		                        point2.to_tuple(), rotation in (45, 225))
+		path = island.path_nodes.get_road_line(point1.to_tuple(), point2.to_tuple(),
+		                                       rotation in (45, 225))
 		if path is None: # can't find a path between these points
 			return [] # TODO: maybe implement alternative strategy
 
@@ -19,7 +19,7 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-from horizons.messaging import ResourceProduced
+from horizons.messaging import ResourceAvailable, ResourceProduced
 from horizons.world.resourcehandler import ResourceHandler
 from horizons.world.production.producer import Producer
 
@@ -38,6 +38,7 @@ class BuildingResourceHandler(ResourceHandler):
 
 	def __init(self):
 		self.island.provider_buildings.append(self)
+		ResourceAvailable.subscribe(self._on_resource_available, sender=self)
 		if self.has_component(Producer):
 			self.get_component(Producer).add_activity_changed_listener(self._set_running_costs_to_status)
 			self.get_component(Producer).add_production_finished_listener(self.on_production_finished)
@@ -50,10 +51,21 @@ class BuildingResourceHandler(ResourceHandler):
 	def remove(self):
 		super(BuildingResourceHandler, self).remove()
 		self.island.provider_buildings.remove(self)
+		ResourceAvailable.unsubscribe(self._on_resource_available, sender=self)
 		if self.has_component(Producer):
 			self.get_component(Producer).remove_activity_changed_listener(self._set_running_costs_to_status)
 			self.get_component(Producer).remove_production_finished_listener(self.on_production_finished)
 
+	def remove_incoming_collector(self, collector):
+		super(BuildingResourceHandler, self).remove_incoming_collector(collector)
+		if collector.job is not None:
+			# the resources reserved by the collector can be picked up by others now
+			self.island.provider_buildings.resources_available(
+			  [entry.res for entry in collector.job.reslist])
+
+	def _on_resource_available(self, message):
+		self.island.provider_buildings.resources_available(message.resources)
+
 	def on_production_finished(self, caller, resources):
 		if self.is_valid_tradable_resource(resources):
 			ResourceProduced.broadcast(self, caller, resources)
@@ -27,6 +27,7 @@ from fife import fife
 import horizons.globals
 
 from horizons.constants import LAYERS, GROUND
+from horizons.messaging import ZoomChanged
 from horizons.util.loaders.tilesetloader import TileSetLoader
 
 
@@ -34,7 +35,7 @@ class SurfaceTile(object):
 	is_water = False
 	layer = LAYERS.GROUND
 
-	__slots__ = ('x', 'y', 'settlement', 'blocked', 'object', 'session', '_instance', '_tile_set_id')
+	__slots__ = ('x', 'y', 'settlement', 'blocked', 'object', 'session', '_fife_instance', '_tile_set_id', '_rotation')
 
 	def __init__(self, session, x, y):
 		"""
@@ -50,18 +51,67 @@ class SurfaceTile(object):
 		self.object = None
 		self.session = session
 		self._tile_set_id = horizons.globals.db.get_random_tile_set(self.id)
+		self._rotation = None
 
 		layer = session.view.layers[self.layer]
-		self._instance = layer.createInstance(self._fife_objects[self._tile_set_id],
-		                                      fife.ModelCoordinate(int(x), int(y), 0),
-		                                      "")
-		fife.InstanceVisual.create(self._instance)
+		self._fife_instance = layer.createInstance(self._fife_objects[self._tile_set_id],
+		                                           fife.ModelCoordinate(int(x), int(y), 0),
+		                                           "")
+		fife.InstanceVisual.create(self._fife_instance)
+
+	@classmethod
+	def create_deferred(cls, session, x, y, tile_set_id, rotation):
+		"""Creates a tile without fife instance, it is created when it is needed.
+		This happens when _instance is accessed or create_instance is called, usually by the
+		GroundInstanceLoader when the tile is about to become visible.
+		@param tile_set_id: tile set of the tile, see UhDbAccessor.get_tile_sets
+		@param rotation: rotation that the tile will act with
+		"""
+		tile = cls.__new__(cls)
+		tile.x = x
+		tile.y = y
+		tile.settlement = None
+		tile.blocked = False
+		tile.object = None
+		tile.session = session
+		tile._tile_set_id = tile_set_id
+		tile._rotation = rotation
+		tile._fife_instance = None
+		return tile
+
+	def create_instance(self):
+		"""Creates the fife instance of a tile of create_deferred, if it doesn't exist yet."""
+		if self._fife_instance is not None or self._rotation is None:
+			return
+		rotation = self._rotation
+		self._rotation = None
+		layer = self.session.view.layers[self.layer]
+		self._fife_instance = layer.createInstance(self._fife_objects[self._tile_set_id],
+		                                           fife.ModelCoordinate(int(self.x), int(self.y), 0),
+		                                           "")
+		fife.InstanceVisual.create(self._fife_instance)
+		self.act(rotation)
+
+	@property
+	def _instance(self):
+		if self._fife_instance is None:
+			self.create_instance()
+		return self._fife_instance
+
+	@_instance.setter
+	def _instance(self, instance):
+		self._fife_instance = instance
+		self._rotation = None
 
 	def __str__(self):
 		return "SurfaceTile(id=%s, shape=%s, x=%s, y=%s, water=%s, obj=%s)" % \
 		       (self.id, self.shape, self.x, self.y, self.is_water, self.object)
 
 	def act(self, rotation):
+		if self._fife_instance is None and self._rotation is not None:
+			# the instance doesn't exist yet, it will act once it does
+			self._rotation = rotation
+			return
 		self._instance.setRotation(rotation)
 
 		(x, y) = (self.x, self.y)
@@ -184,3 +234,55 @@ class MapPreviewTile(object):
 		self.id = id
 		self.classes = ()
 		self.settlement = None
+
+
+class GroundInstanceLoader(object):
+	"""Creates the fife instances of deferred ground tiles (see SurfaceTile.create_deferred)
+	when the camera gets close to them.
+
+	The tiles are grouped in chunks of CHUNK_SIZE x CHUNK_SIZE coordinates. Whenever the view
+	changes, the instances of all chunks in and around the displayed area are created, so
+	they exist before they are scrolled into the screen. Instances are never removed again.
+	"""
+
+	CHUNK_SIZE = 16
+
+	def __init__(self, view):
+		self.view = view
+		self._chunks = {} # {(chunk_x, chunk_y): [tile, ...]} of the tiles without instance
+
+	def add_tiles(self, tiles):
+		"""Adds deferred tiles, other tiles are ignored."""
+		chunk_size = self.CHUNK_SIZE
+		for tile in tiles:
+			if tile._fife_instance is None and tile._rotation is not None:
+				self._chunks.setdefault((tile.x // chunk_size, tile.y // chunk_size), []).append(tile)
+
+	def start(self):
+		"""Creates the instances around the camera now and whenever the view changes."""
+		self.view.add_change_listener(self.update, call_listener_now=True)
+		ZoomChanged.subscribe(self._on_zoom_changed)
+
+	def end(self):
+		self.view.discard_change_listener(self.update)
+		ZoomChanged.discard(self._on_zoom_changed)
+		self._chunks = None
+
+	def _on_zoom_changed(self, message):
+		self.update()
+
+	def update(self):
+		"""Creates the instances of the tiles in and around the displayed area."""
+		if not self._chunks:
+			return
+		area = self.view.get_displayed_area()
+		# the displayed area ignores rotation and tilt of the camera, this covers both
+		margin = max(area.width, area.height)
+		chunk_size = self.CHUNK_SIZE
+		for chunk_x in xrange(int(area.left - margin) // chunk_size, int(area.right + margin) // chunk_size + 1):
+			for chunk_y in xrange(int(area.top - margin) // chunk_size, int(area.bottom + margin) // chunk_size + 1):
+				tiles = self._chunks.pop((chunk_x, chunk_y), None)
+				if tiles is not None:
+					for tile in tiles:
+						tile.create_instance()
+
@@ -20,13 +20,16 @@
 # ###################################################
 
 import logging
+import random
 
 from collections import defaultdict
 
+import horizons.globals
+
 from horizons.entities import Entities
 from horizons.scheduler import Scheduler
 
-from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.buildingindexer import ArrayBuildingIndexer
 from horizons.util.pathfinding.pathnodes import IslandPathNodes
 from horizons.util.shapes import Circle, Rect
 from horizons.util.worldobject import WorldObject
@@ -38,7 +41,6 @@ from horizons.scenario import CONDITIONS
 from horizons.world.buildingowner import BuildingOwner
 from horizons.world.buildability.freeislandcache import FreeIslandBuildabilityCache
 from horizons.world.buildability.terraincache import TerrainBuildabilityCache, TerrainRequirement
-from horizons.gui.widgets.minimap import Minimap
 from horizons.world.ground import MapPreviewTile
 
 class Island(BuildingOwner, WorldObject):
@@ -91,7 +93,7 @@ class Island(BuildingOwner, WorldObject):
 			# Create building indexers.
 			from horizons.world.units.animal import WildAnimal
 			self.building_indexers = {}
-			self.building_indexers[BUILDINGS.TREE] = BuildingIndexer(WildAnimal.walking_range, self, self.session.random)
+			self.building_indexers[BUILDINGS.TREE] = ArrayBuildingIndexer(WildAnimal.walking_range, self, self.session.random)
 
 		# Load settlements.
 		for (settlement_id,) in db("SELECT rowid FROM settlement WHERE island = ?", island_id):
@@ -130,15 +132,25 @@ class Island(BuildingOwner, WorldObject):
 		p_x, p_y, width, height = db("SELECT MIN(x), MIN(y), (1 + MAX(x) - MIN(x)), (1 + MAX(y) - MIN(y)) FROM ground WHERE island_id = ?", island_id - 1001)[0]
 
 		self.ground_map = {}
-		for (x, y, ground_id, action_id, rotation) in db("SELECT x, y, ground_id, action_id, rotation FROM ground WHERE island_id = ?", island_id - 1001): # Load grounds
-			if not preview: # actual game, need actual tiles
-				ground = Entities.grounds[str('%d-%s' % (ground_id, action_id))](self.session, x, y)
-				ground.act(rotation)
-			else:
-				ground = MapPreviewTile(x, y, ground_id)
-			# These are important for pathfinding and building to check if the ground tile
-			# is blocked in any way.
-			self.ground_map[(ground.x, ground.y)] = ground
+		rows = db("SELECT x, y, ground_id, action_id, rotation FROM ground WHERE island_id = ?", island_id - 1001)
+		if not preview: # actual game, need actual tiles
+			# the fife instances are created later, see GroundInstanceLoader
+			# the tiles themselves stay objects, settlements share them and the game logic changes them
+			get_tile_sets = horizons.globals.db.get_tile_sets
+			ground_classes = {} # {(ground_id, action_id): (ground class, tile sets)}
+			for (x, y, ground_id, action_id, rotation) in rows:
+				try:
+					ground_class, tile_sets = ground_classes[(ground_id, action_id)]
+				except KeyError:
+					ground_class = Entities.grounds[str('%d-%s' % (ground_id, action_id))]
+					tile_sets = get_tile_sets(ground_id) or (None, )
+					ground_classes[(ground_id, action_id)] = (ground_class, tile_sets)
+				# These are important for pathfinding and building to check if the ground tile
+				# is blocked in any way.
+				self.ground_map[(x, y)] = ground_class.create_deferred(self.session, x, y, random.choice(tile_sets), rotation)
+		else:
+			for (x, y, ground_id, action_id, rotation) in rows:
+				self.ground_map[(x, y)] = MapPreviewTile(x, y, ground_id)
 
 		self._init_cache()
 
@@ -152,11 +164,7 @@ class Island(BuildingOwner, WorldObject):
 		self.num_trees = 0
 
 		# define the rectangle with the smallest area that contains every island tile its position
-		min_x = min(zip(*self.ground_map.keys())[0])
-		max_x = max(zip(*self.ground_map.keys())[0])
-		min_y = min(zip(*self.ground_map.keys())[1])
-		max_y = max(zip(*self.ground_map.keys())[1])
-		self.position = Rect.init_from_borders(min_x, min_y, max_x, max_y)
+		self.position = Rect.init_from_topleft_and_size(p_x, p_y, width, height)
 
 		if not preview:
 			# This isn't needed for map previews, but it is in actual games.
@@ -267,6 +275,8 @@ class Island(BuildingOwner, WorldObject):
 			building.settlement = settlement
 			building.owner = settlement.owner
 			settlement.add_building(building)
+			# collectors of the new owner may pick up here now
+			self.provider_buildings.provider_changed(building)
 
 		if not settlement_coords_changed:
 			return
@@ -275,7 +285,6 @@ class Island(BuildingOwner, WorldObject):
 		settlement_tiles_changed = []
 		for coords in settlement_coords_changed:
 			settlement_tiles_changed.append(self.ground_map[coords])
-			Minimap.update(coords)
 			if coords in flat_land_set:
 				self.available_flat_land -= 1
 		self.available_land_cache.remove_area(settlement_coords_changed)
@@ -316,7 +325,6 @@ class Island(BuildingOwner, WorldObject):
 				clean_coords.add(coords)
 			settlement_tiles_changed.append(self.ground_map[coords])
 			del settlement.ground_map[coords]
-			Minimap.update(coords)
 			if coords in flat_land_set:
 				self.available_flat_land += 1
 		self.available_land_cache.add_area(clean_coords)
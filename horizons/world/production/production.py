@@ -406,8 +406,9 @@ class Production(ChangeListener):
 
 	def _give_produced_res(self):
 		"""Put produces goods to the inventory"""
-		for res, amount in self._prod_line.produced_res.iteritems():
-			self.inventory.alter(res, amount)
+		with self.inventory.batch_changes():
+			for res, amount in self._prod_line.produced_res.iteritems():
+				self.inventory.alter(res, amount)
 
 	def _check_available_res(self):
 		"""Checks if all required resources are there.
@@ -420,9 +421,11 @@ class Production(ChangeListener):
 
 	def _remove_res_to_expend(self):
 		"""Removes the resources from the inventory, that production takes."""
-		for res, amount in self._prod_line.consumed_res.iteritems():
-			remnant = self.inventory.alter(res, amount)
-			assert remnant == 0
+		# listeners must not see (and react to) a partially consumed state
+		with self.inventory.batch_changes():
+			for res, amount in self._prod_line.consumed_res.iteritems():
+				remnant = self.inventory.alter(res, amount)
+				assert remnant == 0
 
 	def _check_for_space_for_produced_res(self):
 		"""Checks if there is enough space in the inventory for the res, we want to produce.
@@ -27,23 +27,55 @@ class ProviderHandler(list):
 	It acts as a data structure for quick retrieval of special properties, that only resource
 	providers have.
 
+	It also serves as job board for the collectors of the area: for every resource, a generation
+	is increased whenever a job for that resource might have become possible, i.e. when a
+	provider of it is added, gets more of it or a collector cancels its reservation of it.
+	As long as the generation doesn't change, no new pickup of the resource is possible.
+	Collectors that found nothing to do can wait for that instead of searching regularly.
+
 	Precondition: Provider never change their provided resources."""
 
 	def __init__(self):
 		super(ProviderHandler, self).__init__()
 		self.provider_by_resources = defaultdict(list)
+		self.availability_generation = defaultdict(int) # { res: generation }
+		# { res: [collector, ..] }: collectors waiting for res, in the order they started to
+		# wait. Sets would wake them up in a different order on each client.
+		self._waiting_collectors = defaultdict(list)
 
 	def append(self, provider):
 		# NOTE: appended elements need to be removed, else there will be a memory leak
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].append(provider)
 		super(ProviderHandler, self).append(provider)
+		self.resources_available(provider.provided_resources)
 
 	def remove(self, provider):
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].remove(provider)
 		super(ProviderHandler, self).remove(provider)
 
+	def resources_available(self, resources):
+		"""Notifies the collectors that the resources might be available for pickup now."""
+		for res in resources:
+			self.availability_generation[res] += 1
+			waiting = self._waiting_collectors.pop(res, None)
+			if waiting:
+				for collector in waiting:
+					collector.wake_up()
 
+	def add_waiting_collector(self, collector, resources):
+		"""Calls collector.wake_up() as soon as one of the resources might be available.
+		The collector has to call remove_waiting_collector when it doesn't wait anymore."""
+		for res in resources:
+			self._waiting_collectors[res].append(collector)
 
+	def remove_waiting_collector(self, collector, resources):
+		for res in resources:
+			waiting = self._waiting_collectors.get(res)
+			if waiting and collector in waiting:
+				waiting.remove(collector)
 
+	def provider_changed(self, provider):
+		"""Notifies the collectors that the provider has changed, e.g. got a new owner."""
+		self.resources_available(getattr(provider, 'provided_resources', ()))
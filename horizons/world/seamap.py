@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+class SeaMap(dict):
+	"""The water tiles of the whole map, { (x, y): tile } for all coords in the map area.
+
+	This is world.fake_tile_map. The tiles are only created when they are accessed the first
+	time, which most of them never are. Until then, the mapping only consists of the bounds
+	of the map area. Iterating over keys doesn't create any tiles, iterating over values does.
+
+	The tiles are the same kind of objects as before, they only exist to have a settlement,
+	object etc. for every coordinate: each tile of a block of BLOCK_SIZE x BLOCK_SIZE coordinates
+	has the position of the block (the water is drawn by one instance for each block).
+	"""
+
+	BLOCK_SIZE = 10
+
+	def __init__(self, session, tile_class, min_x, min_y, max_x, max_y, block_origin):
+		"""
+		@param tile_class: class of the tiles, called with (session, x, y)
+		@param min_x, min_y, max_x, max_y: area of the map, max_x and max_y are exclusive
+		@param block_origin: (x, y) of the block at the top left corner
+		"""
+		super(SeaMap, self).__init__()
+		self.session = session
+		self.tile_class = tile_class
+		self.min_x = min_x
+		self.min_y = min_y
+		self.max_x = max_x
+		self.max_y = max_y
+		self.width = max_x - min_x
+		self.height = max_y - min_y
+		self._block_origin = block_origin
+
+	def __missing__(self, coords):
+		x, y = coords
+		if not (self.min_x <= x < self.max_x and self.min_y <= y < self.max_y):
+			raise KeyError(coords)
+		block_size = self.BLOCK_SIZE
+		block_x = x - (x - self._block_origin[0]) % block_size
+		block_y = y - (y - self._block_origin[1]) % block_size
+		tile = self.tile_class(self.session, block_x - 1, block_y + block_size - 1)
+		self[coords] = tile
+		return tile
+
+	def __contains__(self, coords):
+		x, y = coords
+		return self.min_x <= x < self.max_x and self.min_y <= y < self.max_y
+
+	has_key = __contains__
+
+	def get(self, coords, default=None):
+		try:
+			return self[coords]
+		except KeyError:
+			return default
+
+	def __len__(self):
+		return self.width * self.height
+
+	def get_index(self, coords):
+		"""@return: position of coords in the dense grid of the map area"""
+		return (coords[1] - self.min_y) * self.width + (coords[0] - self.min_x)
+
+	def __iter__(self):
+		xrange_x = xrange(self.min_x, self.max_x)
+		for y in xrange(self.min_y, self.max_y):
+			for x in xrange_x:
+				yield (x, y)
+
+	iterkeys = __iter__
+
+	def keys(self):
+		return list(self)
+
+	def itervalues(self):
+		for coords in self:
+			yield self[coords]
+
+	def values(self):
+		return list(self.itervalues())
+
+	def iteritems(self):
+		for coords in self:
+			yield (coords, self[coords])
+
+	def items(self):
+		return list(self.iteritems())
+
+
+class OpenSeaMap(object):
+	"""The part of a SeaMap that isn't covered by islands: world.ground_map.
+
+	A dict-like view with a flag for each coordinate of the map area, the tiles are those of
+	the SeaMap.
+	"""
+
+	def __init__(self, sea_map):
+		self.sea_map = sea_map
+		self._open = bytearray('\x01') * len(sea_map)
+		self._len = len(sea_map)
+
+	def __contains__(self, coords):
+		return coords in self.sea_map and self._open[self.sea_map.get_index(coords)] == 1
+
+	has_key = __contains__
+
+	def __getitem__(self, coords):
+		if coords not in self:
+			raise KeyError(coords)
+		return self.sea_map[coords]
+
+	def get(self, coords, default=None):
+		if coords not in self:
+			return default
+		return self.sea_map[coords]
+
+	def __delitem__(self, coords):
+		if coords not in self:
+			raise KeyError(coords)
+		self._open[self.sea_map.get_index(coords)] = 0
+		self._len -= 1
+
+	def __len__(self):
+		return self._len
+
+	def __iter__(self):
+		is_open = self._open
+		for index, coords in enumerate(self.sea_map):
+			if is_open[index]:
+				yield coords
+
+	iterkeys = __iter__
+
+	def keys(self):
+		return list(self)
+
+	def itervalues(self):
+		for coords in self:
+			yield self.sea_map[coords]
+
+	def values(self):
+		return list(self.itervalues())
+
+	def iteritems(self):
+		for coords in self:
+			yield (coords, self.sea_map[coords])
+
+	def items(self):
+		return list(self.iteritems())
+
+
+class FullMap(dict):
+	"""The ground of every coordinate of the map: world.full_map.
+
+	The dict contains the tiles that differ from the sea (i.e. the island tiles) and the
+	sea tiles that have been accessed, the rest is looked up in the SeaMap.
+	"""
+
+	def __init__(self, sea_map):
+		super(FullMap, self).__init__()
+		self.sea_map = sea_map
+
+	def __missing__(self, coords):
+		tile = self.sea_map[coords]
+		self[coords] = tile
+		return tile
+
+	def __contains__(self, coords):
+		return dict.__contains__(self, coords) or coords in self.sea_map
+
+	has_key = __contains__
+
+	def get(self, coords, default=None):
+		try:
+			return self[coords]
+		except KeyError:
+			return default
+
+	def __len__(self):
+		return len(self.sea_map) + sum(1 for coords in dict.__iter__(self) if coords not in self.sea_map)
+
+	def __iter__(self):
+		for coords in self.sea_map:
+			yield coords
+		for coords in dict.__iter__(self):
+			if coords not in self.sea_map:
+				yield coords
+
+	iterkeys = __iter__
+
+	def keys(self):
+		return list(self)
+
+	def itervalues(self):
+		for coords in self:
+			yield self[coords]
+
+	def values(self):
+		return list(self.itervalues())
+
+	def iteritems(self):
+		for coords in self:
+			yield (coords, self[coords])
+
+	def items(self):
+		return list(self.iteritems())
@@ -40,20 +40,148 @@ Combinations:
 """
 
 import sys
-import copy
+from array import array
 from collections import defaultdict
+from contextlib import contextmanager
+from itertools import izip
 
 from horizons.util.changelistener import ChangeListener
 
+
+_SLOT = b'\x01' # flag of the resources with slot in ResourceSlots._slots
+
+
+class ResourceSlots(object):
+	"""Mapping of resource ids to amounts, stored in arrays that are indexed by resource id.
+
+	It behaves like the defaultdict(int) that used to be the storage of inventories: reading
+	a resource that has no slot creates one with amount 0. The amounts are kept in an array,
+	another one flags the resources that have a slot. Resources without slot have amount 0,
+	so sums and lookups work on the amounts alone. Both grow as soon as a resource with a
+	higher id is stored. Iteration is ordered by resource id.
+
+	Resource ids are small and inventories are everywhere (every tree has one), so this is
+	a lot smaller than a dict.
+	"""
+	__slots__ = ('_amounts', '_slots')
+
+	def __init__(self, items=()):
+		self._amounts = array('l')
+		self._slots = bytearray()
+		if isinstance(items, (dict, ResourceSlots)):
+			items = items.iteritems()
+		for res, amount in items:
+			self[res] = amount
+
+	def __getitem__(self, res):
+		if res not in self:
+			# like defaultdict(int)
+			self[res] = 0
+		return self._amounts[res]
+
+	def get(self, res, default=None):
+		return self._amounts[res] if res in self else default
+
+	def __setitem__(self, res, amount):
+		if res >= len(self._amounts):
+			assert res >= 0, 'invalid resource id %s' % res
+			missing = res + 1 - len(self._amounts)
+			# extend in place, GenericStorage keeps references to the arrays
+			self._amounts.extend([0] * missing)
+			self._slots.extend(bytearray(missing))
+		self._amounts[res] = amount
+		self._slots[res] = 1
+
+	def add(self, res, amount):
+		"""Same as self[res] += amount"""
+		self[res] = self.get(res, 0) + amount
+
+	def __delitem__(self, res):
+		if res not in self:
+			raise KeyError(res)
+		self._amounts[res] = 0
+		self._slots[res] = 0
+
+	def __contains__(self, res):
+		try:
+			return self._slots[res] == 1
+		except IndexError:
+			return False
+
+	def __len__(self):
+		return self._slots.count(_SLOT)
+
+	def iteritems(self):
+		return ((res, amount) for res, (amount, slot) in enumerate(izip(self._amounts, self._slots)) if slot)
+
+	def iterkeys(self):
+		return (res for res, slot in enumerate(self._slots) if slot)
+
+	__iter__ = iterkeys
+
+	def itervalues(self):
+		return (amount for amount, slot in izip(self._amounts, self._slots) if slot)
+
+	def items(self):
+		return list(self.iteritems())
+
+	def keys(self):
+		return list(self.iterkeys())
+
+	def values(self):
+		return list(self.itervalues())
+
+	def copy(self):
+		other = ResourceSlots()
+		other._amounts = self._amounts[:]
+		other._slots = self._slots[:]
+		return other
+
+	def __deepcopy__(self, memo):
+		return self.copy()
+
+	def __reduce__(self):
+		return (ResourceSlots, (self.items(), ))
+
+	def __eq__(self, other):
+		if isinstance(other, ResourceSlots):
+			other = other.items()
+		elif isinstance(other, dict):
+			other = sorted(other.iteritems())
+		else:
+			return NotImplemented
+		return self.items() == other
+
+	def __ne__(self, other):
+		equal = self.__eq__(other)
+		return equal if equal is NotImplemented else not equal
+
+	__hash__ = None
+
+	def __repr__(self):
+		return 'ResourceSlots(%s)' % dict(self.iteritems())
+
+
 class GenericStorage(ChangeListener):
 	"""The GenericStorage represents a storage for buildings/units/players/etc. for storing
 	resources. The GenericStorage is the general form and is mostly used as baseclass to
 	derive storages with special function from it. Normally there should be no need to
 	use the GenericStorage. Rather use a specialized version that is suitable for the job.
+
+	Storages use __slots__, since there are a lot of them.
 	"""
+	__slots__ = ('_storage', '_amounts', '_slots', '_batch_depth', '_batch_changed', '_increased')
+
 	def __init__(self):
 		super(GenericStorage, self).__init__()
-		self._storage = defaultdict(int)
+		self._storage = ResourceSlots()
+		# arrays of self._storage, alter() and lookups use them directly to save method calls
+		self._amounts = self._storage._amounts
+		self._slots = self._storage._slots
+		self._batch_depth = 0
+		self._batch_changed = False
+		# bit mask of the resources that were increased since the listeners were called
+		self._increased = 0
 
 	def save(self, db, ownerid):
 		for slot in self._storage.iteritems():
@@ -61,8 +189,38 @@ class GenericStorage(ChangeListener):
 				ownerid, slot[0], slot[1])
 
 	def load(self, db, ownerid):
-		for (res, amount) in db.get_storage_rowids_by_ownerid(ownerid):
-			self.alter(res, amount)
+		with self.batch_changes():
+			for (res, amount) in db.get_storage_rowids_by_ownerid(ownerid):
+				self.alter(res, amount)
+
+	@contextmanager
+	def batch_changes(self):
+		"""Defers the change notification of all changes in the with block, the listeners
+		are called once at the end if something has changed. Can be nested.
+		Use it for changes that belong together, where listeners shouldn't see the
+		state in between."""
+		self._batch_depth += 1
+		try:
+			yield
+		finally:
+			self._batch_depth -= 1
+			if self._batch_depth == 0 and self._batch_changed:
+				self._batch_changed = False
+				self._changed()
+
+	def _changed(self):
+		if self._batch_depth:
+			self._batch_changed = True
+		else:
+			super(GenericStorage, self)._changed()
+			self._increased = 0
+
+	def get_increased_resources(self):
+		"""Returns the resources whose amounts have been increased since the change listeners
+		were called the last time. Meant to be called by change listeners.
+		@return: list of res ids"""
+		increased = self._increased
+		return [res for res in xrange(increased.bit_length()) if increased >> res & 1]
 
 	def alter(self, res, amount):
 		"""alter() will return the amount of resources that did not fit into the storage or
@@ -73,8 +231,23 @@ class GenericStorage(ChangeListener):
 		@param amount: int amount that is to be changed. Can be negative to remove resources.
 		@return: int - amount that did not fit or was not available, depending on context.
 		"""
-		self._storage[res] += amount # defaultdict
-		self._changed()
+		# inline of self._storage.add(res, amount)
+		try:
+			self._amounts[res] += amount
+		except IndexError:
+			self._storage[res] = amount # grows the arrays
+		else:
+			self._slots[res] = 1
+		if self._batch_depth: # inline of self._changed()
+			self._batch_changed = True
+			if amount > 0:
+				self._increased |= 1 << res
+		elif amount > 0:
+			self._increased = 1 << res
+			ChangeListener._changed(self)
+			self._increased = 0
+		else:
+			ChangeListener._changed(self)
 		return 0
 
 	def reset(self, res):
@@ -103,14 +276,23 @@ class GenericStorage(ChangeListener):
 		return self.get_limit(res) - self[res]
 
 	def get_sum_of_stored_resources(self):
-		return sum(self._storage.itervalues())
+		return sum(self._amounts)
 
 	def get_dump(self):
 		"""Returns a dump of the inventory as dict"""
-		return copy.deepcopy(self._storage)
+		return defaultdict(int, self._storage.iteritems())
 
 	def __getitem__(self, res):
-		return self._storage.get(res, 0)
+		try:
+			return self._amounts[res]
+		except IndexError:
+			return 0
+
+	def has_resource_slot(self, res):
+		try:
+			return self._slots[res] == 1
+		except IndexError:
+			return False
 
 	def iterslots(self):
 		return self._storage.iterkeys()
@@ -124,6 +306,8 @@ class GenericStorage(ChangeListener):
 class SpecializedStorage(GenericStorage):
 	"""Storage where only certain resources can be stored. If you want to store a resource here,
 	you have to call add_resource_slot() before calling alter()."""
+	__slots__ = ()
+
 	def alter(self, res, amount):
 		if self.has_resource_slot(res): # res can be stored, propagate call
 			return super(SpecializedStorage, self).alter(res, amount)
@@ -135,13 +319,12 @@ class SpecializedStorage(GenericStorage):
 		super(SpecializedStorage, self).alter(res, 0)
 		self._changed()
 
-	def has_resource_slot(self, res):
-		return (res in self._storage)
-
 class SizedSpecializedStorage(SpecializedStorage):
 	"""Just like SpecializedStorage, but each res has an own limit.
 	Can take a dict {res: size, res2: size2, ...} to init slots
 	"""
+	__slots__ = ('__slot_limits', )
+
 	def __init__(self, slot_sizes=None):
 		super(SizedSpecializedStorage, self).__init__()
 		slot_sizes = slot_sizes or {}
@@ -150,10 +333,7 @@ class SizedSpecializedStorage(SpecializedStorage):
 			self.add_resource_slot(res, size)
 
 	def alter(self, res, amount):
-		if not self.has_resource_slot(res):
-			# TODO: this is also checked in the super class, refactor one of them away
-			return amount
-
+		# resources without slot have no free space and are rejected by the super class
 		if amount > 0: # can only reach limit if > 0
 			storeable_amount = self.get_free_space_for(res)
 			if amount > storeable_amount: # tried to store more than limit allows
@@ -185,6 +365,8 @@ class GlobalLimitStorage(GenericStorage):
 	"""Storage with some kind of global limit. This limit has to be
 	interpreted in the subclass, it has no predefined meaning here.
 	This class is used for infrastructure, such as save/load for the limit."""
+	__slots__ = ('limit', )
+
 	def __init__(self, limit):
 		super(GlobalLimitStorage, self).__init__()
 		self.limit = limit
@@ -222,11 +404,13 @@ class TotalStorage(GlobalLimitStorage):
 
 	NOTE: Negative values will increase storage size, so consider using PositiveTotalStorage.
 	"""
+	__slots__ = ()
+
 	def __init__(self, limit):
 		super(TotalStorage, self).__init__(limit)
 
 	def alter(self, res, amount):
-		check = max(0, amount + self.get_sum_of_stored_resources() - self.limit)
+		check = max(0, amount + sum(self._amounts) - self.limit) # inline of get_sum_of_stored_resources()
 		return check + super(TotalStorage, self).alter(res, amount - check)
 
 	def get_free_space_for(self, res):
@@ -234,6 +418,8 @@ class TotalStorage(GlobalLimitStorage):
 
 class PositiveStorage(GenericStorage):
 	"""The positive storage doesn't allow to have negative values for resources."""
+	__slots__ = ()
+
 	def alter(self, res, amount):
 		subtractable_amount = amount
 		if amount < 0 and ( amount + self[res] < 0 ): # tried to subtract more than we have
@@ -244,16 +430,20 @@ class PositiveStorage(GenericStorage):
 class PositiveTotalStorage(PositiveStorage, TotalStorage):
 	"""A combination of the Total and Positive storage. Used to set a limit and ensure
 	there are no negative amounts in the storage."""
+	__slots__ = ()
+
 	def alter(self, res, amount):
 		ret = super(PositiveTotalStorage, self).alter(res, amount)
-		if self[res] == 0:
+		if self._amounts[res] == 0: # GenericStorage.alter() always leaves a slot for res
 			# remove empty slots, cause else they will get displayed in the ship inventory
-			del self._storage[res]
+			self._slots[res] = 0
 		return ret
 
 class PositiveTotalNumSlotsStorage(PositiveStorage, TotalStorage):
 	"""A combination of the Total and Positive storage which only has a limited number of slots.
 	Used to set a limit and ensure there are no negative amounts in the storage."""
+	__slots__ = ('slotnum', )
+
 	def __init__(self, limit, slotnum):
 		super(PositiveTotalNumSlotsStorage, self).__init__(limit)
 		self.slotnum = slotnum
@@ -261,16 +451,16 @@ class PositiveTotalNumSlotsStorage(PositiveStorage, TotalStorage):
 	def alter(self, res, amount):
 		if amount == 0:
 			return 0
-		if not res in self._storage and len(self._storage) >= self.slotnum:
+		if self._slots.count(_SLOT) >= self.slotnum and not self.has_resource_slot(res):
 			return amount
 		ret = super(PositiveTotalNumSlotsStorage, self).alter(res, amount)
-		if self[res] == 0:
+		if self._amounts[res] == 0: # GenericStorage.alter() always leaves a slot for res
 			# remove empty slots, cause else they will get displayed in the ship inventory
-			del self._storage[res]
+			self._slots[res] = 0
 		return ret
 
 	def get_free_space_for(self, res):
-		if not res in self._storage and len(self._storage) >= self.slotnum:
+		if self._slots.count(_SLOT) >= self.slotnum and not self.has_resource_slot(res):
 			return 0
 		else:
 			return super(PositiveTotalNumSlotsStorage, self).get_free_space_for(res)
@@ -279,23 +469,27 @@ class PositiveSizedSlotStorage(GlobalLimitStorage, PositiveStorage):
 	"""A storage consisting of a slot for each resource, all slots have the same size 'limit'
 	Used by the warehouse for example. So with a limit of 30 you could have a max of
 	30 from each resource."""
+	__slots__ = ()
+
 	def __init__(self, limit=0):
 		super(PositiveSizedSlotStorage, self).__init__(limit)
 
 	def alter(self, res, amount):
 		check = max(0, amount + self[res] - self.limit)
 		ret = super(PositiveSizedSlotStorage, self).alter(res, amount - check)
-		if res in self._storage and self[res] == 0:
-			del self._storage[res]
+		if self._amounts[res] == 0: # GenericStorage.alter() always leaves a slot for res
+			self._slots[res] = 0
 		return check + ret
 
 class PositiveSizedSpecializedStorage(PositiveStorage, SizedSpecializedStorage):
-	pass
+	__slots__ = ()
 
 class PositiveSizedNumSlotStorage(PositiveSizedSlotStorage):
 	"""A storage consisting of a number of slots, all slots have the same size 'limit'.
 	Used by ships for example. With a limit of 50 and a slot num of 4, you
 	could have a max of 50 from each resource and only slotnum resources."""
+	__slots__ = ('slotnum', )
+
 	def __init__(self, limit, slotnum):
 		super(PositiveSizedNumSlotStorage, self).__init__(limit)
 		self.slotnum = slotnum
@@ -303,13 +497,13 @@ class PositiveSizedNumSlotStorage(PositiveSizedSlotStorage):
 	def alter(self, res, amount):
 		if amount == 0:
 			return 0
-		if not res in self._storage and len(self._storage) >= self.slotnum:
+		if self._slots.count(_SLOT) >= self.slotnum and not self.has_resource_slot(res):
 			return amount
 		result = super(PositiveSizedNumSlotStorage, self).alter(res, amount)
 		return result
 
 	def get_free_space_for(self, res):
-		if not res in self._storage and len(self._storage) >= self.slotnum:
+		if self._slots.count(_SLOT) >= self.slotnum and not self.has_resource_slot(res):
 			return 0
 		else:
 			return super(PositiveSizedNumSlotStorage, self).get_free_space_for(res)
@@ -283,6 +283,10 @@ class FarmAnimal(CollectorAnimal, BuildingCollector):
 		# we are only allowed to pick up at our pasture
 		return [self.home_building]
 
+	def get_job_board(self):
+		# the pasture is the only target, it is not worth tracking
+		return None
+
 	def _get_random_positions_on_object(self, obj):
 		"""Returns a shuffled list of tuples, that are in obj, but not in self.position"""
 		coords = obj.position.get_coordinates()
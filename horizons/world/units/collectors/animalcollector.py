@@ -108,6 +108,10 @@ class AnimalCollector(BuildingCollector):
 	def get_animals_in_range(self, reslist=None):
 		return self.home_building.animals
 
+	def get_job_board(self):
+		# animals are not on any job board
+		return None
+
 	@decorators.make_constants()
 	def check_possible_job_target_for(self, target, res):
 		# An animal can only be collected by one collector.
@@ -62,18 +62,25 @@ class BuildingCollector(Collector):
 		# save whether it's possible for this instance to access a target
 		# @chachedmethod is not applicable since it stores hard refs in the arguments
 		self._target_possible_cache = weakref.WeakKeyDictionary()
+		# state of the job board and the home when the last search found no job target at all
+		self._no_job_state = None
+		# (tick, job board, resources, change listeners) while waiting for a change, see _wait_for_job
+		self._waiting_for_job = None
 
 	def save(self, db):
 		super(BuildingCollector, self).save(db)
 		self._clean_job_history_log()
 		current_tick = Scheduler().cur_tick
 
-		# save home_building and creation tick
-		# pre-translate the tick number for the loading process
+		# save home_building, creation tick and since when it waits for a job
+		# pre-translate the tick numbers for the loading process
 		translated_creation_tick = self._creation_tick - current_tick + 1
-		db("INSERT INTO building_collector(rowid, home_building, creation_tick) VALUES(?, ?, ?)",
+		translated_waiting_since = None
+		if self._waiting_for_job is not None:
+			translated_waiting_since = self._waiting_for_job[0] - current_tick + Scheduler.FIRST_TICK_ID - 1
+		db("INSERT INTO building_collector(rowid, home_building, creation_tick, waiting_since) VALUES(?, ?, ?, ?)",
 			self.worldid, self.home_building.worldid if self.home_building is not None else None,
-			translated_creation_tick)
+			translated_creation_tick, translated_waiting_since)
 
 		# save job history
 		for tick, utilization in self._job_history:
@@ -87,11 +94,15 @@ class BuildingCollector(Collector):
 		# which is overwritten here, that uses a member, which has to be initialized via __init.
 
 		# load home_building
-		home_building_id, self._creation_tick = db.get_building_collectors_data(worldid)
+		home_building_id, self._creation_tick, waiting_since = db.get_building_collectors_data(worldid)
 		self.__init(None if home_building_id is None else WorldObject.get_object_by_id(home_building_id))
 
 		super(BuildingCollector, self).load(db, worldid)
 
+		if waiting_since is not None:
+			# continue to wait when everything is loaded, the search is already scheduled
+			Scheduler().add_new_object(Callback(self._resume_waiting_for_job, waiting_since), self, run_in=0)
+
 		if home_building_id is None:
 			self.show() # make sure that homebuildingsless units are visible on startup
 			# TODO: fix "homebuildingless buildingcollectors".
@@ -124,6 +135,7 @@ class BuildingCollector(Collector):
 			self.show()
 
 	def remove(self):
+		self._stop_waiting_for_job()
 		self.register_at_home_building(unregister=True)
 		self.home_building = None
 		super(BuildingCollector, self).remove()
@@ -131,6 +143,7 @@ class BuildingCollector(Collector):
 	def decouple_from_home_building(self):
 		"""Makes collector survive deletion of home building."""
 		self.cancel(continue_action=lambda : 42) # don't continue
+		self._stop_waiting_for_job()
 		self.stop()
 		self.register_at_home_building(unregister=True)
 		self.home_building = None
@@ -154,6 +167,21 @@ class BuildingCollector(Collector):
 		if not collectable_res:
 			return None
 
+		job_board = self.get_job_board()
+		if job_board is not None:
+			state = self._get_job_search_state(job_board, collectable_res)
+			if state == self._no_job_state:
+				# nothing changed since the last search, so it would find nothing again
+				return None
+			self._no_job_state = None
+
+		jobs = self._find_jobs(collectable_res)
+		if not jobs and job_board is not None:
+			self._no_job_state = state
+		return self.get_best_possible_job(jobs)
+
+	def _find_jobs(self, collectable_res):
+		"""Returns a JobList of all possible jobs for the resources."""
 		jobs = JobList(self, self.job_ordering)
 		# iterate all building that provide one of the resources
 		for building in self.get_buildings_in_range(reslist=collectable_res):
@@ -175,20 +203,94 @@ class BuildingCollector(Collector):
 		# TODO: find out why WildAnimal.get_job(..) doesn't have this problem
 		# for MP-Games the jobs must have the same ordering to ensure get_best_possible_job(..) returns the same result
 		jobs.sort(key=lambda job: job.object.worldid)
-
-		return self.get_best_possible_job(jobs)
+		return jobs
+
+	def get_job_board(self):
+		"""Returns the ProviderHandler that contains all possible job targets (see
+		get_buildings_in_range) or None if the targets don't come from one.
+		Job searches are skipped as long as the board reports no new resources."""
+		return self.home_building.island.provider_buildings
+
+	def _get_job_search_state(self, job_board, collectable_res):
+		"""Returns everything a search for jobs without any target depends on.
+		If a search found no target and the state is still the same, no target can be found.
+		The state consists of the generations of the resources on the job board and the space
+		for the resources at home (minus the reservations of colleagues) and in the collector."""
+		generation = job_board.availability_generation
+		home_inventory = self.get_home_inventory()
+		own_inventory = self.get_component(StorageComponent).inventory
+		colleague_jobs = [coll.job for coll in self.get_colleague_collectors() if coll.job is not None]
+		state = []
+		for res in collectable_res:
+			registered_amount = sum(entry.amount for job in colleague_jobs
+			                        for entry in job.reslist if entry.res == res)
+			state.append((res, generation[res],
+			              home_inventory.get_limit(res) - registered_amount - home_inventory[res],
+			              own_inventory.get_free_space_for(res)))
+		return state
 
 	def search_job(self):
+		self._stop_waiting_for_job()
 		self._clean_job_history_log()
 		super(BuildingCollector, self).search_job()
 
 
 	def handle_no_possible_job(self):
-		super(BuildingCollector, self).handle_no_possible_job()
+		if self._no_job_state is not None and self.home_building is not None:
+			self._wait_for_job()
+		else:
+			super(BuildingCollector, self).handle_no_possible_job()
 		# only append a new element if it is different from the last one
 		if not self._job_history or abs(self._job_history[-1][1]) > 1e-9:
 			self._job_history.append((Scheduler().cur_tick, 0))
 
+	def _wait_for_job(self):
+		"""Waits until something changes that could result in a job instead of searching
+		regularly: new resources on the job board, or changes of the inventories and the
+		home building (e.g. its productions). Changes that aren't reported are still noticed
+		by a search after COLLECTORS.NO_JOB_WAIT_TICKS."""
+		self.log.debug("%s: found no possible job, waiting for changes", self)
+		self._start_waiting_for_job(Scheduler().cur_tick)
+		Scheduler().add_new_object(self.search_job, self, COLLECTORS.NO_JOB_WAIT_TICKS)
+
+	def _start_waiting_for_job(self, since):
+		resources = [entry[0] for entry in self._no_job_state]
+		job_board = self.get_job_board()
+		job_board.add_waiting_collector(self, resources)
+		listeners = (self.home_building, self.get_home_inventory(),
+		             self.get_component(StorageComponent).inventory)
+		for listener in listeners:
+			listener.add_change_listener(self.wake_up)
+		self._waiting_for_job = (since, job_board, resources, listeners)
+
+	def _resume_waiting_for_job(self, since):
+		"""Continues _wait_for_job after loading. The state that the search found no job
+		in isn't saved, it is the current one since any change would have woken us up."""
+		if self.state != self.states.idle or self.home_building is None:
+			return
+		job_board = self.get_job_board()
+		self._no_job_state = self._get_job_search_state(job_board, self.get_collectable_res())
+		self._start_waiting_for_job(since)
+
+	def _stop_waiting_for_job(self):
+		if self._waiting_for_job is None:
+			return
+		job_board, resources, listeners = self._waiting_for_job[1:]
+		self._waiting_for_job = None
+		job_board.remove_waiting_collector(self, resources)
+		for listener in listeners:
+			listener.discard_change_listener(self.wake_up)
+
+	def wake_up(self):
+		"""Called by _wait_for_job's notifications. Searches for a job soon, but not earlier
+		than a collector that doesn't wait would."""
+		if self._waiting_for_job is None:
+			return
+		run_in = max(self._waiting_for_job[0] + COLLECTORS.DEFAULT_WAIT_TICKS - Scheduler().cur_tick, 1)
+		self._stop_waiting_for_job()
+		Scheduler().rem_call(self, self.search_job)
+		Scheduler().add_new_object(self.search_job, self, run_in)
+
 	def begin_current_job(self, job_location=None):
 		super(BuildingCollector, self).begin_current_job(job_location)
 		# Sum up the utilization for all res
@@ -365,6 +467,9 @@ class FisherShipCollector(BuildingCollector):
 		reach = RadiusRect(self.home_building.position, self.home_building.radius)
 		return self.session.world.get_providers_in_range(reach, reslist=reslist)
 
+	def get_job_board(self):
+		return self.session.world.provider_buildings
+
 
 class DisasterRecoveryCollector(StorageCollector):
 	"""Collects disasters such as fire or pestilence."""
@@ -377,6 +482,7 @@ class DisasterRecoveryCollector(StorageCollector):
 	def get_job(self):
 		if self.home_building is not None and \
 		   not self.session.world.disaster_manager.is_affected( self.home_building.settlement ):
+			self._no_job_state = None # outbreaks aren't reported, search regularly
 			return None # not one disaster active, bail out
 
 		return super(DisasterRecoveryCollector, self).get_job()
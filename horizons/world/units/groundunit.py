@@ -46,11 +46,15 @@ class GroundUnit(Unit):
 	def __init__(self, x, y, **kwargs):
 		super(GroundUnit, self).__init__(x=x, y=y, **kwargs)
 		self.session.world.ground_units.append(self)
+		self._spatial_index = self.session.world.ground_unit_index
+		self._spatial_index.add(self, self.position)
 		self.session.world.ground_unit_map[self.position.to_tuple()] = weakref.ref(self)
 
 	def remove(self):
 		super(GroundUnit, self).remove()
 		self.session.world.ground_units.remove(self)
+		self._spatial_index.remove(self)
+		self._spatial_index = None
 		self.session.view.discard_change_listener(self.draw_health)
 		del self.session.world.ground_unit_map[self.position.to_tuple()]
 
@@ -72,6 +76,8 @@ class GroundUnit(Unit):
 
 		# register unit in world
 		self.session.world.ground_units.append(self)
+		self._spatial_index = self.session.world.ground_unit_index
+		self._spatial_index.add(self, self.position)
 		self.session.world.ground_unit_map[self.position.to_tuple()] = weakref.ref(self)
 
 
@@ -46,6 +46,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 	*attributes:
 	- position, last_position: Point
 	- path: Pather
+	- _spatial_index: SpatialIndex the unit is registered in, kept up to date with position
 
 	*moving methods:
 	- move
@@ -71,6 +72,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 		self.position = Point(x, y)
 		self.last_position = Point(x, y)
 		self._next_target = Point(x, y)
+		self._spatial_index = None # set by subclasses that register the unit in a SpatialIndex
 
 		self.move_callbacks = WeakMethodList()
 		self.blocked_callbacks = WeakMethodList()
@@ -174,6 +176,8 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			#self.log.debug("%s move tick from %s to %s", self, self.last_position, self._next_target)
 			self.last_position = self.position
 			self.position = self._next_target
+			if self._spatial_index is not None:
+				self._spatial_index.move(self, self.position)
 			self._changed()
 
 		# try to get next step, handle a blocked path
@@ -37,27 +37,14 @@ except ImportError:
 	sys.exit(1)
 
 
-from horizons.ext.dummy import Dummy
-
 
 def mock_fife():
 	"""
 	Using a custom import hook, we catch all imports of fife and provide a
 	dummy module.
 	"""
-	class Importer(object):
-
-		def find_module(self, fullname, path=None):
-			if fullname.startswith('fife'):
-				return self
-
-			return None
-
-		def load_module(self, name):
-			mod = sys.modules.setdefault(name, Dummy())
-			return mod
-
-	sys.meta_path = [Importer()]
+	from horizons.headless import install_fife_dummy
+	install_fife_dummy()
 
 def setup_horizons():
 	"""
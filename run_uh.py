@@ -169,7 +169,7 @@ def main():
 	from horizons.util.cmdlineoptions import get_option_parser
 	options = get_option_parser().parse_args()[0]
 	setup_debugging(options)
-	init_environment(True)
+	init_environment(not options.headless)
 
 	# test if required libs can be found or display specific error message
 	try:
@@ -182,11 +182,16 @@ def main():
 		exit_with_error(headline, msg)
 
 	# Start UH.
-	import horizons.main
+	if options.headless:
+		import horizons.headless
+		start = horizons.headless.start
+	else:
+		import horizons.main
+		start = horizons.main.start
 	ret = True
 	if not options.profile:
 		# start normal
-		ret = horizons.main.start(options)
+		ret = start(options)
 	else:
 		# start with profiling
 		try:
@@ -206,7 +211,7 @@ def main():
 
 		outfilename = pattern % num
 		print('Starting in profile mode. Writing output to: %s' % outfilename)
-		profile.runctx('horizons.main.start(options)', globals(), locals(), outfilename)
+		profile.runctx('start(options)', globals(), locals(), outfilename)
 		print('Program ended. Profiling output: %s' % outfilename)
 
 	if logfile:
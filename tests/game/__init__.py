@@ -36,6 +36,7 @@ from horizons.spsession import SPSession
 from horizons.util.dbreader import DbReader
 from horizons.util.difficultysettings import DifficultySettings
 from horizons.util.savegameaccessor import SavegameAccessor
+from horizons.util.savegamewriter import SavegameWriter
 from horizons.util.startgameoptions import StartGameOptions
 from horizons.util.color import Color
 
@@ -80,17 +81,19 @@ def _dbreader_convert_dummy_objects():
 		return wrapper
 
 	original = DbReader.__call__
+	original_writer = SavegameWriter.__call__
 	DbReader.__call__ = deco(DbReader.__call__)
+	SavegameWriter.__call__ = deco(SavegameWriter.__call__)
 	yield
 	DbReader.__call__ = original
+	SavegameWriter.__call__ = original_writer
 
 
 class SPTestSession(SPSession):
 
-	@mock.patch('horizons.session.View', Dummy)
 	def __init__(self, rng_seed=None):
 		ExtScheduler.create_instance(Dummy)
-		super(SPTestSession, self).__init__(horizons.globals.db, rng_seed, ingame_gui_class=Dummy)
+		super(SPTestSession, self).__init__(horizons.globals.db, rng_seed, ingame_gui_class=Dummy, view_class=Dummy)
 		self.reset_autosave = mock.Mock()
 
 	def save(self, *args, **kwargs):
@@ -0,0 +1,84 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import time
+from functools import partial
+
+from horizons.ai.aiplayer import AIPlayer
+from horizons.ai.aiplayer.building.lumberjack import LumberjackEvaluator
+from horizons.ai.aiplayer.evaluatorpool import EvaluatorPool, PlanSnapshot
+from horizons.util.random_map import generate_map_from_seed
+from tests.game import game_test
+
+log = logging.getLogger(__name__)
+
+
+@game_test(mapgen=partial(generate_map_from_seed, 5), human_player=False, ai_players=4, timeout=30*60)
+def test_ai_evaluator_pool(session, _):
+	"""
+	Let 4 AI players build for 10 minutes, then score every location in their production
+	areas with and without worker processes. The values have to be the same as the ones of
+	LumberjackEvaluator.create, the timings show the speedup of the pool.
+	"""
+	session.run(seconds=10*60)
+
+	production_builders = [settlement_manager.production_builder for player in session.world.players
+	                       if isinstance(player, AIPlayer) for settlement_manager in player.settlement_managers]
+	assert production_builders
+
+	pool = EvaluatorPool()
+	old_settings = (EvaluatorPool.workers, EvaluatorPool.min_locations)
+	EvaluatorPool.min_locations = 0
+	try:
+		for production_builder in production_builders:
+			locations = [(x, y, 0) for (x, y) in sorted(production_builder.plan)]
+
+			start = time.time()
+			expected = []
+			for x, y, orientation in locations:
+				evaluator = LumberjackEvaluator.create(production_builder, x, y, orientation)
+				expected.append(evaluator.value if evaluator is not None else None)
+			serial_time = time.time() - start
+
+			start = time.time()
+			snapshot = PlanSnapshot(production_builder, LumberjackEvaluator.snapshot_personalities)
+			snapshot_time = time.time() - start
+
+			timings = []
+			for workers in (0, 2, 4):
+				EvaluatorPool.workers = workers
+				pool.score(LumberjackEvaluator, snapshot, locations[:1]) # start the worker processes
+				start = time.time()
+				values = pool.score(LumberjackEvaluator, snapshot, locations)
+				timings.append('%d workers %.3fs' % (workers, time.time() - start))
+				assert values == expected
+				pool.end()
+
+			log.info('%s: %d locations, create %.3fs, snapshot %.3fs, %s',
+			         production_builder.settlement, len(locations), serial_time, snapshot_time, ', '.join(timings))
+	finally:
+		EvaluatorPool.workers, EvaluatorPool.min_locations = old_settings
+		pool.end()
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_ai_evaluator_pool.long = True
@@ -0,0 +1,92 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import time
+from collections import deque
+from functools import partial
+
+from horizons.util.random_map import generate_map_from_seed
+from horizons.world.buildability.connectedareacache import ConnectedAreaCache
+from tests.game import game_test
+
+log = logging.getLogger(__name__)
+
+
+def _get_area_count(coords_set):
+	"""Return the number of connected parts of coords_set."""
+	count = 0
+	remaining = set(coords_set)
+	while remaining:
+		count += 1
+		queue = deque([remaining.pop()])
+		while queue:
+			(x, y) = queue.popleft()
+			for coords in [(x - 1, y), (x, y - 1), (x, y + 1), (x + 1, y)]:
+				if coords in remaining:
+					remaining.discard(coords)
+					queue.append(coords)
+	return count
+
+
+@game_test(mapgen=partial(generate_map_from_seed, 5), human_player=False, ai_players=4, timeout=30*60)
+def test_connected_area_cache_trace(session, _):
+	"""
+	Record the changes of all ConnectedAreaCache instances while 4 AI players build for
+	10 minutes, then replay them. The replay time shows how expensive the connectivity
+	updates of the AI's road planning are.
+	"""
+	trace = [] # [(cache id, method name, coords list), ...]
+	add_area = ConnectedAreaCache.add_area
+	remove_area = ConnectedAreaCache.remove_area
+
+	def record(method, name):
+		def recorder(self, coords_list):
+			trace.append((id(self), name, list(coords_list)))
+			method(self, coords_list)
+		return recorder
+
+	ConnectedAreaCache.add_area = record(add_area, 'add_area')
+	ConnectedAreaCache.remove_area = record(remove_area, 'remove_area')
+	try:
+		session.run(seconds=10*60)
+	finally:
+		ConnectedAreaCache.add_area = add_area
+		ConnectedAreaCache.remove_area = remove_area
+	assert trace
+
+	caches = {}
+	start = time.time()
+	for cache_id, name, coords_list in trace:
+		if cache_id not in caches:
+			caches[cache_id] = ConnectedAreaCache()
+		getattr(caches[cache_id], name)(coords_list)
+	replay_time = time.time() - start
+
+	for cache in caches.itervalues():
+		assert len(cache.areas) == _get_area_count(cache.area_numbers)
+
+	num_coords = sum(len(coords_list) for (_, _, coords_list) in trace)
+	log.info('%d caches, %d calls with %d coords replayed in %.3fs', len(caches), len(trace), num_coords, replay_time)
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_connected_area_cache_trace.long = True
@@ -0,0 +1,104 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import bz2
+import glob
+import logging
+import os
+import tempfile
+import time
+
+import mock
+
+from horizons.util.dbreader import DbReader
+from horizons.util.savegamewriter import SavegameWriter
+from tests.game import game_test, load_session, TEST_FIXTURES_DIR
+
+log = logging.getLogger(__name__)
+
+
+def _get_fixtures():
+	"""Returns the fixture savegames, the compressed ones are extracted to temporary files.
+	@return: list of (name, path)"""
+	fixtures = [(os.path.basename(path), path)
+	            for path in sorted(glob.glob(os.path.join(TEST_FIXTURES_DIR, '*.sqlite')))]
+	for path in sorted(glob.glob(os.path.join(TEST_FIXTURES_DIR, '*.sqlite.bz2'))):
+		fd, filename = tempfile.mkstemp(suffix='.sqlite')
+		with os.fdopen(fd, 'wb') as f:
+			f.write(bz2.decompress(open(path, 'rb').read()))
+		fixtures.append((os.path.basename(path), filename))
+	return fixtures
+
+
+def _save(session, db_class):
+	"""Saves the session using db_class for the savegame db.
+	@return: (filename, seconds)"""
+	fd, filename = tempfile.mkstemp()
+	os.close(fd)
+	with mock.patch('horizons.session.SavegameWriter', db_class):
+		start = time.time()
+		assert session.save(savegamename=filename)
+		duration = time.time() - start
+	return filename, duration
+
+
+def _get_content(filename):
+	"""@return: { table: sorted rows including rowid } of all tables but metadata"""
+	db = DbReader(filename)
+	tables = [name for (name, ) in db("SELECT name FROM sqlite_master WHERE type = 'table'")]
+	content = dict((table, sorted(db('SELECT rowid, * FROM "%s"' % table))) for table in tables
+	               if not table.startswith('metadata'))
+	db.close()
+	return content
+
+
+@game_test(manual_session=True, timeout=30*60)
+def test_save_benchmark():
+	"""
+	Save each fixture savegame with a plain DbReader and with the SavegameWriter, check
+	that the results are the same and log the save times.
+	"""
+	lines = []
+	for name, path in _get_fixtures():
+		session = load_session(path)
+		times = {DbReader: [], SavegameWriter: []}
+		contents = {}
+		for i in xrange(3):
+			for db_class in (DbReader, SavegameWriter):
+				filename, duration = _save(session, db_class)
+				times[db_class].append(duration)
+				contents[db_class] = _get_content(filename)
+				os.unlink(filename)
+		session.end(keep_map=True, remove_savegame=False)
+
+		assert contents[DbReader] == contents[SavegameWriter]
+		num_rows = sum(len(rows) for rows in contents[SavegameWriter].itervalues())
+		lines.append('%-25s %7d rows %8.3fs %8.3fs' % (name, num_rows,
+		             min(times[DbReader]), min(times[SavegameWriter])))
+		if not path.startswith(TEST_FIXTURES_DIR):
+			os.unlink(path)
+
+	log.info('%-25s %12s %9s %9s\n%s', 'savegame', '', 'DbReader', 'batched', '\n'.join(lines))
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_save_benchmark.long = True
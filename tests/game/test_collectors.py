@@ -0,0 +1,114 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import mock
+
+from horizons.command.building import Build
+from horizons.component.collectingcomponent import CollectingComponent
+from horizons.component.storagecomponent import StorageComponent
+from horizons.constants import BUILDINGS, COLLECTORS, RES
+from horizons.scheduler import Scheduler
+from horizons.util.worldobject import WorldObject
+from horizons.world.units.collectors.buildingcollector import BuildingCollector
+
+from tests.game import game_test, new_session, saveload, settle
+
+
+@game_test(manual_session=True)
+def test_no_job_found_while_waiting():
+	"""Collectors skip searches and wait for changes after finding no job. This must never
+	miss a job that a full search would have found."""
+	session, player = new_session()
+	settlement, island = settle(session)
+	Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+
+	get_job = BuildingCollector.get_job
+	def checked_get_job(collector):
+		job = get_job(collector)
+		if job is None and collector._no_job_state is not None:
+			assert not collector._find_jobs(collector.get_collectable_res())
+		return job
+
+	def check_waiting_collectors():
+		waiting = 0
+		for building in settlement.buildings:
+			if not building.has_component(CollectingComponent):
+				continue
+			for collector in building.get_component(CollectingComponent).get_local_collectors():
+				if collector._waiting_for_job is not None:
+					waiting += 1
+					assert not collector._find_jobs(collector.get_collectable_res())
+		return waiting
+
+	def run(seconds):
+		waiting = 0
+		for i in xrange(seconds):
+			session.run(seconds=1)
+			waiting += check_waiting_collectors()
+		return waiting
+
+	with mock.patch.object(BuildingCollector, 'get_job', checked_get_job):
+		# without trees, there is nothing to collect
+		assert run(20)
+		session = saveload(session)
+		player = session.world.player
+		settlement = session.world.settlements[0]
+		island = settlement.island
+
+		for x in xrange(29, 33):
+			assert Build(BUILDINGS.TREE, x, 29, island, settlement=settlement)(player)
+		run(150)
+		lumberjack = settlement.buildings_by_id[BUILDINGS.LUMBERJACK][0]
+		collector = lumberjack.get_component(CollectingComponent).get_local_collectors()[0]
+		assert any(utilization > 0 for tick, utilization in collector._job_history)
+
+	session.end()
+
+
+@game_test(manual_session=True)
+def test_waiting_collector_save_load():
+	"""A collector that waits for a job continues to do so after loading."""
+	session, player = new_session()
+	settlement, island = settle(session)
+	lumberjack = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	worldid = lumberjack.worldid
+
+	session.run(seconds=20)
+	collector = lumberjack.get_component(CollectingComponent).get_local_collectors()[0]
+	assert collector._waiting_for_job is not None
+	remaining_ticks = Scheduler().get_remaining_ticks(collector, collector.search_job)
+	waited_ticks = Scheduler().cur_tick - collector._waiting_for_job[0]
+
+	session = saveload(session)
+	lumberjack = WorldObject.get_object_by_id(worldid)
+	collector = lumberjack.get_component(CollectingComponent).get_local_collectors()[0]
+	assert collector._waiting_for_job is not None
+	assert Scheduler().cur_tick - collector._waiting_for_job[0] == waited_ticks
+	assert Scheduler().get_remaining_ticks(collector, collector.search_job) == remaining_ticks
+
+	# changes wake it up as if the game hadn't been loaded
+	lumberjack.get_component(StorageComponent).inventory.alter(RES.BOARDS, 1)
+	assert collector._waiting_for_job is None
+	expected_ticks = max(COLLECTORS.DEFAULT_WAIT_TICKS - waited_ticks, 1)
+	assert Scheduler().get_remaining_ticks(collector, collector.search_job) == expected_ticks
+
+	session.end()
@@ -23,11 +23,17 @@ import os
 import bz2
 import tempfile
 
+import mock
+
 from horizons.command.building import Build
 from horizons.command.production import ToggleActive
 from horizons.command.unit import CreateUnit
 from horizons.constants import BUILDINGS, GAME, PRODUCTION, RES, TIER, UNITS
+from horizons.extscheduler import ExtScheduler
+from horizons.scheduler import Scheduler
+from horizons.util.dbreader import DbReader
 from horizons.util.shapes import Point
+from horizons.util.tickprofiler import TickProfiler
 from horizons.util.worldobject import WorldObject
 from horizons.world.production.producer import Producer
 from horizons.component.collectingcomponent import CollectingComponent
@@ -36,7 +42,7 @@ from horizons.world.units.collectors import Collector
 
 from tests.game import (
 	game_test, new_session, settle, load_session, saveload,
-	TEST_FIXTURES_DIR,
+	TEST_FIXTURES_DIR, _dbreader_convert_dummy_objects,
 )
 
 
@@ -262,3 +268,103 @@ def test_settler_level_save_load(s, p):
 
 		# should have leveled up
 		assert settler.level == level + 1
+
+
+@game_test(manual_session=True)
+def test_background_save():
+	"""
+	A savegame written by a thread contains the same data as a regular save.
+	"""
+	session, player = new_session()
+	settlement, island = settle(session)
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	worldid = lj.worldid
+	session.run(seconds=1)
+
+	fd, regular_save = tempfile.mkstemp()
+	os.close(fd)
+	assert session.save(savegamename=regular_save)
+
+	fd, background_save = tempfile.mkstemp()
+	os.close(fd)
+	results = []
+	with mock.patch('horizons.session.SavegameManager._write_screenshot'), \
+	     _dbreader_convert_dummy_objects():
+		session._save_in_background(background_save, results.append)
+		session.wait_for_background_save()
+	assert results == [True]
+	assert not os.path.exists(background_save + '.tmp')
+
+	def get_content(filename):
+		db = DbReader(filename)
+		tables = [name for (name, ) in db("SELECT name FROM sqlite_master WHERE type = 'table'")]
+		content = dict((table, db('SELECT rowid, * FROM "%s"' % table)) for table in tables
+		               if not table.startswith('metadata'))
+		db.close()
+		return content
+	assert get_content(regular_save) == get_content(background_save)
+	session.end(keep_map=True)
+	os.unlink(regular_save)
+
+	session = load_session(background_save)
+	assert WorldObject.get_object_by_id(worldid)
+	session.end()
+
+
+@game_test()
+def test_autosave_while_paused(session, player):
+	"""
+	Autosaves are triggered by the ExtScheduler, so they also happen while the game is paused.
+	Old autosaves are deleted after writing.
+	"""
+	fd, autosave = tempfile.mkstemp()
+	os.close(fd)
+	os.unlink(autosave)
+	with mock.patch('horizons.session.SavegameManager._write_screenshot'), \
+	     mock.patch('horizons.spsession.SavegameManager.create_autosave_filename', return_value=autosave), \
+	     mock.patch('horizons.spsession.SavegameManager.delete_dispensable_savegames') as delete, \
+	     _dbreader_convert_dummy_objects():
+		session.speed_pause()
+		session.autosave()
+		session.wait_for_background_save()
+		assert delete.called
+		session.speed_unpause()
+	assert os.path.exists(autosave)
+	os.unlink(autosave)
+
+
+@game_test()
+def test_autosave_postponed_during_ai_tick(session, player):
+	"""Saving completes AI ticks early, so autosaves wait for the end of the AI ticks."""
+	def retries():
+		return [entry for entry in ExtScheduler().schedule
+		        if entry[1].class_instance is session and entry[1].callback == session._try_autosave]
+
+	with mock.patch.object(session.world, 'is_ai_tick_in_progress', return_value=True), \
+	     mock.patch.object(session, '_save_in_background') as save_in_background:
+		session.autosave()
+		session.autosave() # the next interval doesn't add another retry
+		assert not save_in_background.called
+		assert len(retries()) == 1
+
+		session.world.is_ai_tick_in_progress.return_value = False
+		retries()[0][1].callback()
+		assert save_in_background.call_count == 1
+
+
+@game_test()
+def test_background_save_profiled(session, player):
+	"""The snapshot of a background save pauses the game, its duration is recorded by the tick profiler."""
+	fd, filename = tempfile.mkstemp()
+	os.close(fd)
+	profiler = TickProfiler()
+	with mock.patch.object(Scheduler(), 'profiler', profiler), \
+	     mock.patch('horizons.session.SavegameManager._write_screenshot'), \
+	     mock.patch.object(session.log, 'debug') as log_debug, \
+	     _dbreader_convert_dummy_objects():
+		session._save_in_background(filename, lambda success: None)
+		session.wait_for_background_save()
+	calls, seconds = profiler.targets[('Session', 'savegame_snapshot')]
+	assert calls == 1
+	assert any(call[0][0].startswith('Took snapshot') for call in log_debug.call_args_list)
+	os.unlink(filename)
@@ -0,0 +1,130 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.ai.aiplayer.building import AbstractBuilding
+from horizons.ai.aiplayer.evaluatorcache import EvaluatorCache
+from horizons.util.shapes import Rect
+
+
+class DummyEvaluator(object):
+	@classmethod
+	def get_score_area(cls, x, y, orientation):
+		return Rect.init_from_topleft_and_size(x - 2, y - 2, 5, 5)
+
+
+class CountingEvaluator(DummyEvaluator):
+	"""Evaluator that can't be built at odd x coordinates and counts how it is created."""
+	num_created = 0
+	num_created_from_value = 0
+
+	def __init__(self, x, y, orientation, value):
+		self.x = x
+		self.y = y
+		self.orientation = orientation
+		self.value = value
+
+	@classmethod
+	def create(cls, area_builder, x, y, orientation):
+		cls.num_created += 1
+		return cls(x, y, orientation, float(x + y)) if x % 2 == 0 else None
+
+	@classmethod
+	def create_from_value(cls, area_builder, x, y, orientation, value):
+		cls.num_created_from_value += 1
+		return cls(x, y, orientation, value)
+
+
+class CountingBuilding(AbstractBuilding):
+	evaluator_class = CountingEvaluator
+	evaluation_chunk_size = 4
+	locations = [(x, 10, 0) for x in xrange(10, 20)]
+
+	def __init__(self):
+		pass
+
+	def iter_potential_locations(self, settlement_manager):
+		return iter(self.locations)
+
+
+class TestEvaluatorCache(TestCase):
+
+	def setUp(self):
+		self.cache = EvaluatorCache()
+
+	def test_missing(self):
+		self.assertIs(EvaluatorCache.MISSING, self.cache.get(DummyEvaluator, 10, 10, 0))
+		self.cache.set(DummyEvaluator, 10, 10, 0, 5.0)
+		self.assertIs(EvaluatorCache.MISSING, self.cache.get(DummyEvaluator, 10, 10, 1))
+		self.assertIs(EvaluatorCache.MISSING, self.cache.get(object, 10, 10, 0))
+
+	def test_cached_values(self):
+		self.cache.set(DummyEvaluator, 10, 10, 0, 5.0)
+		self.cache.set(DummyEvaluator, 11, 10, 0, None)
+		self.assertEqual(5.0, self.cache.get(DummyEvaluator, 10, 10, 0))
+		self.assertIsNone(self.cache.get(DummyEvaluator, 11, 10, 0))
+
+	def test_change_in_area(self):
+		self.cache.set(DummyEvaluator, 10, 10, 0, 5.0)
+		self.cache.invalidate([(12, 12)])
+		self.assertIs(EvaluatorCache.MISSING, self.cache.get(DummyEvaluator, 10, 10, 0))
+		self.cache.set(DummyEvaluator, 10, 10, 0, 6.0)
+		self.assertEqual(6.0, self.cache.get(DummyEvaluator, 10, 10, 0))
+
+	def test_change_outside_of_area(self):
+		self.cache.set(DummyEvaluator, 10, 10, 0, 5.0)
+		self.cache.set(DummyEvaluator, 40, 40, 0, 7.0)
+		self.cache.invalidate([(40, 40), (-3, 60)])
+		self.assertEqual(5.0, self.cache.get(DummyEvaluator, 10, 10, 0))
+		self.assertIs(EvaluatorCache.MISSING, self.cache.get(DummyEvaluator, 40, 40, 0))
+
+	def test_cached_evaluators(self):
+		CountingEvaluator.num_created = CountingEvaluator.num_created_from_value = 0
+		locations = [(x, 10, 0) for x in xrange(10, 20)]
+		self.cache.set(CountingEvaluator, 10, 10, 0, 20.0)
+		evaluators = AbstractBuilding._get_cached_evaluators(self.cache, None, CountingEvaluator, locations)
+		self.assertEqual([(x, x + 10.0) for x in xrange(10, 20, 2)], [(e.x, e.value) for e in evaluators])
+		# only the cached location is created from its value, the others are used as created
+		self.assertEqual(9, CountingEvaluator.num_created)
+		self.assertEqual(1, CountingEvaluator.num_created_from_value)
+
+	def test_missing_locations(self):
+		self.cache.set(DummyEvaluator, 10, 10, 0, 5.0)
+		self.cache.set(DummyEvaluator, 40, 40, 0, None)
+		self.cache.set(DummyEvaluator, 70, 70, 0, 7.0)
+		self.cache.invalidate([(70, 70)])
+		locations = [(10, 10, 0), (10, 10, 1), (40, 40, 0), (70, 70, 0)]
+		self.assertEqual([(10, 10, 1), (70, 70, 0)], self.cache.get_missing_locations(DummyEvaluator, locations))
+
+	def test_update_in_steps(self):
+		CountingEvaluator.num_created = 0
+		building = CountingBuilding()
+		settlement_manager = Mock(evaluator_cache=self.cache)
+		self.cache.set(CountingEvaluator, 10, 10, 0, 20.0)
+
+		self.assertEqual(3, len(list(building.iter_update_evaluator_cache(settlement_manager))))
+		self.assertEqual(9, CountingEvaluator.num_created)
+		self.assertEqual([], self.cache.get_missing_locations(CountingEvaluator, building.locations))
+		self.assertEqual(22.0, self.cache.get(CountingEvaluator, 12, 10, 0))
+		self.assertIsNone(self.cache.get(CountingEvaluator, 13, 10, 0))
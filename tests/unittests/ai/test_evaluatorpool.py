@@ -0,0 +1,56 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+
+from horizons.ai.aiplayer.evaluatorpool import EvaluatorPool
+
+
+class DummyEvaluator(object):
+	@classmethod
+	def score_location(cls, snapshot, x, y, orientation):
+		if (x + y) % 3 == 0:
+			return None
+		return snapshot[(x, y)] + orientation
+
+
+class TestEvaluatorPool(TestCase):
+
+	def setUp(self):
+		self.snapshot = dict(((x, y), x * 100 + y) for x in xrange(30) for y in xrange(30))
+		self.locations = [(x, y, x % 2) for (x, y) in sorted(self.snapshot)]
+		self.expected = [DummyEvaluator.score_location(self.snapshot, x, y, o) for (x, y, o) in self.locations]
+
+	def tearDown(self):
+		EvaluatorPool().end()
+		EvaluatorPool.destroy_instance()
+
+	def test_disabled(self):
+		self.assertFalse(EvaluatorPool().enabled)
+		self.assertEqual(self.expected, EvaluatorPool().score(DummyEvaluator, self.snapshot, self.locations))
+
+	def test_workers_keep_order(self):
+		pool = EvaluatorPool()
+		pool.workers = 3
+		pool.min_locations = 0
+		self.assertTrue(pool.enabled)
+		self.assertEqual(self.expected, pool.score(DummyEvaluator, self.snapshot, self.locations))
+		self.assertEqual(self.expected[:5], pool.score(DummyEvaluator, self.snapshot, self.locations[:5]))
@@ -0,0 +1,102 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+from mock import Mock
+
+from horizons.ai.aiplayer.tickexecutor import TickExecutor
+from horizons.scheduler import Scheduler
+
+
+class TestTickExecutor(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.scheduler = Scheduler()
+		self.scheduler.before_ticking()
+		self.tick_id = Scheduler.FIRST_TICK_ID
+		self.owner = object()
+		self.executed = []
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+
+	def tick(self):
+		self.scheduler.tick(self.tick_id)
+		self.tick_id += 1
+
+	def work(self, name, steps):
+		for i in xrange(steps):
+			self.executed.append((name, i))
+			yield
+
+	def test_small_work_is_done_immediately(self):
+		executor = TickExecutor(self.owner, 5)
+		executor.start(self.work('a', 3))
+		self.assertEqual(3, len(self.executed))
+		self.assertFalse(executor.busy)
+		self.assertFalse(self.scheduler.get_classinst_calls(self.owner))
+
+	def test_budget_per_tick(self):
+		executor = TickExecutor(self.owner, 2)
+		executor.start(self.work('a', 5))
+		self.assertEqual(2, len(self.executed))
+		self.assertTrue(executor.busy)
+		self.tick()
+		self.assertEqual(4, len(self.executed))
+		self.tick()
+		self.assertEqual(5, len(self.executed))
+		self.assertFalse(executor.busy)
+		self.tick()
+		self.assertEqual([('a', i) for i in xrange(5)], self.executed)
+
+	def test_restart_finishes_old_work(self):
+		executor = TickExecutor(self.owner, 2)
+		executor.start(self.work('a', 5))
+		executor.start(self.work('b', 3))
+		self.assertEqual([('a', i) for i in xrange(5)] + [('b', 0), ('b', 1)], self.executed)
+		self.assertEqual(1, len(self.scheduler.get_classinst_calls(self.owner)))
+		self.tick()
+		self.assertEqual(('b', 2), self.executed[-1])
+		self.assertFalse(executor.busy)
+
+	def test_cancel(self):
+		executor = TickExecutor(self.owner, 2)
+		executor.start(self.work('a', 5))
+		executor.cancel()
+		self.assertFalse(executor.busy)
+		self.tick()
+		self.tick()
+		self.assertEqual(2, len(self.executed))
+
+	def test_deterministic(self):
+		results = []
+		for _ in xrange(2):
+			self.executed = []
+			executor = TickExecutor(self.owner, 3)
+			for tick in xrange(10):
+				if tick % 4 == 0:
+					executor.start(self.work(tick, 7))
+				self.tick()
+			executor.finish()
+			results.append(self.executed)
+		self.assertEqual(results[0], results[1])
+		self.assertEqual(7 * 3, len(results[0]))
@@ -0,0 +1,125 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.ext.dummy import Dummy
+from horizons.extscheduler import ExtScheduler
+from horizons.gui.widgets.minimap import Minimap
+from horizons.util.shapes import Rect
+
+
+class MockTile(object):
+	def __init__(self, id, settlement=None):
+		self.id = id
+		self.settlement = settlement
+
+
+class MockIsland(object):
+	def __init__(self):
+		self.ground_map = {}
+
+
+class MockWorld(object):
+	"""World without full_map, the minimap must not look up the sea in it, that would
+	create the sea tiles."""
+	inited = True
+
+	def __init__(self, width, height):
+		self.min_x = 0
+		self.min_y = 0
+		self.max_x = width - 1
+		self.max_y = height - 1
+		self.map_dimensions = Rect.init_from_topleft_and_size(0, 0, width, height)
+		self.island_map = {}
+
+
+def get_settlement(color):
+	owner = Mock()
+	owner.color.to_tuple.return_value = color
+	settlement = Mock()
+	settlement.owner = owner
+	return settlement
+
+
+class TestMinimapRaster(TestCase):
+	def setUp(self):
+		super(TestMinimapRaster, self).setUp()
+		# a 100x80 map with an island in the middle, shown on a 50x40 minimap
+		self.world = MockWorld(100, 80)
+		self.island = MockIsland()
+		for x in xrange(20, 70):
+			for y in xrange(10, 60):
+				self.island.ground_map[(x, y)] = MockTile(1)
+				self.world.island_map[(x, y)] = self.island
+		self.island.ground_map[(30, 30)] = MockTile(0) # water inside the island
+		self.minimap = Minimap(Rect.init_from_topleft_and_size(0, 0, 50, 40), session=None, view=None,
+		                       world=self.world, targetrenderer=Dummy(), imagemanager=Dummy(),
+		                       cam_border=False, use_rotation=False, preview=True)
+
+	def _get_expected_pixels(self):
+		"""Pixels that aren't water, computed the way the minimap always did it."""
+		pixels = []
+		for x in xrange(50):
+			for y in xrange(40):
+				tile = self.island.ground_map.get((int(x * 2.0) + 1, int(y * 2.0) + 1))
+				if tile is None or (tile.settlement is None and tile.id <= 0):
+					continue
+				if tile.settlement is None:
+					color = Minimap.COLORS["island"]
+				else:
+					color = tile.settlement.owner.color.to_tuple()
+				pixels.append((x, y) + tuple(color))
+		return sorted(pixels)
+
+	def test_dump_data(self):
+		data = json.loads(self.minimap.dump_data())
+		self.assertEqual(sorted(tuple(pixel) for pixel in data), self._get_expected_pixels())
+
+	def test_update(self):
+		self.minimap.dump_data()
+		settlement = get_settlement((10, 20, 30))
+		changed_coords = [(x, y) for x in xrange(41, 51) for y in xrange(21, 31)]
+		for coords in changed_coords:
+			self.island.ground_map[coords].settlement = settlement
+
+		ExtScheduler.create_instance([])
+		try:
+			for coords in changed_coords:
+				self.minimap._update(coords)
+			# all changes are drawn together later on
+			self.assertEqual(len(ExtScheduler().schedule), 1)
+		finally:
+			ExtScheduler.destroy_instance()
+
+		self.minimap.minimap_image.rendertarget = Mock()
+		self.minimap._redraw_dirty_areas()
+		draw_point = self.minimap.minimap_image.rendertarget.addPoint
+		# only the pixels that show the changed tiles are drawn again
+		self.assertEqual(draw_point.call_count, 25)
+		for args, _ in draw_point.call_args_list:
+			self.assertEqual(args[2:], (10, 20, 30))
+
+		data = json.loads(self.minimap.dump_data())
+		self.assertEqual(sorted(tuple(pixel) for pixel in data), self._get_expected_pixels())
@@ -19,11 +19,17 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import logging
+import time
 from unittest import TestCase
 from mock import Mock
 
 from horizons.scheduler import Scheduler
 
+
+log = logging.getLogger(__name__)
+
+
 class TestScheduler(TestCase):
 
 	def setUp(self):
@@ -216,3 +222,111 @@ class TestScheduler(TestCase):
 		self.assertEqual(2, self.scheduler.get_remaining_ticks(instance, self.callback))
 		self.scheduler.tick(Scheduler.FIRST_TICK_ID+2)
 		self.assertEqual(1, self.scheduler.get_remaining_ticks(instance, self.callback))
+
+	def test_remove_call_by_handle(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		handle = self.scheduler.add_new_object(self.callback, instance, run_in=1, loops=-1)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.callback.assert_called_once_with()
+		self.callback.reset_mock()
+
+		self.assertEqual(1, self.scheduler.rem_object(handle))
+		self.assertEqual(0, self.scheduler.rem_object(handle))
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.assertFalse(self.callback.called)
+		self.assertEqual({}, self.scheduler.get_classinst_calls(instance))
+
+	def test_remove_then_add_same_callback(self):
+		# this is how ScenarioEventHandler.sleep delays its callbacks
+		self.scheduler.before_ticking()
+		instance = Mock()
+		handle = self.scheduler.add_new_object(self.callback, instance, run_in=2, loops=-1)
+		self.assertEqual(1, self.scheduler.rem_object(handle))
+		handle.run_in += 3
+		self.scheduler.add_object(handle)
+
+		fired = []
+		self.callback.side_effect = lambda: fired.append(self.scheduler.cur_tick)
+		for tick in xrange(Scheduler.FIRST_TICK_ID, Scheduler.FIRST_TICK_ID + 12):
+			self.scheduler.tick(tick)
+		first_tick = Scheduler.FIRST_TICK_ID - 1 + 5
+		self.assertEqual(range(first_tick, Scheduler.FIRST_TICK_ID + 12, 2), fired)
+		self.assertEqual([handle], self.scheduler.get_classinst_calls(instance).keys())
+
+	def test_callback_removes_itself(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		def remove_self():
+			self.scheduler.rem_call(instance, self.callback)
+		self.callback.side_effect = remove_self
+		self.scheduler.add_new_object(self.callback, instance, run_in=1, loops=-1)
+
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.callback.assert_called_once_with()
+		self.callback.reset_mock()
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.assertFalse(self.callback.called)
+
+	def test_callbacks_of_same_tick_run_in_order_of_adding(self):
+		self.scheduler.before_ticking()
+		calls = []
+		instances = [Mock() for i in xrange(10)]
+		for i, instance in enumerate(instances):
+			self.scheduler.add_new_object(lambda i=i: calls.append(i), instance, run_in=2 - i % 2)
+		self.scheduler.rem_all_classinst_calls(instances[4])
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.assertEqual([1, 3, 5, 7, 9, 0, 2, 6, 8], calls)
+
+	def test_finish_callback(self):
+		self.scheduler.before_ticking()
+		finish = Mock()
+		self.scheduler.add_new_object(self.callback, None, run_in=1, loops=2, finish_callback=finish)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertFalse(finish.called)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		finish.assert_called_once_with()
+
+
+class TestSchedulerBenchmark(TestCase):
+	"""Microbenchmark of a cancellation storm, like it happens when a settlement with lots
+	of producers and collectors is torn down. Every instance has several pending calls,
+	and all of them are removed while the schedule is well filled."""
+
+	NUM_INSTANCES = 5000
+	CALLS_PER_INSTANCE = 4
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.scheduler = Scheduler()
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+
+	def test_cancellation_storm(self):
+		callback = Mock()
+		self.scheduler.before_ticking()
+		instances = [object() for i in xrange(self.NUM_INSTANCES)]
+		for i, instance in enumerate(instances):
+			for j in xrange(self.CALLS_PER_INSTANCE):
+				self.scheduler.add_new_object(callback, instance, run_in=1 + (i + j) % 100, loops=-1)
+
+		start = time.time()
+		for instance in instances[::2]:
+			self.scheduler.rem_call(instance, callback)
+		for instance in instances[1::2]:
+			self.scheduler.rem_all_classinst_calls(instance)
+		cancel_time = time.time() - start
+
+		start = time.time()
+		for tick in xrange(Scheduler.FIRST_TICK_ID, Scheduler.FIRST_TICK_ID + 100):
+			self.scheduler.tick(tick)
+		tick_time = time.time() - start
+
+		self.assertFalse(callback.called)
+		self.assertEqual({}, self.scheduler.calls_by_instance)
+		log.info('cancelled %d calls in %.4fs, 100 ticks in %.4fs',
+		         self.NUM_INSTANCES * self.CALLS_PER_INSTANCE, cancel_time, tick_time)
+
+	test_cancellation_storm.long = True
@@ -22,7 +22,7 @@
 from unittest import TestCase
 from mock import Mock, MagicMock, patch
 
-from horizons.timer import Timer
+from horizons.timer import HeadlessTimer, Timer
 from horizons.scheduler import Scheduler
 from horizons.constants import GAME_SPEED
 
@@ -169,3 +169,38 @@ class TestTimer(TestCase):
 		self.timer.add_test(self.test)
 		self.timer.check_tick()
 		self.assertFalse(self.callback.called)
+
+
+class TestHeadlessTimer(TestCase):
+
+	def setUp(self):
+		self.callback = Mock()
+		self.fifePatcher = patch('horizons.globals.fife')
+		self.fife = self.fifePatcher.start()
+		self.timer = HeadlessTimer()
+		self.timer.add_call(self.callback)
+
+	def tearDown(self):
+		self.fifePatcher.stop()
+
+	def test_activate_does_not_register_with_pump(self):
+		self.timer.activate()
+		self.assertFalse(self.fife.pump.append.called)
+
+	def test_run_ticks_without_waiting(self):
+		self.assertEqual(3, self.timer.run(3))
+		self.assertEqual([((Scheduler.FIRST_TICK_ID + i, ), ) for i in xrange(3)],
+		                 self.callback.call_args_list)
+		self.assertEqual(2, self.timer.run(2))
+		self.callback.assert_called_with(Scheduler.FIRST_TICK_ID + 4)
+
+	def test_run_stops_on_test_skip(self):
+		self.timer.add_test(lambda tick: Timer.TEST_SKIP if tick == 2 else Timer.TEST_PASS)
+		self.assertEqual(2, self.timer.run(10))
+
+	def test_run_stops_when_paused(self):
+		def pause(tick):
+			if tick == 4:
+				self.timer.ticks_per_second = 0
+		self.callback.side_effect = pause
+		self.assertEqual(5, self.timer.run())
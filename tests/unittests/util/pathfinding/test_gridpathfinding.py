@@ -0,0 +1,104 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+import unittest
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, PathGrid
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.shapes import Point, Rect
+
+
+class TestGridFindPath(unittest.TestCase):
+
+	SIZE = 40
+
+	def _create_nodes(self, rng, density):
+		return dict(((x, y), 1.0) for x in xrange(self.SIZE) for y in xrange(self.SIZE)
+		            if rng.random() < density)
+
+	def _random_shape(self, rng):
+		x = rng.randint(0, self.SIZE - 1)
+		y = rng.randint(0, self.SIZE - 1)
+		if rng.random() < 0.5:
+			return Point(x, y)
+		return Rect.init_from_topleft_and_size(x, y, rng.randint(0, 2), rng.randint(0, 2))
+
+	def test_same_paths_as_findpath(self):
+		rng = random.Random(42)
+		for density in (0.6, 0.8, 1.0):
+			nodes = self._create_nodes(rng, density)
+			grid = PathGrid.from_nodes(nodes, Rect.init_from_borders(0, 0, self.SIZE - 1, self.SIZE - 1))
+			for i in xrange(60):
+				source = self._random_shape(rng)
+				destination = self._random_shape(rng)
+				blocked = set(rng.sample(nodes.keys(), 20))
+				diagonal = rng.random() < 0.5
+				make_target_walkable = rng.random() < 0.5
+
+				expected = FindPath()(source, destination, nodes, blocked, diagonal, make_target_walkable)
+				path = GridFindPath()(source, destination, grid, blocked, diagonal, make_target_walkable)
+				self.assertEqual(expected, path)
+
+	def test_grid_updates(self):
+		grid = PathGrid(0, 0, 4, 0)
+		for x in xrange(5):
+			grid.add((x, 0))
+		self.assertEqual([(x, 0) for x in xrange(5)], GridFindPath()(Point(0, 0), Point(4, 0), grid))
+
+		grid.remove((2, 0))
+		self.assertFalse((2, 0) in grid)
+		self.assertEqual(None, GridFindPath()(Point(0, 0), Point(4, 0), grid))
+
+		grid.add((2, 0), 2.0)
+		self.assertEqual(2.0, grid.get((2, 0)))
+		self.assertEqual(None, grid.get((7, 0)))
+		self.assertEqual(5, len(GridFindPath()(Point(0, 0), Point(4, 0), grid)))
+
+	def test_changes_since(self):
+		grid = PathGrid(0, 0, 4, 0)
+		for x in xrange(5):
+			grid.add((x, 0))
+		generation = grid.generation
+		self.assertEqual([], grid.get_changes_since(generation))
+
+		grid.remove((2, 0))
+		grid.remove((2, 0)) # no change
+		grid.add((3, 0), 2.0)
+		self.assertEqual([(2, 0), (3, 0)], grid.get_changes_since(generation))
+
+		for i in xrange(grid.MAX_CHANGES):
+			grid.add((0, 0), 1.0 + i % 2)
+		self.assertEqual(None, grid.get_changes_since(generation))
+
+	def test_source_outside_of_grid(self):
+		nodes = dict(((x, 0), 1.0) for x in xrange(1, 5))
+		grid = PathGrid.from_nodes(nodes)
+		self.assertEqual(FindPath()(Point(0, 0), Point(4, 0), nodes),
+		                 GridFindPath()(Point(0, 0), Point(4, 0), grid))
+
+	def test_blocked_source_and_destination(self):
+		nodes = dict(((x, 0), 1.0) for x in xrange(5))
+		grid = PathGrid.from_nodes(nodes)
+		self.assertEqual([(x, 0) for x in xrange(5)],
+		                 GridFindPath()(Point(0, 0), Point(4, 0), grid, blocked_coords=[(0, 0)]))
+		self.assertEqual(None, GridFindPath()(Point(0, 0), Point(4, 0), grid, blocked_coords=[(4, 0)]))
@@ -0,0 +1,142 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+import unittest
+from collections import deque
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, PathGrid
+from horizons.util.pathfinding.hierarchicalpathfinding import PathHierarchy
+from horizons.util.shapes import Circle, Point, Rect
+
+
+class TestPathHierarchy(unittest.TestCase):
+
+	SIZE = 60
+
+	def _create_grid(self, rng, num_islands):
+		land = set()
+		for i in xrange(num_islands):
+			x, y = rng.randint(0, self.SIZE - 1), rng.randint(0, self.SIZE - 1)
+			for coords in Rect.init_from_topleft_and_size(x, y, rng.randint(2, 12), rng.randint(2, 12)).tuple_iter():
+				land.add(coords)
+		nodes = [(x, y) for x in xrange(self.SIZE) for y in xrange(self.SIZE) if (x, y) not in land]
+		return PathGrid.from_nodes(nodes, Rect.init_from_borders(0, 0, self.SIZE - 1, self.SIZE - 1))
+
+	def _check_path(self, path, source, destination, grid, blocked):
+		self.assertTrue(path[0] in source.get_coordinates())
+		self.assertTrue(Point(*path[-1]) in destination)
+		for prev, coords in zip(path, path[1:]):
+			self.assertEqual(1, max(abs(prev[0] - coords[0]), abs(prev[1] - coords[1])))
+			self.assertTrue(coords in grid)
+			self.assertFalse(coords in blocked)
+
+	def _get_optimal_length(self, source, destination, grid, blocked):
+		"""@return: number of nodes of the shortest path, found by a breadth-first search"""
+		start = source.to_tuple()
+		length = {start: 1}
+		queue = deque([start])
+		while queue:
+			coords = queue.popleft()
+			if Point(*coords) in destination:
+				return length[coords]
+			for dx in (-1, 0, 1):
+				for dy in (-1, 0, 1):
+					neighbor = (coords[0] + dx, coords[1] + dy)
+					if neighbor not in length and neighbor in grid and neighbor not in blocked:
+						length[neighbor] = length[coords] + 1
+						queue.append(neighbor)
+		return None
+
+	def test_paths_like_gridfindpath(self):
+		rng = random.Random(23)
+		for num_islands in (10, 30, 60):
+			grid = self._create_grid(rng, num_islands)
+			hierarchy = PathHierarchy(grid, cluster_size=8)
+			water = [(x, y) for x in xrange(self.SIZE) for y in xrange(self.SIZE) if (x, y) in grid]
+			ratios = []
+			for i in xrange(40):
+				source = Point(*rng.choice(water))
+				destination = Circle(Point(*rng.choice(water)), rng.randint(0, 2))
+				blocked = dict.fromkeys(rng.sample(water, 15))
+				blocked.pop(source.to_tuple(), None)
+
+				expected = GridFindPath()(source, destination, grid, blocked, True, False)
+				path = hierarchy.find_path(source, destination, blocked)
+				if expected is None:
+					self.assertEqual(None, path)
+				else:
+					self._check_path(path, source, destination, grid, blocked)
+					ratios.append(float(len(path)) / self._get_optimal_length(source, destination, grid, blocked))
+			# the paths are close to the shortest ones
+			self.assertTrue(max(ratios) <= 1.15)
+			self.assertTrue(sum(ratios) / len(ratios) <= 1.03)
+
+	def test_diagonal_squeeze(self):
+		# two water areas that are only connected diagonally at the corner of clusters
+		grid = PathGrid(0, 0, 39, 39)
+		for x in xrange(40):
+			for y in xrange(40):
+				if (x < 20) == (y < 20):
+					grid.add((x, y))
+		hierarchy = PathHierarchy(grid, cluster_size=10)
+		path = hierarchy.find_path(Point(0, 0), Point(39, 39))
+		self._check_path(path, Point(0, 0), Point(39, 39), grid, {})
+		self.assertTrue((19, 19) in path and (20, 20) in path)
+
+	def test_grid_changes(self):
+		grid = PathGrid(0, 0, 49, 9)
+		for x in xrange(50):
+			for y in xrange(10):
+				grid.add((x, y))
+		hierarchy = PathHierarchy(grid, cluster_size=8)
+		self.assertEqual(50, len(hierarchy.find_path(Point(0, 0), Point(49, 0))))
+
+		# build a wall with a gap at the bottom
+		for y in xrange(9):
+			grid.remove((25, y))
+		path = hierarchy.find_path(Point(0, 0), Point(49, 0))
+		self._check_path(path, Point(0, 0), Point(49, 0), grid, {})
+		self.assertTrue((25, 9) in path)
+
+		# close the gap
+		grid.remove((25, 9))
+		self.assertEqual(None, hierarchy.find_path(Point(0, 0), Point(49, 0)))
+
+		grid.add((25, 4))
+		self.assertTrue((25, 4) in hierarchy.find_path(Point(0, 0), Point(49, 0)))
+
+	def test_many_grid_changes(self):
+		grid = PathGrid(0, 0, 49, 9)
+		for x in xrange(50):
+			for y in xrange(10):
+				grid.add((x, y))
+		hierarchy = PathHierarchy(grid, cluster_size=8)
+		self.assertEqual(50, len(hierarchy.find_path(Point(0, 0), Point(49, 0))))
+
+		# more changes than the grid remembers
+		for y in xrange(10):
+			grid.remove((25, y))
+		for i in xrange(grid.MAX_CHANGES):
+			grid.add((0, 9), 1.0 + i % 2)
+		self.assertEqual(None, grid.get_changes_since(0))
+		self.assertEqual(None, hierarchy.find_path(Point(0, 0), Point(49, 0)))
@@ -0,0 +1,121 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import unittest
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, PathGrid
+from horizons.util.pathfinding.pathcache import PathCache
+from horizons.util.shapes import Circle, Point, Rect
+
+
+class TestPathCache(unittest.TestCase):
+
+	def setUp(self):
+		self.grid = PathGrid(0, 0, 9, 1)
+		for x in xrange(10):
+			for y in xrange(2):
+				self.grid.add((x, y))
+
+	def test_hit(self):
+		cache = PathCache()
+		expected = GridFindPath()(Point(0, 0), Rect(8, 0, 9, 1), self.grid)
+		self.assertEqual(expected, cache.find_path(Point(0, 0), Rect(8, 0, 9, 1), self.grid))
+		path = cache.find_path(Point(0, 0), Rect(8, 0, 9, 1), self.grid)
+		self.assertEqual(expected, path)
+		self.assertEqual((1, 1), (cache.hits, cache.misses))
+		self.assertEqual(0.5, cache.hit_rate)
+
+		# returned paths can be modified without affecting the cache
+		del path[1:]
+		self.assertEqual(expected, cache.find_path(Point(0, 0), Rect(8, 0, 9, 1), self.grid))
+
+	def test_different_arguments(self):
+		cache = PathCache()
+		cache.find_path(Point(0, 0), Point(9, 1), self.grid)
+		cache.find_path(Point(0, 0), Point(9, 1), self.grid, diagonal=True)
+		cache.find_path(Point(0, 0), Rect(9, 1, 9, 1), self.grid)
+		cache.find_path(Point(0, 1), Point(9, 1), self.grid)
+		self.assertEqual(0, cache.hits)
+
+	def test_grid_change_invalidates(self):
+		cache = PathCache()
+		self.assertEqual(10, len(cache.find_path(Point(0, 0), Point(9, 0), self.grid)))
+
+		self.grid.remove((5, 0))
+		path = cache.find_path(Point(0, 0), Point(9, 0), self.grid)
+		self.assertFalse((5, 0) in path)
+		self.assertEqual(0, cache.hits)
+
+		self.grid.remove((5, 1))
+		self.assertEqual(None, cache.find_path(Point(0, 0), Point(9, 0), self.grid))
+		self.assertEqual(None, cache.find_path(Point(0, 0), Point(9, 0), self.grid))
+		self.assertEqual(1, cache.hits)
+
+	def test_change_outside_of_search_keeps_path(self):
+		grid = PathGrid(0, 0, 29, 9)
+		for x in xrange(30):
+			for y in xrange(10):
+				grid.add((x, y))
+		cache = PathCache()
+		expected = cache.find_path(Point(0, 0), Point(5, 0), grid)
+
+		grid.remove((25, 8))
+		self.assertEqual(expected, cache.find_path(Point(0, 0), Point(5, 0), grid))
+		self.assertEqual(1, cache.hits)
+
+		grid.remove((3, 0))
+		path = cache.find_path(Point(0, 0), Point(5, 0), grid)
+		self.assertFalse((3, 0) in path)
+		self.assertEqual(1, cache.hits)
+
+	def test_too_many_changes_invalidate(self):
+		cache = PathCache()
+		cache.find_path(Point(0, 0), Point(5, 0), self.grid)
+		for i in xrange(self.grid.MAX_CHANGES + 1):
+			self.grid.add((9, 1), 2.0 - i % 2)
+		cache.find_path(Point(0, 0), Point(5, 0), self.grid)
+		self.assertEqual(0, cache.hits)
+
+	def test_unchanged_grid_keeps_generation(self):
+		generation = self.grid.generation
+		self.grid.add((0, 0))
+		self.grid.remove((20, 20))
+		self.assertEqual(generation, self.grid.generation)
+
+	def test_lru(self):
+		cache = PathCache(size=2)
+		cache.find_path(Point(0, 0), Point(9, 0), self.grid)
+		cache.find_path(Point(0, 0), Point(8, 0), self.grid)
+		cache.find_path(Point(0, 0), Point(9, 0), self.grid) # hit, now most recently used
+		cache.find_path(Point(0, 0), Point(7, 0), self.grid) # evicts (8, 0)
+		self.assertEqual(2, len(cache))
+
+		cache.find_path(Point(0, 0), Point(9, 0), self.grid)
+		self.assertEqual(2, cache.hits)
+		cache.find_path(Point(0, 0), Point(8, 0), self.grid)
+		self.assertEqual(2, cache.hits)
+
+	def test_unsupported_shape(self):
+		cache = PathCache()
+		expected = GridFindPath()(Point(0, 0), Circle(Point(8, 1), 1), self.grid)
+		self.assertEqual(expected, cache.find_path(Point(0, 0), Circle(Point(8, 1), 1), self.grid))
+		self.assertEqual(0, len(cache))
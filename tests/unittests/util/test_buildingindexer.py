@@ -0,0 +1,137 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import logging
+import random
+import time
+import unittest
+
+from horizons.util.buildingindexer import ArrayBuildingIndexer, BuildingIndexer
+from horizons.util.shapes import Rect
+
+
+log = logging.getLogger(__name__)
+
+
+class Building(object):
+	def __init__(self, x, y, width, height):
+		self.position = Rect.init_from_topleft_and_size(x, y, width, height)
+
+	def __repr__(self):
+		return 'Building(%s)' % self.position
+
+
+def create_map(rng, size):
+	"""Returns the coords of a roughly round island."""
+	center = size // 2
+	return [(x, y) for x in xrange(size) for y in xrange(size)
+	        if (x - center) ** 2 + (y - center) ** 2 <= center ** 2 + rng.randint(-20, 20)]
+
+
+def create_buildings(rng, coords_list, num):
+	buildings = {}
+	for coords in rng.sample(coords_list, num):
+		size = rng.choice((1, 1, 1, 2, 3))
+		buildings[coords] = Building(coords[0], coords[1], size, size)
+	return sorted(buildings.values(), key=lambda b: (b.position.left, b.position.top))
+
+
+class TestArrayBuildingIndexer(unittest.TestCase):
+
+	def _assert_same(self, old, new, coords_list, rng):
+		for coords in rng.sample(coords_list, 100) + [(-50, -50)]:
+			self.assertEqual(list(old.get_buildings_in_range(coords)), list(new.get_buildings_in_range(coords)))
+			self.assertEqual(old.get_num_buildings_in_range(coords), new.get_num_buildings_in_range(coords))
+			self.assertEqual(old.get_random_building_in_range(coords), new.get_random_building_in_range(coords))
+
+	def test_same_results_as_building_indexer(self):
+		rng = random.Random(7)
+		coords_list = create_map(rng, 40)
+		buildings = create_buildings(rng, coords_list, 150)
+		initial, later = buildings[:100], buildings[100:]
+
+		for radius in (0, 1, 6, 12):
+			old = BuildingIndexer(radius, coords_list, random.Random(1), initial)
+			new = ArrayBuildingIndexer(radius, coords_list, random.Random(1), initial)
+			self._assert_same(old, new, coords_list, rng)
+
+			for building in later:
+				old.add(building)
+				new.add(building)
+			for building in rng.sample(buildings, 60):
+				old.remove(building)
+				new.remove(building)
+			self._assert_same(old, new, coords_list, rng)
+
+	def test_add_and_remove_before_update(self):
+		coords_list = [(x, y) for x in xrange(10) for y in xrange(10)]
+		building = Building(2, 2, 2, 2)
+		indexer = ArrayBuildingIndexer(3, coords_list, random.Random(1))
+		indexer.add(building)
+		indexer.remove(building)
+		self.assertEqual(0, indexer.get_num_buildings_in_range((2, 2)))
+		indexer.add(building)
+		self.assertEqual([building], list(indexer.get_buildings_in_range((6, 3))))
+		self.assertEqual(building, indexer.get_random_building_in_range((5, 5)))
+		self.assertEqual(None, indexer.get_random_building_in_range((7, 3)))
+		self.assertEqual(None, indexer.get_num_buildings_in_range((20, 3)))
+
+
+class TestBuildingIndexerBenchmark(unittest.TestCase):
+	"""Compares both indexers on a large island with many trees, like the tree indexer of
+	a big island with a wild animal population."""
+
+	SIZE = 200
+	NUM_BUILDINGS = 3000
+	RADIUS = 6
+
+	def test_benchmark(self):
+		rng = random.Random(3)
+		coords_list = create_map(rng, self.SIZE)
+		buildings = create_buildings(rng, coords_list, self.NUM_BUILDINGS)
+		initial, later = buildings[:self.NUM_BUILDINGS // 2], buildings[self.NUM_BUILDINGS // 2:]
+		queries = [rng.choice(coords_list) for i in xrange(2000)]
+
+		for cls in (BuildingIndexer, ArrayBuildingIndexer):
+			start = time.time()
+			indexer = cls(self.RADIUS, coords_list, random.Random(1), initial)
+			create_time = time.time() - start
+
+			start = time.time()
+			for i, building in enumerate(later):
+				indexer.add(building)
+				# simulate a query every few changes, like animals looking for food
+				if i % 10 == 0:
+					indexer.get_random_building_in_range(queries[i])
+			update_time = time.time() - start
+
+			start = time.time()
+			for coords in queries:
+				for j in xrange(5):
+					indexer.get_num_buildings_in_range(coords)
+					indexer.get_random_building_in_range(coords)
+			query_time = time.time() - start
+
+			log.info('%s: creation %.3fs, updates %.3fs, queries %.3fs',
+			         cls.__name__, create_time, update_time, query_time)
+
+	test_benchmark.long = True
@@ -0,0 +1,99 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from horizons.util.loaders.directoryindexcache import DirectoryIndexCache
+
+
+class TestDirectoryIndexCache(TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.root = os.path.join(self.directory, 'gfx')
+		os.makedirs(os.path.join(self.root, 'as_a', 'idle'))
+		self.calls = 0
+		self.patchers = [patch.object(DirectoryIndexCache, 'cache_filename', os.path.join(self.directory, 'index.cache')),
+		                 patch.object(DirectoryIndexCache, 'cache', None)]
+		for patcher in self.patchers:
+			patcher.start()
+		# make the directories look old, recent mtimes are never trusted
+		self._age_directories()
+
+	def tearDown(self):
+		for patcher in self.patchers:
+			patcher.stop()
+		shutil.rmtree(self.directory)
+
+	def _age_directories(self):
+		for path, dirnames, filenames in os.walk(self.root):
+			os.utime(path, (1000000000, 1000000000))
+
+	def load(self, directory):
+		self.calls += 1
+		return sorted(os.path.relpath(path, directory) for path, dirnames, filenames in os.walk(directory))
+
+	def _reopen(self):
+		"""Simulate a new start."""
+		DirectoryIndexCache.cache = None
+
+	def test_cached(self):
+		data = DirectoryIndexCache.get(self.root, self.load)
+		self.assertEqual(['.', 'as_a', os.path.join('as_a', 'idle')], data)
+		self._reopen()
+		self.assertEqual(data, DirectoryIndexCache.get(self.root, self.load))
+		self.assertEqual(1, self.calls)
+
+	def test_changed_directory(self):
+		DirectoryIndexCache.get(self.root, self.load)
+		os.mkdir(os.path.join(self.root, 'as_a', 'idle', '45'))
+		os.utime(os.path.join(self.root, 'as_a', 'idle'), (1000000001, 1000000001))
+		self._reopen()
+		data = DirectoryIndexCache.get(self.root, self.load)
+		self.assertIn(os.path.join('as_a', 'idle', '45'), data)
+		self.assertEqual(2, self.calls)
+
+	def test_recent_change(self):
+		os.mkdir(os.path.join(self.root, 'as_b'))
+		DirectoryIndexCache.get(self.root, self.load)
+		self._reopen()
+		DirectoryIndexCache.get(self.root, self.load)
+		self.assertEqual(2, self.calls)
+
+		self._age_directories()
+		DirectoryIndexCache.get(self.root, self.load)
+		self._reopen()
+		DirectoryIndexCache.get(self.root, self.load)
+		self.assertEqual(3, self.calls)
+
+	def test_version(self):
+		DirectoryIndexCache.get(self.root, self.load)
+		self._reopen()
+		with patch.object(DirectoryIndexCache, 'version', DirectoryIndexCache.version + 1):
+			DirectoryIndexCache.get(self.root, self.load)
+		self.assertEqual(2, self.calls)
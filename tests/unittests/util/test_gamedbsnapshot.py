@@ -0,0 +1,98 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from horizons.util.dbreader import DbReader
+from horizons.util.gamedbsnapshot import GameDbSnapshot
+
+
+class TestGameDbSnapshot(TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.files = (os.path.join(self.directory, 'a.sql'), os.path.join(self.directory, 'b.sql'))
+		self._write(self.files[0], "CREATE TABLE resource (id INTEGER PRIMARY KEY, name TEXT);\n"
+		                           "CREATE INDEX resource_name ON resource(name);\n"
+		                           "INSERT INTO resource VALUES (1, 'wood');\n"
+		                           "INSERT INTO resource VALUES (4, 'tools');\n")
+		self._write(self.files[1], "CREATE TABLE name (name TEXT);\n"
+		                           "INSERT INTO name VALUES ('a');\n"
+		                           "INSERT INTO name VALUES ('b');\n"
+		                           "DELETE FROM name WHERE name = 'a';\n")
+		self.patcher = patch.object(GameDbSnapshot, 'filename', os.path.join(self.directory, 'snapshot.sqlite'))
+		self.patcher.start()
+
+	def tearDown(self):
+		self.patcher.stop()
+		shutil.rmtree(self.directory)
+
+	def _write(self, filename, content):
+		with open(filename, 'w') as f:
+			f.write(content)
+
+	def _load(self):
+		db = DbReader(':memory:')
+		return db, GameDbSnapshot.load(db, self.files)
+
+	def _dump(self, db):
+		return list(db.connection.iterdump())
+
+	def test_missing_snapshot(self):
+		db, loaded = self._load()
+		self.assertFalse(loaded)
+		self.assertEqual([], db("SELECT name FROM sqlite_master"))
+
+	def test_same_content(self):
+		expected = DbReader(':memory:')
+		GameDbSnapshot.execute_files(expected, self.files)
+		self.assertTrue(GameDbSnapshot.save(self.files))
+
+		db, loaded = self._load()
+		self.assertTrue(loaded)
+		self.assertEqual(self._dump(expected), self._dump(db))
+		self.assertEqual([(2, )], db("SELECT rowid FROM name WHERE name = 'b'"))
+		self.assertEqual([], db("PRAGMA database_list")[1:])
+
+	def test_changed_file(self):
+		GameDbSnapshot.save(self.files)
+		self._write(self.files[1], "CREATE TABLE name (name TEXT);\n")
+		db, loaded = self._load()
+		self.assertFalse(loaded)
+		self.assertEqual([], db("SELECT name FROM sqlite_master"))
+
+		GameDbSnapshot.save(self.files)
+		db, loaded = self._load()
+		self.assertTrue(loaded)
+		self.assertEqual([], db("SELECT * FROM name"))
+
+	def test_broken_snapshot(self):
+		self._write(GameDbSnapshot.filename, 'no database')
+		db, loaded = self._load()
+		self.assertFalse(loaded)
+		self.assertEqual([], db("SELECT name FROM sqlite_master"))
@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import random
+from unittest import TestCase
+
+from horizons.util.maxrects import MaxRectsBin
+
+
+class TestMaxRectsBin(TestCase):
+
+	def _check(self, packer, rects):
+		"""Check that the rects are inside the area and don't overlap each other or free space."""
+		for (x, y, w, h) in rects + packer.free_rects:
+			self.assertTrue(0 <= x and 0 <= y and x + w <= packer.width and y + h <= packer.height)
+		for i, (x, y, w, h) in enumerate(rects):
+			for (x2, y2, w2, h2) in rects[i + 1:] + packer.free_rects:
+				self.assertTrue(x + w <= x2 or x2 + w2 <= x or y + h <= y2 or y2 + h2 <= y)
+
+	def test_exact_fit(self):
+		packer = MaxRectsBin(64, 64)
+		rects = []
+		for _ in xrange(16):
+			x, y = packer.insert(16, 16)
+			rects.append((x, y, 16, 16))
+		self._check(packer, rects)
+		self.assertEqual(1.0, packer.occupancy)
+		self.assertEqual([], packer.free_rects)
+		self.assertIsNone(packer.insert(1, 1))
+
+	def test_too_large(self):
+		packer = MaxRectsBin(64, 32)
+		self.assertIsNone(packer.insert(65, 1))
+		self.assertIsNone(packer.insert(1, 33))
+		self.assertEqual((0, 0), packer.insert(64, 32))
+
+	def test_random(self):
+		rng = random.Random(42)
+		packer = MaxRectsBin(256, 256)
+		rects = []
+		for _ in xrange(200):
+			w, h = rng.randint(1, 64), rng.randint(1, 64)
+			position = packer.insert(w, h)
+			if position is not None:
+				rects.append(position + (w, h))
+		self._check(packer, rects)
+		self.assertEqual(sum(w * h for (x, y, w, h) in rects), packer.used_area)
+		self.assertGreater(packer.occupancy, 0.8)
+
+	def test_remove(self):
+		packer = MaxRectsBin(64, 64)
+		rects = [packer.insert(32, 32) + (32, 32) for _ in xrange(4)]
+		self.assertIsNone(packer.insert(32, 32))
+
+		packer.remove(*rects[2])
+		self.assertEqual(0.75, packer.occupancy)
+		self.assertEqual(rects[2][:2], packer.insert(32, 32))
+		packer.remove(*rects[0])
+		packer.remove(*rects[1])
+		rects = rects[2:]
+		self.assertIsNone(packer.insert(64, 33))
+		rects.append(packer.insert(64, 32) + (64, 32))
+		self._check(packer, rects)
@@ -0,0 +1,103 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from mock import patch
+
+from horizons.util.previewcache import PreviewCache
+
+
+class TestPreviewCache(TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, 'map.sqlite')
+		self._write(self.filename, 'content')
+		PreviewCache.close()
+		self.patcher = patch.object(PreviewCache, 'filename', os.path.join(self.directory, 'previews.sqlite'))
+		self.patcher.start()
+
+	def tearDown(self):
+		PreviewCache.close()
+		self.patcher.stop()
+		shutil.rmtree(self.directory)
+
+	def _write(self, filename, content, mtime=None):
+		with open(filename, 'w') as f:
+			f.write(content)
+		if mtime is not None:
+			os.utime(filename, (mtime, mtime))
+
+	def test_miss(self):
+		self.assertIsNone(PreviewCache.get(self.filename, PreviewCache.MINIMAP, (128, 128)))
+		self.assertIsNone(PreviewCache.get(os.path.join(self.directory, 'missing'), PreviewCache.MINIMAP))
+
+	def test_set_and_get(self):
+		self.assertTrue(PreviewCache.set(self.filename, PreviewCache.MINIMAP, '[[1, 2, 3, 4, 5]]', (128, 128)))
+		self.assertTrue(PreviewCache.set(self.filename, PreviewCache.SCREENSHOT, ''))
+		self.assertEqual('[[1, 2, 3, 4, 5]]', PreviewCache.get(self.filename, PreviewCache.MINIMAP, (128, 128)))
+		self.assertEqual('', PreviewCache.get(self.filename, PreviewCache.SCREENSHOT))
+		# other sizes are different previews
+		self.assertIsNone(PreviewCache.get(self.filename, PreviewCache.MINIMAP, (64, 64)))
+
+		# the cache persists
+		PreviewCache.close()
+		self.assertEqual('', PreviewCache.get(self.filename, PreviewCache.SCREENSHOT))
+
+	def test_keyed_by_content(self):
+		PreviewCache.set(self.filename, PreviewCache.SCREENSHOT, 'png')
+		copy = os.path.join(self.directory, 'copy.sqlite')
+		shutil.copy(self.filename, copy)
+		# the copy is unknown until it has been hashed
+		self.assertIsNone(PreviewCache.get(copy, PreviewCache.SCREENSHOT))
+		self.assertEqual(PreviewCache.get_hash(self.filename), PreviewCache.get_hash(copy))
+		self.assertEqual('png', PreviewCache.get(copy, PreviewCache.SCREENSHOT))
+
+	def test_changed_file(self):
+		mtime = time.time() - 100
+		self._write(self.filename, 'content', mtime)
+		PreviewCache.set(self.filename, PreviewCache.SCREENSHOT, 'png')
+		self._write(self.filename, 'changed', mtime + 1)
+		self.assertIsNone(PreviewCache.get(self.filename, PreviewCache.SCREENSHOT))
+
+		# changing it back makes the old preview valid again
+		self._write(self.filename, 'content', mtime + 2)
+		PreviewCache.get_hash(self.filename)
+		self.assertEqual('png', PreviewCache.get(self.filename, PreviewCache.SCREENSHOT))
+
+	def test_prune(self):
+		PreviewCache.set(self.filename, PreviewCache.SCREENSHOT, 'png')
+		other = os.path.join(self.directory, 'other.sqlite')
+		self._write(other, 'other')
+		PreviewCache.set(other, PreviewCache.SCREENSHOT, 'other png')
+		os.unlink(other)
+		PreviewCache.prune()
+
+		db = PreviewCache._get_db()
+		self.assertEqual(1, db("SELECT count(*) FROM file")[0][0])
+		self.assertEqual(1, db("SELECT count(*) FROM preview")[0][0])
+		self.assertEqual('png', PreviewCache.get(self.filename, PreviewCache.SCREENSHOT))
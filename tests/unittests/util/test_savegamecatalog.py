@@ -0,0 +1,151 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from mock import patch
+
+from horizons.util.dbreader import DbReader
+from horizons.util.savegamecatalog import SavegameCatalog
+
+
+class TestSavegameCatalog(TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.save_dir = os.path.join(self.directory, 'save')
+		os.mkdir(self.save_dir)
+		SavegameCatalog.close()
+		self.patcher = patch.object(SavegameCatalog, 'filename', os.path.join(self.directory, 'savegames.sqlite'))
+		self.patcher.start()
+
+	def tearDown(self):
+		SavegameCatalog.close()
+		self.patcher.stop()
+		shutil.rmtree(self.directory)
+
+	def _create_savegame(self, name, timestamp, players=2, screenshot=True):
+		path = os.path.join(self.save_dir, name + '.sqlite')
+		db = DbReader(path)
+		db.execute_script("""
+			CREATE TABLE metadata (name TEXT, value TEXT);
+			CREATE TABLE metadata_blob (name TEXT, value BLOB);
+			CREATE TABLE player (rowid INTEGER PRIMARY KEY, is_trader INTEGER, is_pirate INTEGER);
+		""")
+		for key, value in (('timestamp', timestamp), ('savecounter', 3), ('savegamerev', 75),
+		                   ('map_name', 'development')):
+			db("INSERT INTO metadata VALUES(?, ?)", key, value)
+		for i in xrange(players):
+			db("INSERT INTO player(is_trader, is_pirate) VALUES(0, 0)")
+		db("INSERT INTO player(is_trader, is_pirate) VALUES(1, 0)")
+		if screenshot:
+			db("INSERT INTO metadata_blob VALUES(?, ?)", 'screen', 'png')
+		db.close()
+		return path
+
+	def _set_old_mtime(self, path, age=100):
+		mtime = time.time() - age
+		os.utime(path, (mtime, mtime))
+
+	def _get_entries(self):
+		entries = SavegameCatalog.get_entries(self.save_dir, 'sqlite')
+		return dict((os.path.basename(entry['path']), entry) for entry in entries)
+
+	def test_entries(self):
+		self._create_savegame('a', 1000.5, players=3)
+		self._create_savegame('b', 2000, screenshot=False)
+		entries = self._get_entries()
+
+		self.assertEqual(['a.sqlite', 'b.sqlite'], sorted(entries))
+		a = entries['a.sqlite']
+		self.assertEqual((1000.5, 3, 75, 3, 'development', True, None),
+		                 tuple(a[key] for key in ('timestamp', 'savecounter', 'savegamerev', 'players',
+		                                          'map_name', 'has_screenshot', 'hash')))
+		self.assertFalse(entries['b.sqlite']['has_screenshot'])
+		self.assertEqual(os.path.getmtime(os.path.join(self.save_dir, 'a.sqlite')), a['mtime'])
+
+		# the catalog persists
+		SavegameCatalog.close()
+		self.assertEqual(entries, self._get_entries())
+
+	def test_unchanged_files_are_not_read(self):
+		self._create_savegame('a', 1000)
+		self._create_savegame('b', 2000)
+		self._get_entries()
+
+		with patch.object(SavegameCatalog, 'read_entry', wraps=SavegameCatalog.read_entry) as read_entry:
+			# the directory has been changed recently, it is scanned but the files aren't read
+			self._create_savegame('c', 3000)
+			self.assertEqual(['a.sqlite', 'b.sqlite', 'c.sqlite'], sorted(self._get_entries()))
+			self.assertEqual(1, read_entry.call_count)
+
+			os.unlink(os.path.join(self.save_dir, 'a.sqlite'))
+			self.assertEqual(['b.sqlite', 'c.sqlite'], sorted(self._get_entries()))
+			self.assertEqual(1, read_entry.call_count)
+
+			# a changed file is read again
+			path = self._create_savegame('d', 4000)
+			self._get_entries()
+			os.unlink(path)
+			self._create_savegame('d', 5000, players=4)
+			self.assertEqual(5000, self._get_entries()['d.sqlite']['timestamp'])
+			self.assertEqual(3, read_entry.call_count)
+
+	def test_unchanged_directory_is_not_scanned(self):
+		self._create_savegame('a', 1000)
+		self._set_old_mtime(self.save_dir)
+		self._get_entries()
+
+		with patch('glob.glob') as glob_mock:
+			self.assertEqual(['a.sqlite'], sorted(self._get_entries()))
+			self.assertFalse(glob_mock.called)
+
+			self._create_savegame('b', 2000)
+			self._get_entries()
+			self.assertTrue(glob_mock.called)
+
+	def test_add(self):
+		path = self._create_savegame('a', 1000)
+		db = DbReader(path)
+		SavegameCatalog.add(path, SavegameCatalog.read_entry(db))
+		db.close()
+		self._set_old_mtime(self.save_dir)
+
+		with patch.object(SavegameCatalog, 'read_entry') as read_entry:
+			entry = self._get_entries()['a.sqlite']
+			self.assertFalse(read_entry.called)
+		self.assertEqual(1000, entry['timestamp'])
+		self.assertEqual(os.path.getmtime(path), entry['mtime'])
+
+	def test_hash(self):
+		path = self._create_savegame('a', 1000)
+		self.assertIsNone(SavegameCatalog.get_hash(path))
+		self._get_entries()
+		with open(path, 'rb') as f:
+			expected = hashlib.sha1(f.read()).hexdigest()
+		self.assertEqual(expected, SavegameCatalog.get_hash(path))
+		self.assertEqual(expected, self._get_entries()['a.sqlite']['hash'])
@@ -0,0 +1,88 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import tempfile
+from unittest import TestCase
+
+from horizons.util.dbreader import DbReader
+from horizons.util.savegamewriter import SavegameWriter
+
+
+class TestSavegameWriter(TestCase):
+
+	def setUp(self):
+		fd, self.filename = tempfile.mkstemp()
+		os.close(fd)
+		self.db = SavegameWriter(self.filename)
+		self.db.execute_script("""
+			CREATE TABLE unit (id INTEGER, owner INTEGER);
+			CREATE TABLE "storage" (object INTEGER, resource INTEGER, amount INTEGER);
+		""")
+
+	def tearDown(self):
+		self.db.close()
+		os.unlink(self.filename)
+
+	def _read(self, command):
+		reader = DbReader(self.filename)
+		result = reader(command)
+		reader.close()
+		return result
+
+	def test_inserts_are_collected(self):
+		self.db("BEGIN")
+		self.db("INSERT INTO unit VALUES(?, ?)", 1, 2)
+		self.db("INSERT INTO \"storage\" (object, resource, amount) VALUES(?, ?, ?)", 1, 6, 10)
+		self.assertEqual(0, self.db.cur.execute("SELECT count(*) FROM unit").fetchone()[0])
+
+		# other statements see the collected rows
+		self.assertEqual([(1, )], self.db("SELECT count(*) FROM unit"))
+		self.db("COMMIT")
+		self.assertEqual({'unit': 1, 'storage': 1}, self.db.row_counts)
+		self.assertEqual([(1, 6, 10)], self._read("SELECT * FROM storage"))
+
+	def test_update_after_insert(self):
+		self.db("BEGIN")
+		self.db("INSERT INTO unit VALUES(?, ?)", 1, 2)
+		self.db("UPDATE unit SET owner = ? WHERE id = ?", 3, 1)
+		self.db("COMMIT")
+		self.assertEqual([(1, 3)], self._read("SELECT * FROM unit"))
+
+	def test_order_of_rowids(self):
+		self.db("BEGIN")
+		for i in xrange(5):
+			self.db("INSERT INTO unit VALUES(?, ?)", i, 0)
+			self.db("INSERT INTO unit(id, owner) VALUES(?, ?)", i + 100, 1)
+			self.db("INSERT INTO storage VALUES(?, ?, ?)", i, i, i)
+		self.db("COMMIT")
+		expected = [(rowid + 1, ) + row for (rowid, row) in
+		            enumerate(row for i in xrange(5) for row in ((i, 0), (i + 100, 1)))]
+		self.assertEqual(expected, self._read("SELECT rowid, id, owner FROM unit ORDER BY rowid"))
+		self.assertEqual({'unit': 10, 'storage': 5}, self.db.row_counts)
+
+	def test_close_discards_rows(self):
+		self.db("BEGIN")
+		self.db("INSERT INTO unit VALUES(?, ?)", 1, 2)
+		self.db.close()
+		self.assertEqual([], self._read("SELECT * FROM unit"))
+		self.db = SavegameWriter(self.filename)
@@ -0,0 +1,79 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+import unittest
+
+from horizons.util.shapes import Circle, Point, Rect
+from horizons.util.spatialindex import SpatialIndex
+
+
+class Obj(object):
+	def __init__(self, point):
+		self.point = point
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+	def test_same_results_as_linear_search(self):
+		rng = random.Random(5)
+		index = SpatialIndex(cell_size=4)
+		objects = [] # maintained like World.ships
+		for i in xrange(300):
+			action = rng.random()
+			if action < 0.3 or not objects:
+				obj = Obj(Point(rng.randint(0, 60), rng.randint(0, 60)))
+				objects.append(obj)
+				index.add(obj, obj.point)
+			elif action < 0.4:
+				obj = rng.choice(objects)
+				objects.remove(obj)
+				index.remove(obj)
+			else:
+				obj = rng.choice(objects)
+				obj.point = Point(obj.point.x + rng.randint(-1, 1), obj.point.y + rng.randint(-1, 1))
+				index.move(obj, obj.point)
+
+			center = Point(rng.randint(-5, 65), rng.randint(-5, 65))
+			radius = rng.choice((0, 1, 2.5, 7, 15, 100))
+			circle = Circle(center, radius)
+			self.assertEqual([o for o in objects if circle.contains(o.point)],
+			                 index.get_in_radius(center, radius))
+
+			rect = Rect.init_from_topleft_and_size(rng.randint(-5, 60), rng.randint(-5, 60),
+			                                       rng.randint(0, 20), rng.randint(0, 20))
+			self.assertEqual([o for o in objects if rect.contains(o.point)], index.get_in_rect(rect))
+		self.assertEqual(len(objects), len(index))
+
+	def test_move_between_cells(self):
+		index = SpatialIndex(cell_size=8)
+		obj = Obj(Point(7, 7))
+		index.add(obj, obj.point)
+		self.assertEqual([obj], index.get_in_radius(Point(5, 5), 3))
+
+		index.move(obj, Point(8, 8))
+		self.assertEqual([], index.get_in_radius(Point(5, 5), 3))
+		self.assertEqual([obj], index.get_in_rect(Rect.init_from_borders(8, 8, 8, 8)))
+
+		index.remove(obj)
+		self.assertFalse(obj in index)
+		self.assertEqual([], index.get_in_rect(Rect.init_from_borders(0, 0, 100, 100)))
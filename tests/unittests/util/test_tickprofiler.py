@@ -0,0 +1,98 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from horizons.constants import GAME
+from horizons.scheduler import Scheduler
+from horizons.util.python.callback import Callback
+from horizons.util.tickprofiler import TickProfiler, get_callback_target
+
+
+class Producer(object):
+	def tick(self):
+		pass
+
+
+class TestTickProfiler(TestCase):
+
+	def setUp(self):
+		self.producer = Producer()
+		with patch.object(GAME, 'PROFILE_TICKS', 3):
+			Scheduler.create_instance(Mock())
+		self.scheduler = Scheduler()
+		self.profiler = self.scheduler.profiler
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+
+	def test_callback_target(self):
+		self.scheduler.add_new_object(self.producer.tick, self.producer)
+		self.scheduler.add_new_object(Callback(self.producer.tick), self.producer)
+		targets = [get_callback_target(cb) for cb in self.scheduler.calls_by_instance[self.producer]]
+		self.assertEqual([('Producer', 'tick')] * 2, targets)
+
+	def test_records_ticks_in_ring_buffer(self):
+		self.scheduler.before_ticking()
+		self.scheduler.add_new_object(self.producer.tick, self.producer, run_in=1, loops=-1)
+		self.scheduler.add_new_object(lambda: None, None, run_in=2)
+		for tick in xrange(5):
+			self.scheduler.tick(tick)
+
+		self.assertEqual([2, 3, 4], [t[0] for t in self.profiler.ticks])
+		self.assertEqual(1, self.profiler.last_tick[2])
+
+		top = self.profiler.get_top_targets()
+		self.assertEqual(set([('Producer', 'tick', 5), ('NoneType', '<lambda>', 1)]),
+		                 set((cls, func, calls) for (cls, func, calls, seconds) in top))
+
+	def test_no_profiler_by_default(self):
+		Scheduler.destroy_instance()
+		Scheduler.create_instance(Mock())
+		self.assertIsNone(Scheduler().profiler)
+
+	def test_dump(self):
+		self.scheduler.before_ticking()
+		self.scheduler.add_new_object(self.producer.tick, self.producer, run_in=1)
+		self.scheduler.tick(0)
+
+		fd, filename = tempfile.mkstemp()
+		os.close(fd)
+		try:
+			self.profiler.dump_json(filename)
+			with open(filename) as f:
+				data = json.load(f)
+			self.assertEqual(1, len(data['ticks']))
+			self.assertEqual('tick', data['targets'][0]['function'])
+
+			self.profiler.dump_csv(filename)
+			with open(filename) as f:
+				lines = f.read().splitlines()
+			self.assertEqual('tick,duration_ms,callbacks', lines[0])
+			self.assertEqual(2, len(lines))
+		finally:
+			os.remove(filename)
@@ -0,0 +1,186 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import random
+import sys
+import time
+
+from tests.unittests import TestCase
+
+from horizons.world.buildability.binarycache import BinaryBuildabilityCache
+from horizons.world.buildability.bitgrid import BitGrid, get_grid_geometry
+from horizons.world.buildability.partialbinarycache import PartialBinaryBuildabilityCache
+from horizons.world.buildability.terraincache import TerrainBuildabilityCache, TerrainRequirement
+
+
+log = logging.getLogger(__name__)
+
+
+class MockTerrainBuildabilityCache(object):
+	sizes = TerrainBuildabilityCache.sizes
+
+	def __init__(self, land_or_coast):
+		self.land_or_coast = land_or_coast
+
+
+class MockTile(object):
+	def __init__(self, classes):
+		self.classes = classes
+
+
+class MockIsland(object):
+	def __init__(self, ground_map):
+		self.ground_map = ground_map
+
+
+def get_rect_coords(x, y, width, height):
+	return [(x + dx, y + dy) for dx in xrange(width) for dy in xrange(height)]
+
+
+def get_random_shape(rng, width, height, density):
+	return set((x, y) for x in xrange(width) for y in xrange(height) if rng.random() < density)
+
+
+def get_origins(area, size, partly):
+	"""Brute force version of the caches: origins of rectangles that are entirely or partly in area."""
+	width, height = size
+	result = set()
+	for (x, y) in area:
+		for (ox, oy) in get_rect_coords(x - width + 1, y - height + 1, width, height):
+			if partly or all(coords in area for coords in get_rect_coords(ox, oy, width, height)):
+				result.add((ox, oy))
+	return result
+
+
+class TestBitGrid(TestCase):
+	def test_set_operations(self):
+		coords_list = [(3, 4), (10, 4), (70, 4), (3, 9), (-2, 5)]
+		geometry = get_grid_geometry(coords_list)
+		grid = BitGrid.from_coords(geometry, coords_list)
+
+		self.assertEquals(len(grid), 5)
+		self.assertEquals(grid, set(coords_list))
+		self.assertEquals(list(grid), sorted(coords_list, key=lambda (x, y): (y, x)))
+		self.assertTrue((70, 4) in grid)
+		for coords in [(4, 4), (71, 4), (3, 100), (-100, 4), (3, -100)]:
+			self.assertFalse(coords in grid)
+
+		other = BitGrid.from_coords(geometry, [(3, 4), (3, 9), (4, 9)])
+		self.assertEquals(grid.intersection(other), set([(3, 4), (3, 9)]))
+		self.assertEquals(grid.intersection(set([(70, 4), (0, 0)])), set([(70, 4)]))
+		self.assertEquals(grid.union([(0, 0)]), set(coords_list + [(0, 0)]))
+
+		grid.remove([(3, 4), (10, 4), (70, 4)])
+		self.assertEquals(grid, set([(3, 9), (-2, 5)]))
+		grid.remove([(3, 9), (-2, 5)])
+		self.assertFalse(grid)
+		self.assertRaises(TypeError, hash, grid)
+
+
+class TestBitGridCaches(TestCase):
+	"""Compares the caches with the brute force results after random changes."""
+
+	def _check_cache(self, cache_class, partly):
+		rng = random.Random(4)
+		land_or_coast = get_random_shape(rng, 30, 25, 0.9)
+		terrain_cache = MockTerrainBuildabilityCache(land_or_coast)
+		cache = cache_class(terrain_cache)
+		area = set()
+		for i in xrange(8):
+			if i % 3 == 2:
+				removed = rng.sample(sorted(area), len(area) // 2)
+				cache.remove_area(removed)
+				area.difference_update(removed)
+			else:
+				added = [coords for coords in sorted(land_or_coast) if coords not in area and rng.random() < 0.5]
+				cache.add_area(added)
+				area.update(added)
+
+			self.assertEquals(cache.coords_set, area)
+			for size in cache.cache:
+				self.assertEquals(cache.cache[size], get_origins(area, size, partly), size)
+
+	def test_binary_cache(self):
+		self._check_cache(BinaryBuildabilityCache, False)
+
+	def test_partial_binary_cache(self):
+		self._check_cache(PartialBinaryBuildabilityCache, True)
+
+	def test_terrain_cache(self):
+		rng = random.Random(7)
+		land_or_coast = get_random_shape(rng, 40, 30, 0.95)
+		land = set(coords for coords in land_or_coast if rng.random() < 0.8)
+		ground_map = {}
+		for coords in land_or_coast:
+			ground_map[coords] = MockTile(['constructible'] if coords in land else ['coastline'])
+		ground_map[(50, 50)] = MockTile(['ocean'])
+		coast = land_or_coast - land
+
+		terrain_cache = TerrainBuildabilityCache(MockIsland(ground_map))
+		self.assertEquals(terrain_cache.land_or_coast, land_or_coast)
+
+		land_cache = terrain_cache.cache[TerrainRequirement.LAND]
+		for size in TerrainBuildabilityCache.sizes:
+			self.assertEquals(land_cache[size], get_origins(land, size, False))
+			self.assertEquals(land_cache[(size[1], size[0])], get_origins(land, (size[1], size[0]), False))
+
+		for size, coastal in terrain_cache.cache[TerrainRequirement.LAND_AND_COAST].iteritems():
+			expected = get_origins(land_or_coast, size, False).intersection(
+				get_origins(land, size, True), get_origins(coast, size, True))
+			self.assertEquals(coastal, expected)
+
+		buildability_cache = BinaryBuildabilityCache(terrain_cache)
+		buildability_cache.add_area(sorted(land_or_coast)[::2])
+		self.assertEquals(terrain_cache.get_buildability_intersection(TerrainRequirement.LAND, (2, 2), buildability_cache),
+		                  land_cache[(2, 2)].intersection(set(buildability_cache.cache[(2, 2)])))
+
+
+class TestBitGridBenchmark(TestCase):
+	"""Compares a BitGrid with the set of tuples that the caches used before."""
+
+	def test_benchmark(self):
+		coords_list = get_rect_coords(0, 0, 150, 150)
+		geometry = get_grid_geometry(coords_list)
+		for cls in (set, lambda coords: BitGrid.from_coords(geometry, coords)):
+			container = cls(coords_list)
+			size = sys.getsizeof(container) + sum(sys.getsizeof(item) for item in getattr(container, 'rows', container))
+
+			start = time.time()
+			for coords in coords_list:
+				coords in container
+			lookup_time = time.time() - start
+
+			log.info('%s with %d coords: %d bytes, %.3fs for all lookups',
+			         container.__class__.__name__, len(coords_list), size, lookup_time)
+
+		terrain_cache = MockTerrainBuildabilityCache(set(coords_list))
+		cache = BinaryBuildabilityCache(terrain_cache)
+		start = time.time()
+		cache.add_area(coords_list)
+		for x in xrange(0, 150, 5):
+			rect = get_rect_coords(x, x, 3, 3)
+			cache.remove_area(rect)
+			cache.add_area(rect)
+		log.info('BinaryBuildabilityCache: %.3fs to add 150x150 tiles and remove and readd 30 3x3 rects',
+		         time.time() - start)
+
+	test_benchmark.long = True
@@ -19,6 +19,9 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import random
+from collections import deque
+
 from tests.unittests import TestCase
 
 from horizons.world.buildability.connectedareacache import ConnectedAreaCache
@@ -59,3 +62,44 @@ class TestConnectedAreaCache(TestCase):
 
 		cache.remove_area([(1, 1), (1, 4)])
 		self.assertEquals(0, len(cache.areas))
+
+	@classmethod
+	def _get_areas(cls, coords_set):
+		"""Brute force version of the cache: the connected parts of coords_set."""
+		areas = []
+		remaining = set(coords_set)
+		while remaining:
+			seed = remaining.pop()
+			area = set([seed])
+			queue = deque([seed])
+			while queue:
+				(x, y) = queue.popleft()
+				for coords in [(x - 1, y), (x, y - 1), (x, y + 1), (x + 1, y)]:
+					if coords in remaining:
+						remaining.discard(coords)
+						area.add(coords)
+						queue.append(coords)
+			areas.append(frozenset(area))
+		return set(areas)
+
+	def test_random_changes(self):
+		rng = random.Random(3)
+		all_coords = [(x, y) for x in xrange(20) for y in xrange(20)]
+		cache = ConnectedAreaCache()
+		coords_set = set()
+		for i in xrange(300):
+			if rng.random() < 0.55:
+				added = rng.sample([coords for coords in all_coords if coords not in coords_set], rng.randint(1, 8))
+				cache.add_area(added)
+				coords_set.update(added)
+			elif coords_set:
+				removed = rng.sample(sorted(coords_set), min(len(coords_set), rng.randint(1, 8)))
+				cache.remove_area(removed)
+				coords_set.difference_update(removed)
+
+			expected_areas = self._get_areas(coords_set)
+			self.assertEquals(set(frozenset(area) for area in cache.areas.itervalues()), expected_areas)
+			for area_id, area in cache.areas.iteritems():
+				for coords in area:
+					self.assertEquals(cache.area_numbers[coords], area_id)
+			self.assertEquals(len(cache.area_numbers), len(coords_set))
@@ -0,0 +1,109 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.component.storagecomponent import StorageComponent
+from horizons.messaging import MessageBus, ResourceAvailable
+from horizons.world.providerhandler import ProviderHandler
+from horizons.world.storage import PositiveStorage
+
+
+class TestResourceAvailable(TestCase):
+
+	def setUp(self):
+		self.instance = Mock()
+		self.component = StorageComponent(PositiveStorage())
+		self.component.instance = self.instance
+		self.component.initialize()
+
+		self.cb = Mock()
+		ResourceAvailable.subscribe(self.cb, sender=self.instance)
+
+	def tearDown(self):
+		MessageBus().reset()
+
+	def get_resources(self):
+		self.assertEqual(self.cb.call_count, 1)
+		resources = self.cb.call_args[0][0].resources
+		self.cb.reset_mock()
+		return sorted(resources)
+
+	def test_increase(self):
+		self.component.inventory.alter(1, 5)
+		self.assertEqual(self.get_resources(), [1])
+		self.component.inventory.alter(1, 2)
+		self.assertEqual(self.get_resources(), [1])
+
+	def test_decrease(self):
+		self.component.inventory.alter(1, 5)
+		self.cb.reset_mock()
+		self.component.inventory.alter(1, -3)
+		self.assertFalse(self.cb.called)
+		self.component.inventory.reset(1)
+		self.assertFalse(self.cb.called)
+
+	def test_load(self):
+		# amounts that were there before initialize are not available again
+		component = StorageComponent(PositiveStorage())
+		component.inventory.alter(2, 3)
+		component.instance = self.instance
+		component.initialize()
+		component.inventory.alter(1, 1)
+		self.assertEqual(self.get_resources(), [1])
+
+
+class TestProviderHandlerJobBoard(TestCase):
+
+	def setUp(self):
+		self.providers = ProviderHandler()
+		self.generation = self.providers.availability_generation
+
+	def create_provider(self, *resources):
+		provider = Mock()
+		provider.provided_resources = resources
+		return provider
+
+	def test_append(self):
+		self.providers.append(self.create_provider(1, 2))
+		self.assertEqual(self.generation[1], 1)
+		self.assertEqual(self.generation[2], 1)
+		self.assertEqual(self.generation[3], 0)
+
+	def test_remove(self):
+		provider = self.create_provider(1)
+		self.providers.append(provider)
+		self.providers.remove(provider)
+		self.assertEqual(self.generation[1], 1)
+
+	def test_resources_available(self):
+		self.providers.resources_available([1, 1, 3])
+		self.assertEqual(self.generation[1], 2)
+		self.assertEqual(self.generation[3], 1)
+
+	def test_provider_changed(self):
+		self.providers.provider_changed(self.create_provider(4))
+		self.assertEqual(self.generation[4], 1)
+		# buildings that don't provide anything are ignored
+		self.providers.provider_changed(object())
+		self.assertEqual(dict(self.generation), {4: 1})
@@ -0,0 +1,82 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+from unittest import TestCase
+
+from mock import MagicMock
+
+from horizons.util.shapes import Rect
+from horizons.world.ground import Ground, GroundInstanceLoader
+
+
+class DummyGround(Ground):
+	id = 3
+	shape = 'straight'
+	_fife_objects = {'1': 'fife object'}
+
+
+class TestDeferredInstance(TestCase):
+
+	def setUp(self):
+		self.session = MagicMock()
+		self.layer = self.session.view.layers.__getitem__.return_value
+
+	def test_instance_on_access(self):
+		tile = DummyGround.create_deferred(self.session, 3, 4, '1', 45)
+		self.assertFalse(self.layer.createInstance.called)
+		tile.act(225)
+		self.assertFalse(self.layer.createInstance.called)
+
+		instance = tile._instance
+		self.assertIs(self.layer.createInstance.return_value, instance)
+		self.assertEqual('fife object', self.layer.createInstance.call_args[0][0])
+		instance.setRotation.assert_called_once_with(225)
+		self.assertIs(instance, tile._instance)
+		self.assertEqual(1, self.layer.createInstance.call_count)
+
+	def test_removed_instance(self):
+		tile = DummyGround.create_deferred(self.session, 3, 4, '1', 45)
+		tile._instance = None
+		self.assertIsNone(tile._instance)
+		self.assertFalse(self.layer.createInstance.called)
+
+
+class TestGroundInstanceLoader(TestCase):
+
+	def setUp(self):
+		self.session = MagicMock()
+		self.view = MagicMock()
+		self.view.get_displayed_area.return_value = Rect.init_from_borders(0, 0, 9, 9)
+		self.loader = GroundInstanceLoader(self.view)
+
+	def test_update(self):
+		near = DummyGround.create_deferred(self.session, 15, 3, '1', 45)
+		far = DummyGround.create_deferred(self.session, 100, 100, '1', 45)
+		self.loader.add_tiles([near, far])
+		self.loader.update()
+		self.assertIsNotNone(near._fife_instance)
+		self.assertIsNone(far._fife_instance)
+
+		self.view.get_displayed_area.return_value = Rect.init_from_borders(90, 90, 99, 99)
+		self.loader.update()
+		self.assertIsNotNone(far._fife_instance)
@@ -0,0 +1,85 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+from unittest import TestCase
+
+from horizons.world.seamap import FullMap, OpenSeaMap, SeaMap
+
+
+class Tile(object):
+	def __init__(self, session, x, y):
+		self.x = x
+		self.y = y
+
+
+class TestSeaMap(TestCase):
+
+	def setUp(self):
+		# map area from (-5, -5) to (14, 9), blocks start at -35
+		self.sea_map = SeaMap(None, Tile, -5, -5, 15, 10, (-35, -35))
+		self.ground_map = OpenSeaMap(self.sea_map)
+		self.full_map = FullMap(self.sea_map)
+		self.coords = set((x, y) for x in xrange(-5, 15) for y in xrange(-5, 10))
+
+	def test_keys(self):
+		self.assertEqual(self.coords, set(self.sea_map))
+		self.assertEqual(len(self.coords), len(self.sea_map))
+		self.assertIn((14, 9), self.sea_map)
+		self.assertNotIn((15, 9), self.sea_map)
+		self.assertNotIn((-6, 0), self.sea_map)
+		# keys don't create tiles
+		self.assertEqual(0, dict.__len__(self.sea_map))
+
+	def test_lazy_tiles(self):
+		tile = self.sea_map[(3, 4)]
+		self.assertIs(tile, self.sea_map[(3, 4)])
+		self.assertIs(tile, self.ground_map[(3, 4)])
+		self.assertIs(tile, self.full_map.get((3, 4)))
+		self.assertEqual(1, dict.__len__(self.sea_map))
+		self.assertRaises(KeyError, lambda: self.sea_map[(15, 0)])
+		self.assertIsNone(self.sea_map.get((15, 0)))
+
+	def test_block_position(self):
+		# same position as the instance of the block, see World.load_raw_map
+		self.assertEqual((-6, 4), (self.sea_map[(-5, -5)].x, self.sea_map[(-5, -5)].y))
+		self.assertEqual((4, 4), (self.sea_map[(5, 4)].x, self.sea_map[(5, 4)].y))
+		self.assertEqual((4, 14), (self.sea_map[(14, 9)].x, self.sea_map[(14, 9)].y))
+
+	def test_islands(self):
+		island_tile = Tile(None, 2, 2)
+		del self.ground_map[(2, 2)]
+		self.full_map[(2, 2)] = island_tile
+
+		self.assertNotIn((2, 2), self.ground_map)
+		self.assertIsNone(self.ground_map.get((2, 2)))
+		self.assertRaises(KeyError, lambda: self.ground_map[(2, 2)])
+		self.assertEqual(self.coords - set([(2, 2)]), set(self.ground_map))
+		self.assertEqual(len(self.coords) - 1, len(self.ground_map))
+
+		self.assertIs(island_tile, self.full_map[(2, 2)])
+		self.assertIsNot(island_tile, self.sea_map[(2, 2)])
+		self.assertEqual(self.coords, set(self.full_map))
+		self.assertEqual(len(self.coords), len(self.full_map))
+		self.assertEqual(island_tile, dict(self.full_map.iteritems())[(2, 2)])
+		self.assertNotIn((20, 20), self.full_map)
+		self.assertIsNone(self.full_map.get((20, 20)))
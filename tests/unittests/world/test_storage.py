@@ -19,13 +19,24 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import copy
+import logging
+import pickle
 import sys
+import time
+from collections import defaultdict
 from unittest import TestCase
 
+from mock import Mock
+
 from horizons.world.storage import (GenericStorage, SpecializedStorage, SizedSpecializedStorage,
                                     TotalStorage, GlobalLimitStorage, PositiveStorage,
-                                    PositiveTotalStorage, PositiveSizedSlotStorage,
-                                    PositiveSizedNumSlotStorage)
+                                    PositiveTotalStorage, PositiveTotalNumSlotsStorage,
+                                    PositiveSizedSlotStorage, PositiveSizedNumSlotStorage,
+                                    PositiveSizedSpecializedStorage, ResourceSlots)
+
+
+log = logging.getLogger(__name__)
 
 
 class TestGenericStorage(TestCase):
@@ -180,3 +191,148 @@ class TestOtherStorages(TestCase):
 		self.assertEqual(s.alter(3, 5), 0)
 
 		self.assertEqual(s.alter(4, 1), 1)
+
+
+class TestResourceSlots(TestCase):
+
+	def test_defaultdict_behaviour(self):
+		slots = ResourceSlots()
+		self.assertFalse(3 in slots)
+		self.assertEqual(slots.get(3), None)
+		self.assertEqual(slots.get(3, 0), 0)
+		self.assertEqual(slots[3], 0)
+		# reading created the slot
+		self.assertTrue(3 in slots)
+		self.assertEqual(len(slots), 1)
+
+	def test_set_and_delete(self):
+		slots = ResourceSlots()
+		slots[10] = 5
+		slots[2] = -3
+		slots.add(2, 4)
+		slots.add(7, 1)
+		self.assertEqual(slots.items(), [(2, 1), (7, 1), (10, 5)])
+		self.assertEqual(len(slots), 3)
+
+		del slots[7]
+		self.assertFalse(7 in slots)
+		self.assertEqual(len(slots), 2)
+		self.assertRaises(KeyError, slots.__delitem__, 7)
+		self.assertRaises(KeyError, slots.__delitem__, 100)
+		self.assertFalse(100 in slots)
+
+	def test_dict_interface(self):
+		slots = ResourceSlots({4: 2, 1: 0})
+		self.assertEqual(slots.keys(), [1, 4])
+		self.assertEqual(slots.values(), [0, 2])
+		self.assertEqual(list(slots), [1, 4])
+		self.assertEqual(dict(slots), {1: 0, 4: 2})
+		self.assertEqual(slots, {1: 0, 4: 2})
+		self.assertNotEqual(slots, {4: 2})
+		self.assertEqual(slots, ResourceSlots([(1, 0), (4, 2)]))
+
+	def test_copies(self):
+		slots = ResourceSlots({4: 2})
+		for other in (slots.copy(), copy.deepcopy(slots), pickle.loads(pickle.dumps(slots, 2))):
+			self.assertEqual(other, slots)
+			other[4] = 3
+			self.assertEqual(slots[4], 2)
+
+
+class TestBatchChanges(TestCase):
+
+	def test_batch(self):
+		s = GenericStorage()
+		listener = Mock()
+		s.add_change_listener(listener)
+
+		with s.batch_changes():
+			s.alter(1, 5)
+			with s.batch_changes():
+				s.alter(2, 3)
+			self.assertFalse(listener.called)
+		self.assertEqual(listener.call_count, 1)
+		self.assertEqual(s[1], 5)
+
+		# nothing changed, no call
+		listener.reset_mock()
+		with s.batch_changes():
+			pass
+		self.assertFalse(listener.called)
+
+	def test_batch_exception(self):
+		s = GenericStorage()
+		listener = Mock()
+		s.add_change_listener(listener)
+
+		try:
+			with s.batch_changes():
+				s.alter(1, 5)
+				raise ValueError
+		except ValueError:
+			pass
+		self.assertEqual(listener.call_count, 1)
+		s.alter(1, 1)
+		self.assertEqual(listener.call_count, 2)
+
+	def test_increased_resources(self):
+		s = PositiveSizedSlotStorage(10)
+		increased = []
+		s.add_change_listener(lambda: increased.append(s.get_increased_resources()))
+
+		s.alter(3, 5)
+		s.alter(3, -2)
+		s.alter(4, 20) # only partly stored
+		s.alter(5, 0)
+		self.assertEqual(increased, [[3], [], [4], []])
+
+		del increased[:]
+		with s.batch_changes():
+			s.alter(99, 1)
+			s.alter(2, 1)
+			s.alter(3, -1)
+		self.assertEqual(increased, [[2, 99]])
+		self.assertEqual(s.get_increased_resources(), [])
+
+	def test_slots(self):
+		s = PositiveSizedSlotStorage(10)
+		self.assertFalse(hasattr(s, '__dict__'))
+		self.assertEqual(type(s.get_dump()), defaultdict)
+
+
+class TestStorageBenchmark(TestCase):
+	"""Compares ResourceSlots with the defaultdict that was used before, for an inventory
+	with few resources (e.g. a tree or a farm) and one with many (a warehouse)."""
+
+	def test_benchmark(self):
+		for name, num_res in (('small', 3), ('large', 30)):
+			items = [(res, 10) for res in xrange(2, 2 + 2 * num_res, 2)]
+			for cls in (lambda: defaultdict(int), ResourceSlots):
+				slots = cls()
+				for res, amount in items:
+					slots[res] = amount
+				size = sys.getsizeof(slots) + sum(sys.getsizeof(getattr(slots, name, None)) for name in ('_amounts', '_slots'))
+
+				start = time.time()
+				for i in xrange(100000):
+					slots.get(4, 0)
+					slots[4] += 1
+				access_time = time.time() - start
+
+				start = time.time()
+				for i in xrange(20000):
+					slots.copy()
+				copy_time = time.time() - start
+
+				log.info('%s inventory, %s: %d bytes, access %.3fs, copy %.3fs',
+				         name, slots.__class__.__name__, size, access_time, copy_time)
+
+		for storage in (PositiveSizedSpecializedStorage({4: 8, 5: 8, 6: 8}), PositiveSizedSlotStorage(30),
+		                PositiveTotalNumSlotsStorage(100, 4)):
+			start = time.time()
+			for i in xrange(50000):
+				storage.alter(4, 1)
+				storage.alter(4, -1)
+			log.info('%s: %.0f alter() calls/s', storage.__class__.__name__, 100000 / (time.time() - start))
+
+	test_benchmark.long = True